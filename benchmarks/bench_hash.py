@@ -0,0 +1,73 @@
+"""
+Compare the single-pass multi-digest FileHash against the per-algorithm path.
+
+Usage:
+    python benchmarks/bench_hash.py --size 50 --repeat 5
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from cupang_updater.utils.hash import FileHash
+
+HASH_NAMES = ("md5", "sha1", "sha256", "sha512")
+CHUNK_SIZE = 64 * 2**10  # 64 KiB, the chunk size of the old path
+
+
+def per_algorithm(path: Path) -> dict[str, str]:
+    """The old path, every algorithm re-opens and re-reads the file."""
+    result = {}
+    for name in HASH_NAMES:
+        hash_tool = hashlib.new(name)
+        with path.open("rb") as stream:
+            while data := stream.read(CHUNK_SIZE):
+                hash_tool.update(data)
+        result[name] = hash_tool.hexdigest()
+    return result
+
+
+def single_pass(path: Path) -> dict[str, str]:
+    """The new path, every algorithm is fed from a single read."""
+    hashes = FileHash(path).compute(*HASH_NAMES)
+    return {name: getattr(hashes, name) for name in HASH_NAMES}
+
+
+def bench(func, path: Path, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=50, help="file size in MiB")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "server.jar")
+        with path.open("wb") as f:
+            for _ in range(args.size):
+                f.write(os.urandom(2**20))
+
+        if per_algorithm(path) != single_pass(path):
+            raise SystemExit("hash mismatch between per-algorithm and single-pass")
+
+        old = bench(per_algorithm, path, args.repeat)
+        new = bench(single_pass, path, args.repeat)
+
+    print(f"file size      : {args.size} MiB")
+    print(f"per-algorithm  : {old:.3f}s ({args.size / old:.1f} MiB/s)")
+    print(f"single-pass    : {new:.3f}s ({args.size / new:.1f} MiB/s)")
+    print(f"speedup        : {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
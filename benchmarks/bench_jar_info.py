@@ -0,0 +1,174 @@
+"""
+Compare the fast descriptor parser of get_jar_info against the strictyaml path.
+
+Every descriptor is parsed with both paths and the resulting JarInfo must be
+identical. The built-in corpus mimics the layouts found in published plugins,
+pass --corpus to add a folder of real jars or plugin.yml files.
+
+Usage:
+    python benchmarks/bench_jar_info.py --repeat 20 --corpus ~/server/plugins
+"""
+
+import argparse
+import io
+import time
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from cupang_updater.utils import jar as jar_module
+from cupang_updater.utils.jar import get_jar_info
+
+
+def _commands(count: int) -> str:
+    lines = ["commands:"]
+    for i in range(count):
+        lines += [
+            f"  cmd{i}:",
+            f"    description: Does thing number {i}, see /help cmd{i}",
+            f"    aliases: [c{i}, command{i}]",
+            f"    permission: example.command.cmd{i}",
+            "    usage: /<command> [player] [amount]",
+        ]
+    return "\n".join(lines)
+
+
+def _permissions(count: int) -> str:
+    lines = ["permissions:", "  example.*:", "    description: Everything"]
+    lines.append("    children:")
+    lines += [f"      example.command.cmd{i}: true" for i in range(count)]
+    for i in range(count):
+        lines += [
+            f"  example.command.cmd{i}:",
+            f"    description: Allows cmd{i}",
+            "    default: op",
+        ]
+    return "\n".join(lines)
+
+
+CORPUS = {
+    "minimal": "name: Minimal\nversion: 1.0.0\nmain: a.b.Minimal\napi-version: 1.20\n",
+    "flow-lists": (
+        "name: FlowLists\n"
+        "version: '2.4.1-SNAPSHOT'\n"
+        "main: a.b.FlowLists\n"
+        "authors: [alice, bob, carol]\n"
+        "depend: [Vault]\n"
+        "softdepend: [PlaceholderAPI, ProtocolLib]\n"
+        "description: A plugin with lists # and a comment\n"
+        "website: https://example.org/flow\n"
+    ),
+    "block-lists-large": (
+        "# generated by the build\n"
+        "name: LargePlugin\n"
+        'version: "5.3.0+build.112"\n'
+        "main: a.b.LargePlugin\n"
+        "api-version: '1.20'\n"
+        "author: someone\n"
+        "authors:\n"
+        "  - alice\n"
+        "  - bob # maintainer\n"
+        "loadbefore:\n"
+        "  - Essentials\n"
+        "description: |\n"
+        "  A long description: with colons\n"
+        "  - and list looking lines\n"
+        + _commands(120)
+        + "\n"
+        + _permissions(300)
+        + "\n"
+    ),
+    "paper-plugin": (
+        "name: PaperThing\n"
+        "version: '1.4'\n"
+        "main: a.b.PaperThing\n"
+        "api-version: '1.20'\n"
+        "folia-supported: true\n"
+        "dependencies:\n"
+        "  server:\n"
+        "    LuckPerms:\n"
+        "      load: BEFORE\n"
+        "      required: false\n"
+    ),
+    "bungee": "name: BungeeThing\nmain: a.b.Bungee\nversion: 3.1\nauthor: 'o''brien'\n",
+    "crlf-comments": (
+        "name: Windows\r\n\r\n# comment\r\n  # indented comment\r\n"
+        "version: 0.9   # trailing\r\nauthors:\r\n- x\r\n- y\r\n"
+    ),
+    "fallback-escapes": 'name: "Escaped\\u0041"\nversion: 1\nauthors: ["a", b]\n',
+}
+
+
+def make_jar(descriptor: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as jar:
+        for i in range(200):
+            jar.writestr(f"a/b/Class{i}.class", b"\xca\xfe\xba\xbe")
+        jar.writestr("plugin.yml", descriptor)
+    return buffer.getvalue()
+
+
+def load_corpus(folder: Path) -> dict[str, bytes]:
+    jars = {}
+    for path in sorted(folder.iterdir()):
+        if path.suffix == ".jar":
+            jars[path.name] = path.read_bytes()
+        elif path.suffix in (".yml", ".yaml"):
+            jars[path.name] = make_jar(path.read_text(encoding="utf-8"))
+    return jars
+
+
+def bench(jar: bytes, repeat: int, strictyaml_only: bool) -> tuple[float, object]:
+    def run():
+        return get_jar_info(io.BytesIO(jar))
+
+    with mock.patch.object(
+        jar_module,
+        "_parse_descriptor",
+        (lambda text: None) if strictyaml_only else jar_module._parse_descriptor,
+    ):
+        try:
+            result = run()
+        except Exception as e:
+            return 0.0, type(e).__name__
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--corpus", type=Path, help="folder of jars or plugin.yml")
+    args = parser.parse_args()
+
+    jars = {name: make_jar(text) for name, text in CORPUS.items()}
+    if args.corpus:
+        jars.update(load_corpus(args.corpus))
+
+    total_old = total_new = 0.0
+    fallbacks = 0
+    print(f"{'descriptor':<32} {'strictyaml':>12} {'fast':>12} {'speedup':>8}")
+    for name, jar in jars.items():
+        old, old_result = bench(jar, args.repeat, True)
+        new, new_result = bench(jar, args.repeat, False)
+        if old_result != new_result:
+            raise SystemExit(f"{name}: {old_result!r} != {new_result!r}")
+        with zipfile.ZipFile(io.BytesIO(jar)) as z:
+            for descriptor in ("paper-plugin.yml", "plugin.yml", "bungee.yml"):
+                if descriptor in z.namelist():
+                    text = z.read(descriptor).decode()
+                    fallbacks += jar_module._parse_descriptor(text) is None
+                    break
+        total_old += old
+        total_new += new
+        speedup = f"{old / new:.1f}x" if new else "-"
+        print(f"{name:<32} {old * 1000:>10.3f}ms {new * 1000:>10.3f}ms {speedup:>8}")
+
+    print(f"identical results for {len(jars)} jars, {fallbacks} used the fallback")
+    print(f"total: {total_old / total_new:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
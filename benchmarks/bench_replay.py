@@ -0,0 +1,68 @@
+"""
+Replay the api requests of a recorded run under a chosen latency and bandwidth.
+
+Record a cassette once with the internet available, then time the same
+requests offline, one at a time and concurrently, through the connection pool
+and through the curl engine:
+
+    cupang-updater --force --http-record run.json
+
+Usage:
+    python benchmarks/bench_replay.py run.json --latency 80 --bandwidth 2048
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from cupang_updater.utils.curl_multi import CurlMultiEngine, setup_curl_engine
+from cupang_updater.utils.http import get_connection_pool
+from cupang_updater.utils.http_replay import (
+    Cassette,
+    ReplayServer,
+    setup_replay_server,
+)
+from cupang_updater.utils.url import clear_shared_responses, make_requests
+
+
+def replay(urls: list[str], workers: int) -> float:
+    # every run starts without the responses of the previous one
+    clear_shared_responses()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        list(executor.map(make_requests, urls))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--latency", type=int, default=80, help="in milliseconds")
+    parser.add_argument("--bandwidth", type=int, default=0, help="in KiB/s")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    cassette = Cassette(args.cassette)
+    urls = [x.url for x in cassette if x.method == "GET"]
+    server = ReplayServer(cassette, args.latency / 1000, args.bandwidth * 1024)
+    setup_replay_server(server)
+    try:
+        print(f"requests       : {len(urls)}")
+        print(f"latency        : {args.latency} ms")
+        for engine in ("pool", "curl"):
+            if engine == "curl":
+                get_connection_pool().close()
+                setup_curl_engine(CurlMultiEngine())
+            sequential = replay(urls, 1)
+            concurrent = replay(urls, args.workers)
+            print(f"{engine:<5} 1 worker  : {sequential:.3f}s")
+            print(f"{engine:<5} {args.workers:<2} workers: {concurrent:.3f}s")
+    finally:
+        server.close()
+    if server.misses:
+        print(f"not recorded   : {len(server.misses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure plugin scan throughput at 1, 2, 4 and 8 scan workers.
+
+Only the hashing and metadata extraction are timed, the fingerprint cache is
+disabled so every jar is read each time.
+
+Usage:
+    python benchmarks/bench_scan_workers.py --plugins 80 --size 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from cupang_updater.rich import get_rich_status
+from cupang_updater.task.scan import _collect_local_fingerprints
+
+WORKERS = (1, 2, 4, 8)
+
+
+def make_jar(path: Path, name: str, size: int):
+    with zipfile.ZipFile(path, "w") as jar:
+        jar.writestr("plugin.yml", f"name: {name}\nversion: '1.0'\nmain: a.b.C\n")
+        jar.writestr("data.bin", os.urandom(size), zipfile.ZIP_STORED)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plugins", type=int, default=80)
+    parser.add_argument("--size", type=int, default=4, help="jar size in MiB")
+    args = parser.parse_args()
+
+    status = get_rich_status()
+    with tempfile.TemporaryDirectory() as tmp:
+        plugin_list = []
+        for i in range(args.plugins):
+            path = Path(tmp, f"Plugin{i}.jar")
+            make_jar(path, f"Plugin{i}", args.size * 2**20)
+            plugin_list.append(str(path))
+
+        baseline = None
+        total = args.plugins * args.size
+        for workers in WORKERS:
+            start = time.perf_counter()
+            result = _collect_local_fingerprints(plugin_list, None, workers, status)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = result
+            elif result != baseline:
+                raise SystemExit(f"{workers} workers returned a different result")
+            print(
+                f"{workers} worker(s): {elapsed:.3f}s "
+                + f"({args.plugins / elapsed:.1f} jars/s, {total / elapsed:.1f} MiB/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Check that a connection opened by the pre-warm is still reused after the scan.
+
+The api hosts are warmed before the config is saved and the plugins are
+scanned, which can take longer than the idle timeout of the pool. A local
+server counts the connections it accepts while a host is warmed, the scan is
+stood in for by a wait longer than the idle timeout, and the first request
+after it has to go over the warmed connection.
+
+Usage:
+    python benchmarks/check_prewarm.py --idle-timeout 0.5 --scan 1.5
+"""
+
+import argparse
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from cupang_updater.task.prewarm import prewarm_api_hosts
+from cupang_updater.utils import http
+from cupang_updater.utils.http import ConnectionPool, get_connection_pool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set[tuple[str, int]] = set()
+
+    def setup(self):
+        super().setup()
+        self.connections.add(self.client_address)
+
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        payload = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--idle-timeout", type=float, default=0.5)
+    parser.add_argument("--scan", type=float, default=1.5)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    http._pool = ConnectionPool(idle_timeout=args.idle_timeout)
+    try:
+        prewarm_api_hosts([url]).join()
+        warmed = len(_Handler.connections)
+        time.sleep(args.scan)
+        with get_connection_pool().request("GET", url + "/") as res:
+            res.read()
+    finally:
+        get_connection_pool().close()
+        server.shutdown()
+        server.server_close()
+
+    print(f"idle timeout         : {args.idle_timeout}s")
+    print(f"scan                 : {args.scan}s")
+    print(f"warmed connections   : {warmed}")
+    print(f"connections accepted : {len(_Handler.connections)}")
+    if warmed != 1 or len(_Handler.connections) != 1:
+        print("the warmed connection was not reused")
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Check that bulk api lookups survive a record and replay round trip.
+
+The GitHub GraphQL lookup sends one POST per 20 repositories to the same URL,
+so a cassette has to tell the chunks apart by their body. A local stand-in for
+the GraphQL api answers more than one chunk while recording, then the same
+lookup is replayed with the stand-in stopped and has to give the same result.
+
+Usage:
+    python benchmarks/check_replay_bulk.py --repos 45
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+from cupang_updater.logger import logger
+from cupang_updater.updater.common_api import github
+from cupang_updater.updater.common_api.github import GithubAPI
+from cupang_updater.utils.http_replay import (
+    Cassette,
+    HTTPRecorder,
+    ReplayServer,
+    setup_http_recorder,
+    setup_replay_server,
+)
+from cupang_updater.utils.url import clear_shared_responses
+
+
+class _GraphQLHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        variables: dict = body["variables"]
+        data = {}
+        for key, name in variables.items():
+            if not key.startswith("name"):
+                continue
+            tag = f"{name}-1.0"
+            data[f"r{key[4:]}"] = {
+                "releases": {
+                    "nodes": [
+                        {
+                            "name": tag,
+                            "tagName": tag,
+                            "isDraft": False,
+                            "isPrerelease": False,
+                            "publishedAt": "2024-01-01T00:00:00Z",
+                            "tag": {"target": {"oid": f"sha-{name}"}},
+                            "releaseAssets": {
+                                "nodes": [
+                                    {
+                                        "name": f"{name}.jar",
+                                        "downloadUrl": f"https://dl/{name}.jar",
+                                    }
+                                ]
+                            },
+                        }
+                    ]
+                }
+            }
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repos", type=int, default=45)
+    args = parser.parse_args()
+
+    logger._logger = logging.getLogger("check_replay_bulk")
+    repos = [f"owner/repo{i}" for i in range(args.repos)]
+    cassette_path = Path(tempfile.mkdtemp(), "bulk.json")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GraphQLHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    github._API = f"http://127.0.0.1:{server.server_address[1]}"
+    cassette = Cassette(cassette_path)
+    setup_http_recorder(HTTPRecorder(cassette))
+    recorded = GithubAPI.get_releases_data_bulk(repos, "token")
+    setup_http_recorder(None)
+    cassette.save()
+    server.shutdown()
+    server.server_close()
+
+    clear_shared_responses()
+    replay = ReplayServer(Cassette(cassette_path))
+    setup_replay_server(replay)
+    try:
+        replayed = GithubAPI.get_releases_data_bulk(repos, "token")
+    finally:
+        setup_replay_server(None)
+        replay.close()
+
+    print(f"repos          : {len(repos)}")
+    print(f"recorded POSTs : {len(Cassette(cassette_path))}")
+    print(f"recorded repos : {len(recorded)}")
+    print(f"replayed repos : {len(replayed)}")
+    if len(recorded) != len(repos) or replayed != recorded or replay.misses:
+        print("replay does not match the recording")
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Synthetic plugin corpora for the benchmarks.
+
+Every jar gets a descriptor of one of the supported types and a payload of
+random bytes, and is already named "Name [Version].jar" so a scan does not
+rename it.
+"""
+
+import json
+import random
+import zipfile
+from pathlib import Path
+
+DESCRIPTOR_TYPES = ("bukkit", "paper", "velocity", "fabric", "forge")
+
+
+def _bukkit_descriptor(name: str, version: str, commands: int) -> str:
+    lines = [
+        f"name: {name}",
+        f"version: '{version}'",
+        f"main: org.example.{name.lower()}.{name}",
+        "api-version: '1.20'",
+        "authors: [alice, bob]",
+        "softdepend: [Vault, PlaceholderAPI]",
+        "commands:",
+    ]
+    for i in range(commands):
+        lines += [
+            f"  {name.lower()}{i}:",
+            f"    description: Command {i} of {name}",
+            f"    aliases: [{name.lower()[:3]}{i}]",
+            f"    permission: {name.lower()}.command.{i}",
+        ]
+    lines.append("permissions:")
+    for i in range(commands):
+        lines += [f"  {name.lower()}.command.{i}:", "    default: op"]
+    return "\n".join(lines) + "\n"
+
+
+def descriptor(
+    kind: str, name: str, version: str, commands: int = 20
+) -> tuple[str, str]:
+    """
+    Build the descriptor of a jar.
+
+    Args:
+        kind (str): One of DESCRIPTOR_TYPES.
+        name (str): The plugin name.
+        version (str): The plugin version.
+        commands (int, optional): The number of commands and permissions of
+            bukkit style descriptors. Defaults to 20.
+
+    Returns:
+        tuple[str, str]: The descriptor file name and content.
+    """
+    match kind:
+        case "bukkit":
+            return "plugin.yml", _bukkit_descriptor(name, version, commands)
+        case "paper":
+            return "paper-plugin.yml", _bukkit_descriptor(name, version, commands)
+        case "velocity":
+            data = {"id": name.lower(), "name": name, "version": version}
+            return "velocity-plugin.json", json.dumps(data | {"authors": ["alice"]})
+        case "fabric":
+            data = {"schemaVersion": 1, "id": name.lower(), "name": name}
+            data |= {"version": version, "authors": ["alice", "bob"]}
+            return "fabric.mod.json", json.dumps(data)
+        case "forge":
+            content = f'modLoader="javafml"\n[[mods]]\nmodId="{name}"\n'
+            content += f'version="{version}"\nauthors="alice"\n'
+            return "META-INF/mods.toml", content
+    raise ValueError(f"unknown descriptor type {kind}")
+
+
+def make_jar(
+    path: Path, kind: str, name: str, version: str, size: int, seed: int = 0
+) -> Path:
+    """
+    Write a jar with a descriptor and size bytes of random payload.
+
+    Args:
+        path (Path): Where the jar is written.
+        kind (str): One of DESCRIPTOR_TYPES.
+        name (str): The plugin name.
+        version (str): The plugin version.
+        size (int): The size of the payload in bytes.
+        seed (int, optional): The seed of the payload. Defaults to 0.
+
+    Returns:
+        Path: The path of the jar.
+    """
+    file_name, content = descriptor(kind, name, version)
+    with zipfile.ZipFile(path, "w") as jar:
+        jar.writestr(file_name, content)
+        jar.writestr("payload.bin", random.Random(seed).randbytes(size))
+    return path
+
+
+def make_corpus(
+    folder: Path, count: int, size: int, kinds: tuple[str, ...] = DESCRIPTOR_TYPES
+) -> list[Path]:
+    """
+    Fill a folder with count jars, cycling through the descriptor types.
+
+    Args:
+        folder (Path): The folder, created if needed.
+        count (int): The number of jars.
+        size (int): The payload size of every jar in bytes.
+        kinds (tuple[str, ...], optional): The descriptor types to use.
+            Defaults to DESCRIPTOR_TYPES.
+
+    Returns:
+        list[Path]: The paths of the jars.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    jars = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        name, version = f"Plugin{i:04d}", f"1.0.{i}"
+        path = folder / f"{name} [{version}].jar"
+        jars.append(make_jar(path, kind, name, version, size, i))
+    return jars
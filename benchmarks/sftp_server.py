@@ -0,0 +1,145 @@
+"""
+A local SFTP server for the benchmarks, serving a folder over paramiko.
+
+Any username and password are accepted. Only meant for benchmarks on localhost.
+"""
+
+import os
+import socket
+import threading
+from pathlib import Path
+
+import paramiko
+
+_FLAG_MODES = {
+    os.O_RDONLY: "rb",
+    os.O_WRONLY: "wb",
+    os.O_RDWR: "r+b",
+}
+
+
+class _Server(paramiko.ServerInterface):
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+
+class _Handle(paramiko.SFTPHandle):
+    def stat(self):
+        f = getattr(self, "readfile", None) or self.writefile
+        return paramiko.SFTPAttributes.from_stat(os.fstat(f.fileno()))
+
+
+class _SFTPInterface(paramiko.SFTPServerInterface):
+    def __init__(self, server, root: Path, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self._root = root
+
+    def _path(self, path: str) -> Path:
+        return self._root / path.lstrip("/")
+
+    def _call(self, func, *args):
+        try:
+            return func(*args)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def list_folder(self, path):
+        def _list():
+            folder = self._path(path)
+            return [
+                paramiko.SFTPAttributes.from_stat(os.stat(folder / name), name)
+                for name in os.listdir(folder)
+            ]
+
+        return self._call(_list)
+
+    def stat(self, path):
+        return self._call(
+            lambda: paramiko.SFTPAttributes.from_stat(os.stat(self._path(path)))
+        )
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        def _open():
+            mode = _FLAG_MODES[flags & (os.O_RDONLY | os.O_WRONLY | os.O_RDWR)]
+            if flags & os.O_CREAT and not self._path(path).exists():
+                self._path(path).touch()
+            if flags & os.O_TRUNC:
+                mode = "w+b" if mode == "r+b" else "wb"
+            # closed by the handle when the client closes the file
+            f = open(self._path(path), mode)  # noqa: SIM115
+            handle = _Handle(flags)
+            if "r" in mode or "+" in mode:
+                handle.readfile = f
+            if "w" in mode or "+" in mode:
+                handle.writefile = f
+            return handle
+
+        return self._call(_open)
+
+    def remove(self, path):
+        return self._call(lambda: os.remove(self._path(path)) or paramiko.SFTP_OK)
+
+    def rename(self, oldpath, newpath):
+        return self._call(
+            lambda: os.rename(self._path(oldpath), self._path(newpath))
+            or paramiko.SFTP_OK
+        )
+
+    def posix_rename(self, oldpath, newpath):
+        return self._call(
+            lambda: os.replace(self._path(oldpath), self._path(newpath))
+            or paramiko.SFTP_OK
+        )
+
+    def mkdir(self, path, attr):
+        return self._call(lambda: os.mkdir(self._path(path)) or paramiko.SFTP_OK)
+
+    def rmdir(self, path):
+        return self._call(lambda: os.rmdir(self._path(path)) or paramiko.SFTP_OK)
+
+
+class LocalSFTPServer:
+    """Serve a folder over SFTP on 127.0.0.1, in a background thread."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        self._transports: list[paramiko.Transport] = []
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self._host_key)
+            transport.set_subsystem_handler(
+                "sftp", paramiko.SFTPServer, _SFTPInterface, self.root
+            )
+            transport.start_server(server=_Server())
+            self._transports.append(transport)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._sock.close()
+        for transport in self._transports:
+            transport.close()
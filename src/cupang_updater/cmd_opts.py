@@ -64,6 +64,74 @@ opt_main.add_argument(
     default=False,
     help="Scan plugins without checking update (default: %(default)s)",
 )
+opt_main.add_argument(
+    "-w",
+    "--watch",
+    dest="watch",
+    action="store_true",
+    default=False,
+    help="Keep running and rescan plugins when the plugins folder changes, "
+    + "without checking update (default: %(default)s)",
+)
+opt_main.add_argument(
+    "-nsc",
+    "--no-scan-cache",
+    dest="no_scan_cache",
+    action="store_true",
+    default=False,
+    help="Re-hash every plugin instead of using the scan cache (default: %(default)s)",
+)
+opt_main.add_argument(
+    "-ni",
+    "--no-identify",
+    dest="no_identify",
+    action="store_true",
+    default=False,
+    help="Don't look new plugins up by their hashes to fill their config "
+    + "(default: %(default)s)",
+)
+opt_main.add_argument(
+    "-nhc",
+    "--no-http-cache",
+    dest="no_http_cache",
+    action="store_true",
+    default=False,
+    help="Re-download every api response instead of revalidating the cached one "
+    + "(default: %(default)s)",
+)
+opt_main.add_argument(
+    "-sw",
+    "--scan-workers",
+    dest="scan_workers",
+    action="store",
+    metavar="INT",
+    type=int,
+    default=1,
+    help="Set how many processes hash and parse plugins while scanning "
+    + "(default: %(default)s)",
+)
+opt_main.add_argument(
+    "-pc",
+    "--parallel-checks",
+    dest="parallel_checks",
+    action="store",
+    metavar="INT",
+    type=int,
+    default=16,
+    help="Set how many plugin update checks run at the same time "
+    + "(default: %(default)s)",
+)
+opt_main.add_argument(
+    "-he",
+    "--http-engine",
+    dest="http_engine",
+    action="store",
+    choices=["pool", "curl"],
+    type=str,
+    default="pool",
+    help="Set how api requests are sent, curl sends them all from one thread "
+    + "over shared HTTP/2 connections (default: %(default)s)",
+)
 opt_main.add_argument(
     "-V",
     "--debug",
@@ -100,6 +168,46 @@ opt_config.add_argument(
     default=False,
     help="Force clean leftover plugins (default: %(default)s)",
 )
+opt_http_replay = opt_extra.add_mutually_exclusive_group()
+opt_http_replay.add_argument(
+    "--http-record",
+    dest="http_record",
+    action="store",
+    metavar="PATH",
+    type=Path,
+    default=None,
+    help="Record api responses into a cassette file, "
+    + "the HTTP cache is not used (default: None)",
+)
+opt_http_replay.add_argument(
+    "--http-replay",
+    dest="http_replay",
+    action="store",
+    metavar="PATH",
+    type=Path,
+    default=None,
+    help="Serve api responses from a cassette file instead of the internet, "
+    + "the HTTP cache is not used (default: None)",
+)
+opt_extra.add_argument(
+    "--replay-latency",
+    dest="replay_latency",
+    action="store",
+    metavar="MS",
+    type=int,
+    default=0,
+    help="Delay every replayed response (default: %(default)s)",
+)
+opt_extra.add_argument(
+    "--replay-bandwidth",
+    dest="replay_bandwidth",
+    action="store",
+    metavar="KIB",
+    type=int,
+    default=0,
+    help="Limit every replayed response to KiB per second, 0 is unlimited "
+    + "(default: %(default)s)",
+)
 opt_downloader.add_argument(
     "-dl",
     "--downloader",
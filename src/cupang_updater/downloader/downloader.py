@@ -3,8 +3,10 @@ from cupang_downloader.downloader import Downloader
 from ..cmd_opts import get_cmd_opts
 from ..logger.logger import get_logger
 from ..meta import stop_event
+from .stream import StreamDownloader
 
 _downloader: Downloader = None
+_stream_downloader: StreamDownloader = None
 
 
 def _setup_fallback_downloader():
@@ -26,7 +28,7 @@ def setup_downloader():
         downloader setup fails, a fallback downloader is used.
     """
 
-    global _downloader
+    global _downloader, _stream_downloader
     log = get_logger()
     if _downloader:
         log.warning("Downloader already setup")
@@ -66,6 +68,8 @@ def setup_downloader():
                 )
 
                 _downloader = Downloader(PycurlDownloader(cancel_event=stop_event))
+                # hashes the file while downloading, see get_stream_downloader
+                _stream_downloader = StreamDownloader(cancel_event=stop_event)
             case "requests":
                 log.info("Setup requests downloader")
                 from cupang_downloader.downloaders.requests_downloader import (
@@ -96,3 +100,18 @@ def get_downloader() -> Downloader:
     if not isinstance(_downloader, Downloader):
         raise RuntimeError("Downloader is not initialized")
     return _downloader
+
+
+def get_stream_downloader() -> StreamDownloader | None:
+    """
+    Retrieve the StreamDownloader instance.
+
+    The stream downloader is only available when the pycurl downloader is used,
+    other downloaders write the file on their own so it can not be hashed
+    while it is being downloaded.
+
+    Returns:
+        StreamDownloader | None: The StreamDownloader instance, or None if
+            it is not available.
+    """
+    return _stream_downloader
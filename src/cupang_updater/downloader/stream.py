@@ -0,0 +1,188 @@
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Event
+
+import pycurl
+
+from ..utils.common import ensure_path
+from ..utils.hash import Hashes, MultiHash
+from ..utils.url import match_content_type, remember_content_type
+
+
+@dataclass(eq=False)
+class StreamJob:
+    """
+    A download job that hashes the file while it is being written.
+
+    Attributes:
+        url (str): The URL of the file.
+        download_path (Path): Where the file is saved.
+        headers (dict[str, str]): Additional HTTP headers to send.
+        progress_name (str): The name shown in the progress bar.
+        content_types (tuple[str, ...]): The accepted content types, the download
+            is aborted before anything is written if the response has another one.
+            None accepts any content type.
+        hashes (Hashes): The hashes of the downloaded file, set once the download
+            is finished.
+    """
+
+    url: str
+    download_path: Path
+    headers: dict[str, str] = field(default_factory=dict)
+    progress_name: str = field(default=None)
+    content_types: tuple[str, ...] = field(default=None)
+    hashes: Hashes = field(default=None, init=False)
+
+    def __post_init__(self):
+        self.download_path = ensure_path(self.download_path)
+        self.headers = self.headers or {}
+        self.progress_name = self.progress_name or self.download_path.name
+
+
+def _header_collector(headers: dict[str, str]) -> Callable[[bytes], None]:
+    """Make a HEADERFUNCTION that keeps the headers of the final response."""
+
+    def _header(line: bytes):
+        # every response of a redirect chain starts with its status line
+        text = line.decode("iso-8859-1").strip()
+        if text.startswith("HTTP/"):
+            headers.clear()
+        elif ":" in text:
+            name, value = text.split(":", maxsplit=1)
+            headers[name.strip().lower()] = value.strip()
+
+    return _header
+
+
+class ContentTypeError(Exception):
+    """Raised when a download responds with a content type the job does not accept."""
+
+
+class StreamDownloader:
+    """
+    A pycurl based downloader that tees the received bytes into the file
+    and into the hash tools, so the file never has to be read back to hash it.
+
+    The callbacks are the same as the ones used by cupang_downloader.
+    """
+
+    def __init__(self, cancel_event: Event = None):
+        """
+        Initialize the downloader.
+
+        Args:
+            cancel_event (Event, optional): When set, running downloads are
+                cancelled.
+        """
+        self._cancel_event = cancel_event or Event()
+
+    def _setup_curl(self, job: StreamJob) -> pycurl.Curl:
+        c = pycurl.Curl()
+        c.setopt(pycurl.URL, job.url)
+        c.setopt(pycurl.FOLLOWLOCATION, True)
+        c.setopt(pycurl.MAXREDIRS, 10)
+        c.setopt(pycurl.FAILONERROR, True)
+        c.setopt(pycurl.CONNECTTIMEOUT, 30)
+        # abort stalled downloads instead of hanging forever
+        c.setopt(pycurl.LOW_SPEED_LIMIT, 1)
+        c.setopt(pycurl.LOW_SPEED_TIME, 60)
+        c.setopt(pycurl.HTTPHEADER, [f"{k}: {v}" for k, v in job.headers.items()])
+        c.setopt(pycurl.NOPROGRESS, False)
+        return c
+
+    def _check_content_type(
+        self, job: StreamJob, content_type: str | None
+    ) -> ContentTypeError | None:
+        if job.content_types is None or match_content_type(
+            content_type, job.content_types
+        ):
+            remember_content_type(job.url, content_type)
+            return None
+        return ContentTypeError(
+            f"Invalid content type for {job.url}, got [{content_type}] "
+            + f"expecting one of these: {list(job.content_types)}"
+        )
+
+    def dl(
+        self,
+        job: StreamJob,
+        on_start: Callable[[StreamJob], None],
+        on_finish: Callable[[StreamJob], None],
+        on_progress: Callable[[StreamJob, int, int], None],
+        on_cancel: Callable[[StreamJob], None],
+        on_error: Callable[[StreamJob, Exception], None],
+    ):
+        """
+        Download the file of the given job.
+
+        The file is written to a ".part" file first and moved into place once the
+        download is finished, `job.hashes` is set right before on_finish is called.
+
+        Args:
+            job (StreamJob): The download job.
+            on_start (Callable[[StreamJob], None]): Called when the download starts.
+            on_finish (Callable[[StreamJob], None]): Called when the download
+                is finished.
+            on_progress (Callable[[StreamJob, int, int], None]): Called with the
+                total and downloaded bytes.
+            on_cancel (Callable[[StreamJob], None]): Called when the download
+                is cancelled.
+            on_error (Callable[[StreamJob, Exception], None]): Called when the
+                download failed.
+        """
+        part_path = job.download_path.with_name(job.download_path.name + ".part")
+        multi_hash = MultiHash()
+        content_type_error: ContentTypeError = None
+
+        def _xferinfo(dl_total: int, dl_now: int, *_) -> int:
+            if self._cancel_event.is_set():
+                return 1  # non zero aborts the transfer
+            on_progress(job, dl_total, dl_now)
+            return 0
+
+        on_start(job)
+        c = self._setup_curl(job)
+        response_headers: dict[str, str] = {}
+        try:
+            with part_path.open("wb") as f:
+
+                def _write(data: bytes) -> int | None:
+                    nonlocal content_type_error
+                    # the headers of the final response are known by the first write
+                    if not f.tell():
+                        content_type_error = self._check_content_type(
+                            job, response_headers.get("content-type")
+                        )
+                        if content_type_error:
+                            return 0  # a short write aborts the transfer
+                    f.write(data)
+                    multi_hash.update(data)
+
+                c.setopt(pycurl.HEADERFUNCTION, _header_collector(response_headers))
+                c.setopt(pycurl.WRITEFUNCTION, _write)
+                c.setopt(pycurl.XFERINFOFUNCTION, _xferinfo)
+                c.perform()
+                if not f.tell():
+                    # empty bodies never reach _write
+                    content_type_error = self._check_content_type(
+                        job, response_headers.get("content-type")
+                    )
+        except pycurl.error as e:
+            part_path.unlink(missing_ok=True)
+            if self._cancel_event.is_set():
+                on_cancel(job)
+            else:
+                on_error(job, content_type_error or e)
+            return
+        finally:
+            c.close()
+        if content_type_error:
+            part_path.unlink(missing_ok=True)
+            on_error(job, content_type_error)
+            return
+
+        os.replace(part_path, job.download_path)
+        job.hashes = multi_hash.hashes()
+        on_finish(job)
@@ -1,3 +1,4 @@
+import multiprocessing
 from contextlib import suppress
 from pathlib import Path
 from urllib.parse import ParseResult
@@ -26,8 +27,10 @@ from .remote_storage.sftp import SFTPStorage
 from .remote_storage.smb import SMBStorage
 from .remote_storage.webdav import WebdavStorage
 from .rich import console
+from .task.prewarm import get_api_hosts, prewarm_api_hosts
 from .task.scan import scan_plugins
-from .task.update import update_all
+from .task.update import get_remaining_cooldown, update_all
+from .task.watch import watch_plugins
 from .updater.plugin.bukkit import BukkitUpdater
 from .updater.plugin.custom import CustomUrlPluginUpdater
 from .updater.plugin.github import GithubUpdater
@@ -42,6 +45,18 @@ from .updater.server.paper import PaperUpdater
 from .updater.server.purpur import PurpurUpdater
 from .updater.server.spigot import SpigotMCUpdater
 from .utils.config import fix_config, update_server_type
+from .utils.curl_multi import CurlMultiEngine, get_curl_engine, setup_curl_engine
+from .utils.http import get_connection_pool
+from .utils.http_cache import HTTPCache, get_http_cache, setup_http_cache
+from .utils.http_replay import (
+    Cassette,
+    HTTPRecorder,
+    ReplayServer,
+    get_http_recorder,
+    get_replay_server,
+    setup_http_recorder,
+    setup_replay_server,
+)
 from .utils.url import parse_url
 
 
@@ -57,6 +72,21 @@ def _initialize_environment(cmd_opts):
         x.mkdir(parents=True, exist_ok=True)
 
     setup_logger(appdir.logs_path)
+    if cmd_opts.http_record:
+        setup_http_recorder(HTTPRecorder(Cassette(cmd_opts.http_record)))
+    elif cmd_opts.http_replay:
+        setup_replay_server(
+            ReplayServer(
+                Cassette(cmd_opts.http_replay),
+                cmd_opts.replay_latency / 1000,
+                cmd_opts.replay_bandwidth * 1024,
+            )
+        )
+    elif not cmd_opts.no_http_cache:
+        # cached responses would be missing from a cassette
+        setup_http_cache(HTTPCache(appdir.caches_path / "http"))
+    if cmd_opts.http_engine == "curl":
+        setup_curl_engine(CurlMultiEngine())
 
 
 def _register_updaters():
@@ -182,6 +212,8 @@ def _connect_remote_storage(parsed_url: ParseResult, config: Config):
 
 
 def main():
+    # plugin scan workers are spawned, frozen builds need this to start them
+    multiprocessing.freeze_support()
     try:
         parse_cmd()
         cmd_opts = get_cmd_opts()
@@ -204,25 +236,43 @@ def main():
         _setup_server_folder(config)
 
         _configure_updater_settings(config)
+        if not (cmd_opts.watch or cmd_opts.scan_only) and (
+            get_remaining_cooldown(config) is None
+        ):
+            # connect to the apis while the plugins are scanned
+            prewarm_api_hosts(get_api_hosts(config))
 
         config.save()
         config.reload()
 
-        if cmd_opts.scan_only:
+        if cmd_opts.watch:
+            watch_plugins(config)
+        elif cmd_opts.scan_only:
             scan_plugins(config)
         else:
             scan_plugins(config)
             update_all(config)
-        stop()
     except (Exception, KeyboardInterrupt):
-        stop()
         console.print_exception()
+    finally:
+        # also when scan_plugins exits for new plugins, the recorded responses
+        # and the http cache are still saved
+        stop()
 
 
 def stop():
     stop_event.set()
     with suppress(Exception):
         get_remote_connection().close()
+    get_connection_pool().close()
+    if (engine := get_curl_engine()) is not None:
+        engine.close()
+    with suppress(RuntimeError):
+        get_http_cache().save()
+    if (recorder := get_http_recorder()) is not None:
+        recorder.cassette.save()
+    if (replay := get_replay_server()) is not None:
+        replay.close()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,8 @@
+import io
 from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
 from typing import IO, final
 
 
@@ -10,6 +14,112 @@ class RemotePathNotFoundError(Exception):
     pass
 
 
+@dataclass
+class RemoteFileInfo:
+    """A remote file and the attributes returned by a directory listing.
+
+    Attributes:
+        path (str): The path of the remote file.
+        size (int | None): The size of the file in bytes, None if unknown.
+        mtime_ns (int | None): The modification time of the file in nanoseconds,
+            None if unknown.
+    """
+
+    path: str
+    size: int | None = None
+    mtime_ns: int | None = None
+
+    @classmethod
+    def from_datetime(
+        cls, path: str, size: int | None, modified: datetime | None
+    ) -> "RemoteFileInfo":
+        """Create a RemoteFileInfo from a modification datetime.
+
+        Args:
+            path (str): The path of the remote file.
+            size (int | None): The size of the file in bytes.
+            modified (datetime | None): The modification time of the file.
+
+        Returns:
+            RemoteFileInfo: The remote file info.
+        """
+        mtime_ns = None
+        if modified is not None:
+            mtime_ns = int(modified.timestamp()) * 10**9 + modified.microsecond * 1000
+        return cls(path, size, mtime_ns)
+
+
+class RemoteRangeReader(io.RawIOBase):
+    """A seekable, read-only view of a remote file.
+
+    The remote file is read through a stream opened at a given offset. Sequential
+    reads keep using the same stream, a seek only re-opens it at the new offset
+    when the next read happens, so reading a few small parts of a large file
+    never transfers the whole file.
+    """
+
+    def __init__(self, size: int, open_at: Callable[[int], IO[bytes]]):
+        """Initialize the reader.
+
+        Args:
+            size (int): The size of the remote file in bytes.
+            open_at (Callable[[int], IO[bytes]]): Open a stream of the remote file
+                starting at the given offset. The stream is closed once it is no
+                longer needed.
+        """
+        self._size = size
+        self._open_at = open_at
+        self._pos = 0
+        self._stream: IO[bytes] | None = None
+        self._stream_pos = 0
+
+    def _close_stream(self):
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            stream.close()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._size - self._pos)
+        if size <= 0:
+            return 0
+        if self._stream is None or self._stream_pos != self._pos:
+            self._close_stream()
+            self._stream = self._open_at(self._pos)
+            self._stream_pos = self._pos
+        data = self._stream.read(size)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        self._stream_pos = self._pos
+        return len(data)
+
+    def close(self):
+        self._close_stream()
+        super().close()
+
+
 class RemoteIO(metaclass=ABCMeta):
     @final
     @property
@@ -73,3 +183,39 @@ class RemoteIO(metaclass=ABCMeta):
 
     @abstractmethod
     def downloadfo(self, from_remote_path: str, stream: IO[bytes]): ...
+
+    def open(self, path: str) -> IO[bytes]:
+        """Open a remote file for reading.
+
+        The returned stream is seekable and should be closed after use. Storages
+        that can read a part of a file override this so only the parts that
+        are actually read are transferred, the default implementation
+        downloads the whole file into memory.
+
+        Args:
+            path (str): The path of the remote file.
+
+        Returns:
+            IO[bytes]: A seekable binary stream of the remote file.
+        """
+        stream = io.BytesIO()
+        self.downloadfo(path, stream)
+        stream.seek(0)
+        return stream
+
+    def glob_info(self, path: str, pattern: str = "*") -> list[RemoteFileInfo]:
+        """List the files of a remote directory together with their attributes.
+
+        Storages that can list attributes override this so the whole directory
+        costs a single round trip, the default implementation only knows the
+        paths and leaves the attributes unknown.
+
+        Args:
+            path (str): The remote directory.
+            pattern (str, optional): Only files matching this pattern are listed.
+                Defaults to "*".
+
+        Returns:
+            list[RemoteFileInfo]: The files in the directory.
+        """
+        return [RemoteFileInfo(item) for item in self.glob(path, pattern)]
@@ -1,20 +1,93 @@
+import contextlib
 import fnmatch
 import ftplib
+import io
+import socket
 import tempfile
+from collections.abc import Callable
+from datetime import UTC, datetime
 from io import BytesIO
 from pathlib import Path
 from typing import IO
 
 from ..meta import get_appdir
 from ..utils.common import ensure_path
-from .base import RemoteIO, RemotePathIsExistsError, RemotePathNotFoundError
+from .base import (
+    RemoteFileInfo,
+    RemoteIO,
+    RemotePathIsExistsError,
+    RemotePathNotFoundError,
+    RemoteRangeReader,
+)
+
+
+class _FTPDataStream(io.RawIOBase):
+    """A RETR data connection that can be closed before the transfer is done."""
+
+    def __init__(
+        self, ftp: ftplib.FTP, conn: socket.socket, reconnect: Callable[[], None]
+    ):
+        self._ftp = ftp
+        self._conn = conn
+        self._reconnect = reconnect
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self._conn.recv_into(buffer)
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            return self.readall()
+        # recv may return less than asked, keep going until size or EOF
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._conn.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return bytes(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self._conn.close()
+        # 226 when the whole file was read, 426/451 or a 5xx when closed early
+        try:
+            self._ftp.voidresp()
+        except (ftplib.error_temp, ftplib.error_perm):
+            pass
+        except (ftplib.Error, EOFError, OSError):
+            # not a final reply, the next command would read the rest of it
+            with contextlib.suppress(ftplib.Error, OSError):
+                self._reconnect()
+        super().close()
+
+
+def _parse_mlsd_time(value: str | None) -> datetime | None:
+    """Parse a MLSD time value, YYYYMMDDHHMMSS[.sss] in UTC."""
+    if not value:
+        return None
+    timestamp, _, fraction = value.partition(".")
+    try:
+        modified = datetime.strptime(timestamp, "%Y%m%d%H%M%S").replace(tzinfo=UTC)
+    except ValueError:
+        return None
+    if fraction.isdigit():
+        modified = modified.replace(microsecond=int(fraction[:6].ljust(6, "0")))
+    return modified
 
 
 class FTPStorage(RemoteIO):
     def __init__(
         self, host: str, port: int = 21, username: str = "anonymous", password: str = ""
     ):
-        port = port or 21
+        self._login = (host, port or 21, username, password)
+        self._connect()
+
+    def _connect(self):
+        host, port, username, password = self._login
         self._ftp = ftplib.FTP_TLS()
         self._ftp.connect(host, port)
         try:
@@ -22,6 +95,10 @@ class FTPStorage(RemoteIO):
         except ftplib.error_perm:
             self._ftp.login(username, password, secure=False)
 
+    def _reconnect(self):
+        self._ftp.close()
+        self._connect()
+
     def _is_dir(self, path: str) -> bool:
         path = ensure_path(path).as_posix()
         pwd = self._ftp.pwd()
@@ -169,3 +246,33 @@ class FTPStorage(RemoteIO):
         from_remote_path = ensure_path(from_remote_path).as_posix()
         stream.seek(0)
         self._ftp.retrbinary(f"RETR {from_remote_path}", stream.write)
+
+    def open(self, path: str) -> IO[bytes]:
+        path = ensure_path(path).as_posix()
+        self._ftp.voidcmd("TYPE I")
+        size = self._ftp.size(path)
+
+        def _open_at(offset: int) -> IO[bytes]:
+            conn = self._ftp.transfercmd(f"RETR {path}", rest=offset or None)
+            return _FTPDataStream(self._ftp, conn, self._reconnect)
+
+        return io.BufferedReader(RemoteRangeReader(size, _open_at))
+
+    def glob_info(self, path: str, pattern: str = "*") -> list[RemoteFileInfo]:
+        path = ensure_path(path).as_posix()
+        try:
+            listing = list(self._ftp.mlsd(path, ["type", "size", "modify"]))
+        except ftplib.error_perm:
+            # the server does not support MLSD
+            return super().glob_info(path, pattern)
+        result = []
+        for name, facts in listing:
+            item_path = Path(path, name).as_posix()
+            if facts.get("type", "file") != "file" or not fnmatch.fnmatch(
+                item_path, pattern
+            ):
+                continue
+            size = int(facts["size"]) if facts.get("size", "").isdigit() else None
+            modified = _parse_mlsd_time(facts.get("modify"))
+            result.append(RemoteFileInfo.from_datetime(item_path, size, modified))
+        return result
@@ -7,7 +7,12 @@ from typing import IO
 import paramiko
 
 from ..utils.common import ensure_path
-from .base import RemoteIO, RemotePathIsExistsError, RemotePathNotFoundError
+from .base import (
+    RemoteFileInfo,
+    RemoteIO,
+    RemotePathIsExistsError,
+    RemotePathNotFoundError,
+)
 
 
 class SFTPStorage(RemoteIO):
@@ -176,3 +181,20 @@ class SFTPStorage(RemoteIO):
         from_remote_path = ensure_path(from_remote_path).as_posix()
         stream.seek(0)
         self._sftp.getfo(from_remote_path, stream)
+
+    def open(self, path: str) -> IO[bytes]:
+        path = ensure_path(path).as_posix()
+        return self._sftp.open(path, "rb")
+
+    def glob_info(self, path: str, pattern: str = "*") -> list[RemoteFileInfo]:
+        path = ensure_path(path).as_posix()
+        result = []
+        for attr in self._sftp.listdir_attr(path):
+            item_path = Path(path, attr.filename).as_posix()
+            if stat.S_ISDIR(attr.st_mode or 0) or not fnmatch.fnmatch(
+                item_path, pattern
+            ):
+                continue
+            mtime_ns = attr.st_mtime * 10**9 if attr.st_mtime is not None else None
+            result.append(RemoteFileInfo(item_path, attr.st_size, mtime_ns))
+        return result
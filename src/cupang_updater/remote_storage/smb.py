@@ -6,7 +6,12 @@ import smbclient
 from smbprotocol.exceptions import SMBException
 
 from ..utils.common import ensure_path
-from .base import RemoteIO, RemotePathIsExistsError, RemotePathNotFoundError
+from .base import (
+    RemoteFileInfo,
+    RemoteIO,
+    RemotePathIsExistsError,
+    RemotePathNotFoundError,
+)
 
 
 class SMBStorage(RemoteIO):
@@ -223,3 +228,23 @@ class SMBStorage(RemoteIO):
                 if not chunk:
                     break
                 stream.write(chunk)
+
+    def open(self, path: str) -> IO[bytes]:
+        path = self._ensure_unc_path(path)
+        return smbclient.open_file(path, "rb", connection_cache=self._connection_cache)
+
+    def glob_info(self, path: str, pattern: str = "*") -> list[RemoteFileInfo]:
+        base_path = Path(path)
+        path = self._ensure_unc_path(path)
+        result = []
+        for entry in smbclient.scandir(path, connection_cache=self._connection_cache):
+            item_path = (base_path / entry.name).as_posix()
+            if entry.is_dir() or not fnmatch.fnmatch(item_path, pattern):
+                continue
+            info = entry.smb_info
+            result.append(
+                RemoteFileInfo.from_datetime(
+                    item_path, info.end_of_file, info.last_write_time
+                )
+            )
+        return result
@@ -1,12 +1,21 @@
 import fnmatch
+import io
+from email.utils import parsedate_to_datetime
 from io import BytesIO
 from pathlib import Path
 from typing import IO, Literal
 
 from webdav3.client import Client
+from webdav3.urn import Urn
 
 from ..utils.common import ensure_path
-from .base import RemoteIO, RemotePathIsExistsError, RemotePathNotFoundError
+from .base import (
+    RemoteFileInfo,
+    RemoteIO,
+    RemotePathIsExistsError,
+    RemotePathNotFoundError,
+    RemoteRangeReader,
+)
 
 
 class WebdavStorage(RemoteIO):
@@ -152,3 +161,43 @@ class WebdavStorage(RemoteIO):
         from_remote_path = ensure_path(from_remote_path).as_posix()
         stream.seek(0)
         self._dav.download_from(stream, from_remote_path)
+
+    def open(self, path: str) -> IO[bytes]:
+        path = ensure_path(path).as_posix()
+        size = self._dav.info(path).get("size")
+        if size is None:
+            return super().open(path)
+
+        def _open_at(offset: int) -> IO[bytes]:
+            headers = [f"Range: bytes={offset}-"] if offset else None
+            res = self._dav.execute_request(
+                "download", Urn(path).quote(), headers_ext=headers
+            )
+            stream = res.raw
+            stream.decode_content = True
+            if offset and res.status_code != 206:
+                # the server ignored the range, skip to the offset ourselves
+                while offset > 0:
+                    chunk = stream.read(min(offset, 2**16))
+                    if not chunk:
+                        break
+                    offset -= len(chunk)
+            return stream
+
+        return io.BufferedReader(RemoteRangeReader(int(size), _open_at))
+
+    def glob_info(self, path: str, pattern: str = "*") -> list[RemoteFileInfo]:
+        path = ensure_path(path).as_posix()
+        result = []
+        for info in self._dav.list(path, get_info=True):
+            item_path = Path(path, Path(info["path"]).name).as_posix()
+            if info.get("isdir") or not fnmatch.fnmatch(item_path, pattern):
+                continue
+            size = info.get("size")
+            size = int(size) if size and size.isdigit() else None
+            try:
+                modified = parsedate_to_datetime(info.get("modified"))
+            except (TypeError, ValueError):
+                modified = None
+            result.append(RemoteFileInfo.from_datetime(item_path, size, modified))
+        return result
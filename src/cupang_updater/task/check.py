@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from ..meta import stop_event
+
+
+async def _stream_results[T](
+    results: Callable[[], AsyncIterator[T]], on_result: Callable[[T], None]
+):
+    async for result in results():
+        if stop_event.is_set():
+            break
+        if result is not None:
+            on_result(result)
+
+
+async def _cancel_pending():
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def run_update_checks[T](
+    results: Callable[[], AsyncIterator[T]],
+    limit: int,
+    on_result: Callable[[T], None],
+) -> None:
+    """
+    Run update checks on an event loop.
+
+    The checks are an async generator, the updaters batch them by themselves,
+    see UpdaterBase.get_updates. Synchronous work inside the checks, like
+    UpdaterBase.get_update, runs in a thread pool of the size of the limit.
+
+    Args:
+        results (Callable[[], AsyncIterator[T]]): A function returning the async
+            generator of the check results.
+        limit (int): How many checks run synchronous work at the same time.
+        on_result (Callable[[T], None]): Called in the calling thread with every
+            result as soon as it is yielded, unless it is None.
+
+    Note:
+        Ctrl-C sets stop_event and returns, checks that did not start are skipped.
+    """
+    limit = max(limit, 1)
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(limit, thread_name_prefix="update-check")
+    loop.set_default_executor(executor)
+    try:
+        loop.run_until_complete(_stream_results(results, on_result))
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        # don't wait for checks blocked on the network
+        executor.shutdown(wait=False, cancel_futures=True)
+        loop.run_until_complete(_cancel_pending())
+        loop.close()
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from threading import Thread
+from urllib.parse import urlsplit
+
+from ..config.config import Config
+from ..manager.plugin import get_plugin_updater
+from ..manager.server import get_server_updaters
+from ..utils.curl_multi import get_curl_engine
+from ..utils.http import can_pool, get_connection_pool
+from ..utils.http_replay import get_replay_server
+
+_MAX_WORKERS = 8
+
+
+def _add_hosts(hosts: dict[str, None], urls: list[str]):
+    for url in urls:
+        parsed = urlsplit(url)
+        if parsed.scheme and parsed.netloc:
+            hosts[f"{parsed.scheme}://{parsed.netloc}"] = None
+
+
+def get_api_hosts(config: Config) -> list[str]:
+    """
+    Get the api hosts the update checks of this run will send requests to.
+
+    Only the updaters of the server type and the updaters in update_order are
+    asked, and only for the plugins that are not excluded and have a config for
+    the updater.
+
+    Args:
+        config (Config): The configuration object containing update settings.
+
+    Returns:
+        list[str]: URLs with the scheme and host of every api, without duplicates.
+    """
+    hosts: dict[str, None] = {}
+    server = config.get("server").data or {}
+    if config.get("server.enable", True):
+        for updater in get_server_updaters(server.get("type")):
+            _add_hosts(hosts, updater.get_api_hosts(server))
+
+    update_order: list[str] = config.get("settings.update_order").data or []
+    updaters = [x for x in map(get_plugin_updater, update_order) if x is not None]
+    plugins: dict[str, dict] = config.get("plugins").data or {}
+    for plugin_data in plugins.values():
+        if plugin_data.get("exclude"):
+            continue
+        for updater in updaters:
+            plugin_config = plugin_data.get(updater.get_config_path())
+            if plugin_config:
+                _add_hosts(hosts, updater.get_api_hosts(plugin_config))
+    return list(hosts)
+
+
+def _warm(url: str):
+    # a failed connection is retried by the first request anyway
+    with suppress(OSError):
+        get_connection_pool().warm(url)
+
+
+def _warm_all(urls: list[str]):
+    with ThreadPoolExecutor(
+        min(len(urls), _MAX_WORKERS), thread_name_prefix="prewarm"
+    ) as executor:
+        executor.map(_warm, urls)
+
+
+def prewarm_api_hosts(urls: list[str]) -> Thread | None:
+    """
+    Open connections to the api hosts in the background, so the update checks
+    don't wait for DNS and TLS on their first request to every host.
+
+    Only the connection pool is warmed, the curl engine and the replay server
+    are left alone.
+
+    Args:
+        urls (list[str]): The api hosts, see get_api_hosts.
+
+    Returns:
+        Thread | None: The thread opening the connections, or None if there is
+            nothing to open.
+    """
+    if get_curl_engine() is not None or get_replay_server() is not None:
+        return None
+    urls = [x for x in urls if can_pool(x)]
+    if not urls:
+        return None
+    thread = Thread(target=_warm_all, args=(urls,), name="prewarm", daemon=True)
+    thread.start()
+    return thread
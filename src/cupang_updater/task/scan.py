@@ -1,55 +1,224 @@
+import hashlib
+import multiprocessing
 import re
-from io import BytesIO, StringIO
+import signal
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from io import StringIO
 from pathlib import Path
 
 import strictyaml as sy
+from rich.status import Status
 
 from ..cmd_opts import get_cmd_opts
 from ..config.config import Config
 from ..logger.logger import get_logger
-from ..manager.plugin import get_plugin_default
+from ..manager.plugin import get_plugin_default, get_plugin_updater
 from ..meta import get_appdir, stop_event
+from ..remote_storage.base import RemoteFileInfo, RemoteIO
 from ..remote_storage.remote import get_remote_connection
 from ..rich import get_rich_status
+from ..updater.base import ResourceData
 from ..utils.common import reindent
 from ..utils.config import fix_config
-from ..utils.hash import FileHash
-from ..utils.jar import get_jar_info, jar_rename
+from ..utils.fingerprint import (
+    FileStat,
+    Fingerprint,
+    FingerprintCache,
+    fingerprint_jar,
+    fingerprint_remote_jar,
+)
+from ..utils.hash import FileHash, Hashes
+from ..utils.jar import jar_rename
 from ..utils.rich import status_update
 
 
-# someday, would refactore this
-def scan_plugins(config: Config) -> None:  # noqa: C901
+def _get_fingerprint_cache(remote_url: str = None) -> FingerprintCache | None:
     """
-    Scans the plugins directory.
-
-    - Newly discovered plugins are added to the configuration with default values.
-    - Clean up the configuration after the scan.
+    Get the persistent fingerprint cache for plugin scans.
 
     Args:
-        config (Config): The configuration object that holds plugin settings.
+        remote_url (str, optional): The server folder url when scanning a remote
+            server. Every remote server gets its own cache file, so the same path
+            on two hosts never shares entries.
 
-    Raises:
-        FileNotFoundError: If the plugins folder does not exist.
+    Returns:
+        FingerprintCache | None: The fingerprint cache, or None if it is disabled
+            with `--no-scan-cache`.
     """
-    log = get_logger()
-    cmd_opts = get_cmd_opts()
+    if get_cmd_opts().no_scan_cache:
+        return None
+    cache_name = "fingerprints.json"
+    if remote_url:
+        digest = hashlib.sha1(remote_url.encode()).hexdigest()[:16]
+        cache_name = f"fingerprints-remote-{digest}.json"
+    return FingerprintCache(get_appdir().caches_path / cache_name)
+
+
+def _init_scan_worker():
+    """Let the main process handle Ctrl-C, it cancels the pool through stop_event."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _fingerprint_in_pool(
+    pending: list[tuple[str, FileStat]],
+    workers: int,
+    status: Status,
+    store: Callable[[str, FileStat, Fingerprint], None],
+):
+    """
+    Fingerprint jars across a process pool.
+
+    Args:
+        pending (list[tuple[str, FileStat]]): The jars to fingerprint.
+        workers (int): The number of worker processes.
+        status (Status): The rich status to report progress to.
+        store (Callable[[str, FileStat, Fingerprint], None]): Called with every
+            finished fingerprint, in completion order.
+    """
+    # spawn instead of fork, the rich status runs a thread in this process
+    worker = ProcessPoolExecutor(
+        min(workers, len(pending)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_scan_worker,
+    )
+    jobs: dict[Future, tuple[str, FileStat]] = {
+        worker.submit(fingerprint_jar, jar): (jar, jar_stat)
+        for jar, jar_stat in pending
+    }
+    not_done = set(jobs)
     try:
-        remote_connection = get_remote_connection()
-        remote_plugins_folder = Path(remote_connection.base_dir, "plugins").as_posix()
-        plugins_folder = get_appdir().caches_path / "plugins"
-        plugins_folder.mkdir(exist_ok=True)
-        is_remote = True
-    except RuntimeError:
-        plugins_folder = Path(config.get("settings.server_folder").data, "plugins")
-        is_remote = False
-    is_new_plugin = False
-    keep_removed: bool = config.get(
-        "settings.keep_removed", sy.YAML(False, sy.Bool())
-    ).data
-    if cmd_opts.force_cleanup:
-        keep_removed = False
+        while not_done and not stop_event.is_set():
+            done, not_done = wait(not_done, timeout=0.5, return_when=FIRST_COMPLETED)
+            for job in done:
+                jar, jar_stat = jobs[job]
+                status_update(status, f"Scanning plugins {Path(jar).name}", no_log=True)
+                store(jar, jar_stat, job.result())
+    except KeyboardInterrupt:
+        stop_event.set()
+        raise
+    finally:
+        worker.shutdown(wait=not stop_event.is_set(), cancel_futures=True)
+
+
+def _collect_local_fingerprints(
+    plugin_list: list[str],
+    fingerprint_cache: FingerprintCache | None,
+    workers: int,
+    status: Status,
+) -> dict[str, Fingerprint]:
+    """
+    Get the fingerprint of every local jar.
+
+    Unchanged jars are served from the fingerprint cache. The rest are hashed and
+    parsed, spread across a process pool when more than one worker is requested.
+
+    Args:
+        plugin_list (list[str]): The paths of the jar files.
+        fingerprint_cache (FingerprintCache | None): The fingerprint cache.
+        workers (int): The number of worker processes.
+        status (Status): The rich status to report progress to.
+
+    Returns:
+        dict[str, Fingerprint]: A mapping of jar path to its fingerprint. Jars that
+            were not scanned because of cancellation are missing.
+    """
+    fingerprints: dict[str, Fingerprint] = {}
+    pending: list[tuple[str, FileStat]] = []
+    for jar in plugin_list:
+        jar_stat = FileStat.from_path(jar)
+        fingerprint = (
+            fingerprint_cache.get(jar, jar_stat) if fingerprint_cache else None
+        )
+        if fingerprint:
+            fingerprints[jar] = fingerprint
+        else:
+            pending.append((jar, jar_stat))
+
+    def _store(jar: str, jar_stat: FileStat, fingerprint: Fingerprint):
+        fingerprints[jar] = fingerprint
+        if fingerprint_cache:
+            fingerprint_cache.put(jar, jar_stat, fingerprint)
+
+    if workers > 1 and len(pending) > 1:
+        _fingerprint_in_pool(pending, workers, status, _store)
+        return fingerprints
+
+    for jar, jar_stat in pending:
+        if stop_event.is_set():
+            break
+        status_update(status, f"Scanning plugins {Path(jar).name}", no_log=True)
+        _store(jar, jar_stat, fingerprint_jar(jar))
+    return fingerprints
+
+
+def _get_remote_stat(remote_file: RemoteFileInfo) -> FileStat | None:
+    """
+    Get the cache attributes of a remote file.
+
+    Args:
+        remote_file (RemoteFileInfo): The remote file from the directory listing.
+
+    Returns:
+        FileStat | None: The attributes, or None if the listing did not include
+            them and the file can not be validated against the cache.
+    """
+    if remote_file.size is None or remote_file.mtime_ns is None:
+        return None
+    return FileStat(remote_file.size, remote_file.mtime_ns)
+
+
+def _collect_remote_fingerprints(
+    remote_connection: RemoteIO,
+    remote_files: list[RemoteFileInfo],
+    fingerprint_cache: FingerprintCache | None,
+    status: Status,
+) -> dict[str, Fingerprint]:
+    """
+    Get the fingerprint of every remote jar.
+
+    Jars whose listed size and mtime match the fingerprint cache are not
+    transferred at all.
+
+    Args:
+        remote_connection (RemoteIO): The remote storage connection.
+        remote_files (list[RemoteFileInfo]): The remote jar files.
+        fingerprint_cache (FingerprintCache | None): The fingerprint cache.
+        status (Status): The rich status to report progress to.
+
+    Returns:
+        dict[str, Fingerprint]: A mapping of jar path to its fingerprint. Jars that
+            were not scanned because of cancellation are missing.
+    """
+    fingerprints: dict[str, Fingerprint] = {}
+    for remote_file in remote_files:
+        if stop_event.is_set():
+            break
+        jar = remote_file.path
+        jar_stat = _get_remote_stat(remote_file)
+        if fingerprint_cache and jar_stat:
+            fingerprint = fingerprint_cache.get(jar, jar_stat)
+            if fingerprint:
+                fingerprints[jar] = fingerprint
+                continue
+        status_update(status, f"Scanning plugins {Path(jar).name}", no_log=True)
+        fingerprint = fingerprint_remote_jar(remote_connection, jar)
+        fingerprints[jar] = fingerprint
+        if fingerprint_cache and jar_stat:
+            fingerprint_cache.put(jar, jar_stat, fingerprint)
+    return fingerprints
+
+
+def _load_plugins_config(config: Config) -> dict[str, sy.YAML]:
+    """
+    Get the plugins section of the config as {plugin_name: YAML}.
 
+    Args:
+        config (Config): The configuration object that holds plugin settings.
+
+    Returns:
+        dict[str, sy.YAML]: The config of every plugin.
+    """
     # updating YAML object directly is too slow
     # instead we create a new dict object that hold {plugin_name: YAML}
     # and use it to add new plugins
@@ -72,6 +241,275 @@ def scan_plugins(config: Config) -> None:  # noqa: C901
         plugins_config = plugins_config.data
     # ensure the typing
     plugins_config: dict[str, sy.YAML] = plugins_config
+    return plugins_config
+
+
+def _has_plugin_config(plugins_config: dict[str, sy.YAML], name: str) -> bool:
+    return bool(plugins_config.get(name, sy.YAML(None, sy.EmptyNone())).data)
+
+
+def _merge_fingerprint(
+    jar: str,
+    fingerprint: Fingerprint,
+    plugins_config: dict[str, sy.YAML],
+    fingerprint_cache: FingerprintCache | None,
+    remote_connection: RemoteIO = None,
+    remote_stat: FileStat | None = None,
+) -> bool:
+    """
+    Rename a scanned jar if needed and update its plugin config.
+
+    Args:
+        jar (str): The path of the jar file.
+        fingerprint (Fingerprint): The fingerprint of the jar file.
+        plugins_config (dict[str, sy.YAML]): The config of every plugin, updated
+            in place.
+        fingerprint_cache (FingerprintCache | None): The fingerprint cache.
+        remote_connection (RemoteIO, optional): The remote storage connection if
+            the jar is a remote path.
+        remote_stat (FileStat | None, optional): The listed attributes of the
+            remote jar.
+
+    Returns:
+        bool: True if the plugin config was changed.
+    """
+    log = get_logger()
+    file_hash = FileHash.with_known_hashes(jar, fingerprint.hashes)
+    jar_info = fingerprint.jar_info
+
+    jar_key = jar
+    jar = Path(jar)
+
+    # rename the jar in PluginName [Version].jar
+    if jar.name != f"{jar_info.name} [{jar_info.version}].jar":
+        new_jar = jar_rename(jar, jar_info, remote_connection)
+        log.info(
+            f"[green]Renaming [cyan]{Path(jar).name} "
+            + f"[green]-> [cyan]{new_jar.name}"
+        )
+        if fingerprint_cache:
+            fingerprint_cache.pop(jar_key)
+            if remote_connection:
+                # a remote rename keeps the size and mtime of the file
+                new_key, new_stat = new_jar.as_posix(), remote_stat
+            else:
+                new_key, new_stat = str(new_jar), FileStat.from_path(new_jar)
+            if new_stat:
+                fingerprint_cache.put(new_key, new_stat, fingerprint)
+        jar = new_jar
+
+    if (
+        _has_plugin_config(plugins_config, jar_info.name)
+        and file_hash.md5 == plugins_config[jar_info.name]["hashes"]["md5"].data
+        and jar.name == plugins_config[jar_info.name]["file"].data
+    ):
+        return False
+
+    # Why is this using a YAML object instead of a regular dict?
+    #
+    # This is because the `preserve_comments` feature of the strictyaml library
+    # allows comments to be preserved in the YAML file, but regular dictionaries
+    # don't have this ability.
+    #
+    # If the config for a plugin already exists, updating it will be slower
+    # because the YAML library needs to re-validate the entire config.
+    # Otherwise, it will be faster.
+    log.info(f"[green]Update config for {jar_info.name} [cyan]{jar.name}")
+
+    # use default_plugin_data if not exists
+    if not _has_plugin_config(plugins_config, jar_info.name):
+        plugin_data: sy.YAML = get_plugin_default()
+    else:
+        plugin_data = plugins_config[jar_info.name]
+
+    plugin_data["file"] = jar.name
+    plugin_data["version"] = jar_info.version
+    plugin_data["authors"] = jar_info.authors
+
+    plugin_hashes = plugin_data["hashes"]
+    plugin_hashes["md5"] = file_hash.md5
+    plugin_hashes["sha1"] = file_hash.sha1
+    plugin_hashes["sha256"] = file_hash.sha256
+    plugin_hashes["sha512"] = file_hash.sha512
+
+    plugins_config[jar_info.name] = plugin_data
+    return True
+
+
+def _remove_deleted_plugins(
+    plugins_config: dict[str, sy.YAML],
+    plugins_folder: Path,
+    files: set[str] = None,
+) -> bool:
+    """
+    Remove the config of plugins whose jar is no longer in the plugins folder.
+
+    Args:
+        plugins_config (dict[str, sy.YAML]): The config of every plugin, updated
+            in place.
+        plugins_folder (Path): The plugins folder.
+        files (set[str], optional): Only check the plugins whose jar has one of
+            these file names. Defaults to checking every plugin.
+
+    Returns:
+        bool: True if any plugin config was removed.
+    """
+    log = get_logger()
+    removed = False
+    for name in list(plugins_config.keys()).copy():
+        file = plugins_config[name].data["file"]
+        if files is not None and file not in files:
+            continue
+        if Path(plugins_folder, file).exists():
+            continue
+        log.info(f"[red]Removing {name} from config")
+        del plugins_config[name]
+        removed = True
+    return removed
+
+
+def _write_plugins_config(
+    config: Config, plugins_config: dict[str, sy.YAML], status: Status
+):
+    """
+    Fix the config of every plugin and write the plugins section to the config.
+
+    Args:
+        config (Config): The configuration object that holds plugin settings.
+        plugins_config (dict[str, sy.YAML]): The config of every plugin.
+        status (Status): The rich status to report progress to.
+    """
+    status_update(status, "Fixing Config")
+    for name in plugins_config:
+        fix_config(
+            plugins_config[name],
+            get_plugin_default(),
+            name,
+        )
+    status_update(status, "Finished Fixing Config")
+
+    # this part also fix the yaml comment by editing it as yaml text
+    status_update(status, "Updating Config")
+    sorted_plugins = sorted(plugins_config.keys(), key=lambda k: k.lower())
+    with StringIO() as temp:
+        temp.write("plugins:\n")
+        inline_comment_regex = re.compile(r"(\s+)#")
+        for name in sorted_plugins:
+            temp.write(reindent(f"{name}:\n", 2))
+            for line in plugins_config[name].as_yaml().splitlines():
+                if not line.lstrip().startswith("#"):
+                    # remove excessive whitespaces between inline comments
+                    line = inline_comment_regex.sub(" #", line)
+                    # .as_yaml() already dedent the yaml, we only need to add indent
+                    line = " " * 4 + line
+                else:
+                    # indent the mapping comment
+                    line = reindent(line, 6)
+                temp.write(line + "\n")
+
+        data = sy.load(
+            temp.getvalue(), sy.Map({"plugins": config.get("plugins").validator})
+        )
+        config.set("plugins", data["plugins"])
+        config.save()
+        config.reload()
+    status_update(status, "Config updated")
+
+
+def _identify_plugins(
+    config: Config, plugins_config: dict[str, sy.YAML], names: set[str]
+) -> set[str]:
+    """
+    Look the new plugins up by their hashes and fill the config of the updaters
+    that found them, see PluginUpdater.identify.
+
+    Only the updaters in update_order are asked, in that order, and a config
+    block the user already filled is never touched.
+
+    Args:
+        config (Config): The configuration object that holds plugin settings.
+        plugins_config (dict[str, sy.YAML]): The config of every plugin, updated
+            in place.
+        names (set[str]): The names of the new plugins.
+
+    Returns:
+        set[str]: The names of the plugins that got an updater config.
+    """
+    log = get_logger()
+    identified: set[str] = set()
+    update_order: list[str] = config.get("settings.update_order").data or []
+    plugin_default = get_plugin_default().data
+    for updater in filter(None, map(get_plugin_updater, update_order)):
+        config_path = updater.get_config_path()
+        plugins = {
+            name: ResourceData(
+                name,
+                plugins_config[name]["version"].data,
+                Hashes(**plugins_config[name]["hashes"].data),
+            )
+            for name in sorted(names)
+            if name in plugins_config
+            and plugins_config[name].data.get(config_path)
+            == plugin_default.get(config_path)
+        }
+        if not plugins:
+            continue
+        try:
+            found = updater.identify(plugins)
+        except Exception:
+            log.getChild(updater.get_updater_name()).exception(
+                "Failed to identify the new plugins"
+            )
+            continue
+        for name, updater_config in found.items():
+            if name not in plugins:
+                continue
+            for key, value in updater_config.items():
+                plugins_config[name][config_path][key] = value
+            log.info(f"[green]Found {name} on {updater.get_updater_name()}")
+            identified.add(name)
+    return identified
+
+
+def _keep_removed(config: Config) -> bool:
+    if get_cmd_opts().force_cleanup:
+        return False
+    return config.get("settings.keep_removed", sy.YAML(False, sy.Bool())).data
+
+
+# someday, would refactore this
+def scan_plugins(config: Config, exit_on_new_plugin: bool = True) -> None:  # noqa: C901
+    """
+    Scans the plugins directory.
+
+    - Newly discovered plugins are added to the configuration with default values,
+      and looked up by their hashes to fill the updater config where possible.
+    - Clean up the configuration after the scan.
+
+    Args:
+        config (Config): The configuration object that holds plugin settings.
+        exit_on_new_plugin (bool, optional): Exit after the scan when a new plugin
+            was found, so its config can be filled. Defaults to True.
+
+    Raises:
+        FileNotFoundError: If the plugins folder does not exist.
+    """
+    log = get_logger()
+    cmd_opts = get_cmd_opts()
+    try:
+        remote_connection = get_remote_connection()
+        remote_plugins_folder = Path(remote_connection.base_dir, "plugins").as_posix()
+        plugins_folder = get_appdir().caches_path / "plugins"
+        plugins_folder.mkdir(exist_ok=True)
+        is_remote = True
+    except RuntimeError:
+        remote_connection = None
+        plugins_folder = Path(config.get("settings.server_folder").data, "plugins")
+        is_remote = False
+    new_plugins: set[str] = set()
+    keep_removed = _keep_removed(config)
+
+    plugins_config = _load_plugins_config(config)
 
     status = get_rich_status()
 
@@ -88,140 +526,66 @@ def scan_plugins(config: Config) -> None:  # noqa: C901
             )
             raise FileNotFoundError
 
+        remote_stats: dict[str, FileStat | None] = {}
         if is_remote:
-            plugin_list = [
-                str(p) for p in remote_connection.glob(remote_plugins_folder, "*.jar")
-            ]
+            remote_files = sorted(
+                remote_connection.glob_info(remote_plugins_folder, "*.jar"),
+                key=lambda x: Path(x.path).name,
+            )
+            plugin_list = [x.path for x in remote_files]
         else:
             plugin_list = [str(p) for p in plugins_folder.glob("*.jar")]
 
         plugin_list = sorted(plugin_list, key=lambda x: Path(x).name)
 
+        if is_remote:
+            fingerprint_cache = _get_fingerprint_cache(
+                config.get("settings.server_folder").data
+            )
+            remote_stats = {x.path: _get_remote_stat(x) for x in remote_files}
+            fingerprints = _collect_remote_fingerprints(
+                remote_connection, remote_files, fingerprint_cache, status
+            )
+        else:
+            fingerprint_cache = _get_fingerprint_cache()
+            fingerprints = _collect_local_fingerprints(
+                plugin_list, fingerprint_cache, cmd_opts.scan_workers, status
+            )
+
+        # merge in plugin_list order so the result does not depend on the workers
         for jar in plugin_list:
             if stop_event.is_set():
                 break
-            if is_remote:
-                with BytesIO() as f:
-                    remote_connection.downloadfo(jar, f)
-                    f.seek(0)
-                    file_hash = FileHash(f)
-                    for h in ["md5", "sha1", "sha256", "sha512"]:
-                        file_hash._get_hash(h)
-                    f.seek(0)
-                    jar_info = get_jar_info(f)
-            else:
-                file_hash = FileHash(jar)
-                for h in ["md5", "sha1", "sha256", "sha512"]:
-                    file_hash._get_hash(h)
-                jar_info = get_jar_info(jar)
-
-            status_update(status, f"Scanning plugins {jar_info.name}", no_log=True)
-
-            jar = Path(jar)
-
-            # rename the jar in PluginName [Version].jar
-            if jar.name != f"{jar_info.name} [{jar_info.version}].jar":
-                new_jar = jar_rename(
-                    jar,
-                    jar_info,
-                    remote_connection if is_remote else None,
-                )
-                log.info(
-                    f"[green]Renaming [cyan]{Path(jar).name} "
-                    + f"[green]-> [cyan]{new_jar.name}"
-                )
-                jar = new_jar
-
-            default_plugin_data = get_plugin_default()
-
-            if plugins_config.get(jar_info.name, sy.YAML(None, sy.EmptyNone())).data:
-                if (
-                    file_hash.md5 == plugins_config[jar_info.name]["hashes"]["md5"].data
-                    and jar.name == plugins_config[jar_info.name]["file"].data
-                ):
-                    continue
-            else:
-                is_new_plugin = True
-
-            # Why is this using a YAML object instead of a regular dict?
-            #
-            # This is because the `preserve_comments` feature of the strictyaml library
-            # allows comments to be preserved in the YAML file, but regular dictionaries
-            # don't have this ability.
-            #
-            # If the config for a plugin already exists, updating it will be slower
-            # because the YAML library needs to re-validate the entire config.
-            # Otherwise, it will be faster.
-            log.info(f"[green]Update config for {jar_info.name} [cyan]{jar.name}")
-
-            # use default_plugin_data if not exists
-            if not plugins_config.get(
-                jar_info.name, sy.YAML(None, sy.EmptyNone())
-            ).data:
-                plugin_data: sy.YAML = default_plugin_data
-            else:
-                plugin_data = plugins_config[jar_info.name]
-
-            plugin_data["file"] = jar.name
-            plugin_data["version"] = jar_info.version
-            plugin_data["authors"] = jar_info.authors
-
-            plugin_hashes = plugin_data["hashes"]
-            plugin_hashes["md5"] = file_hash.md5
-            plugin_hashes["sha1"] = file_hash.sha1
-            plugin_hashes["sha256"] = file_hash.sha256
-            plugin_hashes["sha512"] = file_hash.sha512
-
-            plugins_config[jar_info.name] = plugin_data
+            fingerprint = fingerprints.get(jar)
+            if not fingerprint:
+                continue
+            if not _has_plugin_config(plugins_config, fingerprint.jar_info.name):
+                new_plugins.add(fingerprint.jar_info.name)
+            _merge_fingerprint(
+                jar,
+                fingerprint,
+                plugins_config,
+                fingerprint_cache,
+                remote_connection,
+                remote_stats.get(jar),
+            )
 
+        if fingerprint_cache:
+            fingerprint_cache.save()
         status_update(status, "Finished Scanning Plugins")
 
         if not keep_removed:
             status_update(status, "Remove deleted plugin")
-
-            for name in list(plugins_config.keys()).copy():
-                if Path(plugins_folder, plugins_config[name].data["file"]).exists():
-                    continue
-                log.info(f"[red]Removing {name} from config")
-                del plugins_config[name]
+            _remove_deleted_plugins(plugins_config, plugins_folder)
             status_update(status, "Finished removing plugins")
 
-        status_update(status, "Fixing Config")
-        for name in plugins_config:
-            fix_config(
-                plugins_config[name],
-                get_plugin_default(),
-                name,
-            )
-        status_update(status, "Finished Fixing Config")
-
-        # this part also fix the yaml comment by editing it as yaml text
-        status_update(status, "Updating Config")
-        sorted_plugins = sorted(plugins_config.keys(), key=lambda k: k.lower())
-        with StringIO() as temp:
-            temp.write("plugins:\n")
-            inline_comment_regex = re.compile(r"(\s+)#")
-            for name in sorted_plugins:
-                temp.write(reindent(f"{name}:\n", 2))
-                for line in plugins_config[name].as_yaml().splitlines():
-                    if not line.lstrip().startswith("#"):
-                        # remove excessive whitespaces between inline comments
-                        line = inline_comment_regex.sub(" #", line)
-                        # .as_yaml() already dedent the yaml, we only need to add indent
-                        line = " " * 4 + line
-                    else:
-                        # indent the mapping comment
-                        line = reindent(line, 6)
-                    temp.write(line + "\n")
-
-            data = sy.load(
-                temp.getvalue(), sy.Map({"plugins": config.get("plugins").validator})
-            )
-            config.set("plugins", data["plugins"])
-            config.save()
-            config.reload()
-        status_update(status, "Config updated")
+        if new_plugins and not cmd_opts.no_identify:
+            status_update(status, f"Identifying {len(new_plugins)} new plugins")
+            new_plugins -= _identify_plugins(config, plugins_config, new_plugins)
+
+        _write_plugins_config(config, plugins_config, status)
 
-        if is_new_plugin:
+        if new_plugins:
             log.info("[green]You have new plugin, please fill the config")
-            exit()
+            if exit_on_new_plugin:
+                exit()
@@ -1,16 +1,20 @@
 import time
+from collections.abc import AsyncIterator, Callable
 from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import strictyaml as sy
 from cupang_downloader.downloader import DownloadJob
 
 from ..cmd_opts import get_cmd_opts
 from ..config.config import Config
-from ..downloader.downloader import get_downloader
+from ..downloader.downloader import get_downloader, get_stream_downloader
 from ..downloader.progress import get_callbacks, get_progress
+from ..downloader.stream import ContentTypeError, StreamJob
 from ..logger.logger import get_logger
 from ..manager.plugin import get_plugin_updater
 from ..manager.server import get_server_updaters
@@ -18,42 +22,102 @@ from ..meta import get_appdir, stop_event
 from ..remote_storage.base import RemoteIO
 from ..remote_storage.remote import get_remote_connection
 from ..rich import get_rich_live, get_rich_status
-from ..updater.base import Hashes, ResourceData
+from ..updater.base import DownloadInfo, ResourceData
 from ..updater.plugin.base import PluginUpdater, PluginUpdaterConfig
 from ..updater.server.base import ServerUpdater, ServerUpdaterConfig
 from ..utils.date import parse_date_datetime
-from ..utils.hash import FileHash
+from ..utils.hash import FileHash, Hashes
 from ..utils.jar import get_jar_info, jar_rename
+from ..utils.rate_limit import get_rate_limiter
 from ..utils.rich import status_update
+from ..utils.url import get_expected_content_types
+from .check import run_update_checks
 
 DL_CALLBACKS = get_callbacks()
 
 
-def _handle_download(job: DownloadJob) -> bool:
+def _make_download_job(
+    url: str, download_path: Path, headers: dict[str, str], progress_name: str
+) -> DownloadJob | StreamJob:
+    """
+    Create a download job for the configured downloader.
+
+    Args:
+        url (str): The URL of the file.
+        download_path (Path): Where the file is saved.
+        headers (dict[str, str]): Additional HTTP headers to send.
+        progress_name (str): The name shown in the progress bar.
+
+    Returns:
+        DownloadJob | StreamJob: A StreamJob if the downloader can hash the file
+            while downloading, otherwise a DownloadJob. A StreamJob also checks the
+            content types the updater expects for the URL.
+    """
+    if get_stream_downloader():
+        return StreamJob(
+            url,
+            download_path,
+            headers,
+            progress_name,
+            content_types=get_expected_content_types(url),
+        )
+    return DownloadJob(url, download_path, headers, progress_name)
+
+
+def _get_download_hashes(job: DownloadJob | StreamJob, file: Path) -> Hashes:
+    """
+    Get the hashes of a downloaded file.
+
+    Args:
+        job (DownloadJob | StreamJob): The finished download job.
+        file (Path): The downloaded file.
+
+    Returns:
+        Hashes: The hashes computed while streaming, or read from the file
+            if the downloader could not hash it.
+    """
+    if isinstance(job, StreamJob) and job.hashes:
+        return job.hashes
+    return FileHash(file).compute()
+
+
+def _handle_download(job: DownloadJob | StreamJob) -> bool:
     """
     Handles the download of a file.
 
     Args:
-        job (DownloadJob): The download job to handle.
+        job (DownloadJob | StreamJob): The download job to handle.
 
     Returns:
         bool: True if the download was successful, False otherwise.
+
+    Raises:
+        ContentTypeError: If the file has a content type the updater does not
+            expect, the download is not retried.
     """
     log = get_logger()
     is_dl_error = False
+    content_type_error: ContentTypeError = None
     max_retries: int = get_cmd_opts().max_retries
     retries = 0
     max_wait_time = 10  # Max wait time in seconds
 
     def _on_error(j, err):
         DL_CALLBACKS["on_error"](j, err)
-        nonlocal is_dl_error
+        nonlocal is_dl_error, content_type_error
         is_dl_error = True
+        if isinstance(err, ContentTypeError):
+            content_type_error = err
 
     while retries <= max_retries:
         is_dl_error = False
         try:
-            get_downloader().dl(
+            downloader = (
+                get_stream_downloader()
+                if isinstance(job, StreamJob)
+                else get_downloader()
+            )
+            downloader.dl(
                 job,
                 on_start=DL_CALLBACKS["on_start"],
                 on_finish=DL_CALLBACKS["on_finish"],
@@ -71,9 +135,15 @@ def _handle_download(job: DownloadJob) -> bool:
             is_dl_error = False
         if not is_dl_error:
             break
+        if content_type_error:
+            # the same url will serve the same content type again
+            raise content_type_error
         retries += 1
 
-        wait_time = min(max_wait_time, 2**retries - 1)
+        # wait for the host if its api told us when it takes requests again
+        parsed = urlsplit(job.url)
+        host_delay = get_rate_limiter().delay(parsed.hostname or "", parsed.path)
+        wait_time = max(min(max_wait_time, 2**retries - 1), host_delay)
         log.warning(
             f"Download failed, retrying in {wait_time} seconds... "
             + f"(Attempt {retries}/{max_retries})"
@@ -141,35 +211,38 @@ def _handle_server_update(
         if not update_data:
             continue
 
-        if not _handle_download(
-            DownloadJob(
-                update_data.url,
-                server_file,
-                update_data.headers,
-                f"[{updater.get_updater_name()}] {server_type}",
-            ),
-        ):
-            return
+        job = _make_download_job(
+            update_data.url,
+            server_file,
+            update_data.headers,
+            f"[{updater.get_updater_name()}] {server_type}",
+        )
+        try:
+            if not _handle_download(job):
+                return
+        except ContentTypeError:
+            log.error(f"Trying another server updater for {server_type}")
+            continue
 
-        server_hash = FileHash(server_file)
-        for h in ["md5", "sha1", "sha256", "sha512"]:
-            server_hash._get_hash(h)
-        resource_data.hashes = server_hash._hashes
+        resource_data.hashes = _get_download_hashes(job, server_file)
 
         return updater.get_config_path(), resource_data, updater.get_config_update()
 
 
-def _handle_plugin_update(
-    updater_list: list[type[PluginUpdater]],
-    plugins_folder: Path,
-    plugin_name: str,
-    plugin_data: dict,
-    plugin_common: dict = None,
-) -> tuple[str, Path, ResourceData, PluginUpdaterConfig] | None:
-    log = get_logger()
-    plugin_file: Path = plugins_folder / plugin_data["file"]
-    plugin_version: str = plugin_data["version"]
+def _get_plugin_resource_data(
+    plugin_name: str, plugin_file: Path, plugin_data: dict
+) -> ResourceData:
+    """
+    Get the plugin data that is passed to the plugin updaters.
+
+    Args:
+        plugin_name (str): The name of the plugin.
+        plugin_file (Path): The plugin file.
+        plugin_data (dict): The config of the plugin.
 
+    Returns:
+        ResourceData: The plugin data.
+    """
     if plugin_file.exists():
         if plugin_data["hashes"]["md5"]:
             plugin_hash = FileHash.with_known_hashes(
@@ -181,60 +254,155 @@ def _handle_plugin_update(
     else:
         plugin_hash = FileHash.with_known_hashes(plugin_file, Hashes())
 
-    resource_data = ResourceData(
-        plugin_name,
-        plugin_version,
-        plugin_hash._hashes,
-    )
+    return ResourceData(plugin_name, plugin_data["version"], plugin_hash._hashes)
+
+
+async def _check_plugin_updates(
+    updater_list: list[type[PluginUpdater]],
+    plugins: dict[str, tuple[ResourceData, Path, dict]],
+    plugin_common: dict = None,
+) -> AsyncIterator[tuple[PluginUpdater, DownloadInfo, Path, ResourceData]]:
+    """
+    Find the first updater that has an update for every plugin.
+
+    Every updater gets the plugins it has a config for in one batch, see
+    PluginUpdater.get_updates. Plugins without an update are passed on to the
+    next updater in update order.
+
+    Args:
+        updater_list (list[type[PluginUpdater]]): The updaters, in update order.
+        plugins (dict[str, tuple[ResourceData, Path, dict]]): The plugin data,
+            the plugin file and the config of every plugin, by plugin name.
+        plugin_common (dict, optional): The common config of the plugin updaters.
+
+    Yields:
+        tuple[PluginUpdater, DownloadInfo, Path, ResourceData]: The updater,
+            its update, the plugin file and the plugin data, as soon as an
+            update is found.
+    """
+    log = get_logger()
+    plugin_common = plugin_common or {}
+    remaining = dict(plugins)
     for updater in updater_list:
-        if stop_event.is_set():
+        if stop_event.is_set() or not remaining:
             break
-        updater = updater(
-            resource_data,
-            PluginUpdaterConfig(
-                common_config=deepcopy(
-                    plugin_common.get(updater.get_config_path(), {})
+        config_path = updater.get_config_path()
+        items = [
+            (
+                resource_data,
+                PluginUpdaterConfig(
+                    common_config=deepcopy(plugin_common.get(config_path, {})),
+                    plugin_config=deepcopy(plugin_data[config_path]),
                 ),
-                plugin_config=deepcopy(plugin_data.get(updater.get_config_path(), {})),
-            ),
-        )
-        try:
-            update_data = updater.get_update()
-        except Exception as e:
-            updater.log.exception(f"Failed to get plugin update: {e}")
-            log.error(f"Trying another plugin updater for {plugin_name}")
+            )
+            for resource_data, _, plugin_data in remaining.values()
+            if plugin_data.get(config_path)
+        ]
+        if not items:
             continue
+        try:
+            async for plugin_updater, update_data in updater.get_updates(items):
+                if not update_data:
+                    continue
+                plugin_name = plugin_updater.plugin_data.name
+                if plugin_name not in remaining:
+                    continue
+                resource_data, plugin_file, _ = remaining.pop(plugin_name)
+                yield plugin_updater, update_data, plugin_file, resource_data
+        except Exception:
+            log.getChild(updater.get_updater_name()).exception(
+                "Failed to get plugin updates"
+            )
 
-        if not update_data:
-            continue
 
-        new_plugin_file = plugin_file.with_name(f"{plugin_name} [Latest].jar")
+def _find_next_plugin_update(
+    updater_list: list[type[PluginUpdater]],
+    plugins: dict[str, tuple[ResourceData, Path, dict]],
+    plugin_common: dict,
+    updater: PluginUpdater,
+    resource_data: ResourceData,
+) -> tuple[PluginUpdater, DownloadInfo, Path, ResourceData] | None:
+    """
+    Find an update for a plugin with the updaters after the given one.
 
-        if not _handle_download(
-            DownloadJob(
-                update_data.url,
-                new_plugin_file,
-                update_data.headers,
-                f"[{updater.get_updater_name()}] {plugin_name}",
-            )
-        ):
-            return
+    Args:
+        updater_list (list[type[PluginUpdater]]): The updaters, in update order.
+        plugins (dict[str, tuple[ResourceData, Path, dict]]): The plugin data,
+            the plugin file and the config of every plugin, by plugin name.
+        plugin_common (dict): The common config of the plugin updaters.
+        updater (PluginUpdater): The updater whose update could not be used.
+        resource_data (ResourceData): The plugin data.
 
-        jar_info = get_jar_info(new_plugin_file)
-        new_plugin_file = jar_rename(new_plugin_file, jar_info)
-        plugin_hash = FileHash(new_plugin_file)
-        for h in ["md5", "sha1", "sha256", "sha512"]:
-            plugin_hash._get_hash(h)
+    Returns:
+        tuple[PluginUpdater, DownloadInfo, Path, ResourceData] | None: The same
+            as _check_plugin_updates yields, or None if no other updater has
+            an update.
+    """
+    if type(updater) not in updater_list:
+        return None
+    _, plugin_file, plugin_data = plugins[resource_data.name]
+    results = []
+    run_update_checks(
+        partial(
+            _check_plugin_updates,
+            updater_list[updater_list.index(type(updater)) + 1 :],
+            {resource_data.name: (resource_data, plugin_file, plugin_data)},
+            plugin_common,
+        ),
+        1,
+        results.append,
+    )
+    return results[0] if results else None
 
-        resource_data.version = jar_info.version
-        resource_data.hashes = plugin_hash
 
-        return (
-            updater.get_config_path(),
-            new_plugin_file,
-            resource_data,
-            updater.get_config_update(),
-        )
+def _handle_plugin_update(
+    updater: PluginUpdater,
+    update_data: DownloadInfo,
+    plugin_file: Path,
+    resource_data: ResourceData,
+    find_next_update: Callable[
+        [PluginUpdater, ResourceData],
+        tuple[PluginUpdater, DownloadInfo, Path, ResourceData] | None,
+    ] = None,
+) -> tuple[str, Path, ResourceData, PluginUpdaterConfig] | None:
+    log = get_logger()
+    plugin_name = resource_data.name
+    new_plugin_file = plugin_file.with_name(f"{plugin_name} [Latest].jar")
+
+    job = _make_download_job(
+        update_data.url,
+        new_plugin_file,
+        update_data.headers,
+        f"[{updater.get_updater_name()}] {plugin_name}",
+    )
+    try:
+        if not _handle_download(job):
+            return
+    except ContentTypeError:
+        if find_next_update is None or stop_event.is_set():
+            return
+        log.error(f"Trying another plugin updater for {plugin_name}")
+        next_update = find_next_update(updater, resource_data)
+        if next_update is None:
+            return
+        return _handle_plugin_update(*next_update, find_next_update)
+
+    # get_jar_info only reads the zip central directory and the descriptor,
+    # the hashes were already computed while downloading
+    jar_info = get_jar_info(new_plugin_file)
+    plugin_hash = _get_download_hashes(job, new_plugin_file)
+    new_plugin_file = jar_rename(new_plugin_file, jar_info)
+    plugin_hash = FileHash.with_known_hashes(new_plugin_file, plugin_hash)
+
+    resource_data.version = jar_info.version
+    resource_data.hashes = plugin_hash
+
+    return (
+        updater.get_config_path(),
+        new_plugin_file,
+        resource_data,
+        updater.get_config_update(),
+    )
 
 
 def _handle_plugin_meta_update(
@@ -389,6 +557,7 @@ def update_plugin(config: Config) -> None:  # noqa: C901
 
         with ThreadPoolExecutor(cmd_opts.parallel_downloads) as worker:
             jobs: list[Future] = []
+            checked_plugins: dict[str, tuple[ResourceData, Path, dict]] = {}
             status_update(status, "Updating plugins")
             for plugin_name, plugin_data in plugins.items():
                 status_update(status, f"Adding job for {plugin_name}", no_log=True)
@@ -409,17 +578,36 @@ def update_plugin(config: Config) -> None:  # noqa: C901
                     log.warning(f"Plugin {plugin_name} is a leftover, skipping")
                     continue
 
-                jobs.append(
-                    worker.submit(
-                        _handle_plugin_update,
-                        updater_list,
-                        plugins_folder,
-                        plugin_name,
-                        plugin_data,
-                        config.get("updater_settings.plugin").data,
-                    )
+                plugin_file = plugins_folder / plugin_data["file"]
+                checked_plugins[plugin_name] = (
+                    _get_plugin_resource_data(plugin_name, plugin_file, plugin_data),
+                    plugin_file,
+                    plugin_data,
                 )
 
+            # downloads start as soon as their check finds an update
+            status_update(
+                status, f"Checking {len(checked_plugins)} plugins for updates"
+            )
+            plugin_common = config.get("updater_settings.plugin").data
+            # a download with the wrong content type falls through to the
+            # next updater in update order
+            find_next_update = partial(
+                _find_next_plugin_update, updater_list, checked_plugins, plugin_common
+            )
+            run_update_checks(
+                partial(
+                    _check_plugin_updates,
+                    updater_list,
+                    checked_plugins,
+                    plugin_common,
+                ),
+                cmd_opts.parallel_checks,
+                lambda result: jobs.append(
+                    worker.submit(_handle_plugin_update, *result, find_next_update)
+                ),
+            )
+
             status_update(status, "All job added, waiting for completion")
             try:
                 while not all([x.done() for x in jobs]) and not stop_event.is_set():
@@ -483,6 +671,32 @@ def update_plugin(config: Config) -> None:  # noqa: C901
             status_update(status, "Finished updating plugins")
 
 
+def get_remaining_cooldown(config: Config) -> timedelta | None:
+    """
+    Get how long until the next update check, see settings.update_cooldown.
+
+    Args:
+        config (Config): The configuration object containing update settings.
+
+    Returns:
+        timedelta | None: The remaining cooldown, or None if the update is due
+            or --force is set.
+    """
+    last_update = config.get("last_update").data
+    if not last_update or get_cmd_opts().force:
+        return None
+    today = parse_date_datetime(datetime.now())
+    last_update = parse_date_datetime(last_update)
+    cooldown = timedelta(
+        hours=config.get("settings.update_cooldown", sy.YAML(12, sy.Int())).data
+    )
+
+    # Check time elapsed since the last update
+    if (today - last_update) <= cooldown:
+        return (last_update + cooldown) - today
+    return None
+
+
 def update_all(config: Config) -> None:
     """
     Update the server and plugins.
@@ -491,24 +705,13 @@ def update_all(config: Config) -> None:
         config (Config): The configuration object containing update settings.
     """
     log = get_logger()
-    cmd_opts = get_cmd_opts()
-    last_update = config.get("last_update").data
-    if last_update and not cmd_opts.force:
-        today = parse_date_datetime(datetime.now())
-        last_update = parse_date_datetime(last_update)
-        cooldown = timedelta(
-            hours=config.get("settings.update_cooldown", sy.YAML(12, sy.Int())).data
+    remaining = get_remaining_cooldown(config)
+    if remaining is not None:
+        log.info(
+            "Updater still in cooldown, "
+            + f"{round(remaining.total_seconds() / 3600)} hours remaining"
         )
-
-        # Check time elapsed since the last update
-        if (today - last_update) <= cooldown:
-            # Calculate the remaining time
-            remaining = (last_update + cooldown) - today
-            log.info(
-                "Updater still in cooldown, "
-                + f"{round(remaining.total_seconds() / 3600)} hours remaining"
-            )
-            return
+        return
 
     update_server(config)
     update_plugin(config)
@@ -0,0 +1,177 @@
+from pathlib import Path
+
+import strictyaml as sy
+
+from ..cmd_opts import get_cmd_opts
+from ..config.config import Config
+from ..logger.logger import get_logger
+from ..meta import stop_event
+from ..remote_storage.remote import get_remote_connection
+from ..rich import get_rich_status
+from ..utils.fingerprint import FileStat, FingerprintCache, fingerprint_jar
+from ..utils.url import clear_shared_responses
+from ..utils.watch import FolderWatcher, get_folder_watcher
+from .scan import (
+    _get_fingerprint_cache,
+    _has_plugin_config,
+    _identify_plugins,
+    _keep_removed,
+    _load_plugins_config,
+    _merge_fingerprint,
+    _remove_deleted_plugins,
+    _write_plugins_config,
+    scan_plugins,
+)
+
+# how long to wait for events before checking stop_event again
+_READ_TIMEOUT = 1.0
+# changes are collected until the folder has been quiet for this long,
+# so copying a batch of jars results in a single config update
+_DEBOUNCE = 1.0
+
+
+def _wait_for_changes(watcher: FolderWatcher) -> set[str] | None:
+    """
+    Wait for a batch of changes in the plugins folder.
+
+    Returns:
+        set[str] | None: The changed file names, empty if stop_event was set,
+            None if the whole folder has to be rescanned.
+    """
+    names: set[str] | None = set()
+    while not stop_event.is_set() and not names:
+        names = watcher.read(_READ_TIMEOUT)
+        if names is None:
+            return None
+    while not stop_event.is_set():
+        more = watcher.read(_DEBOUNCE)
+        if more is None:
+            return None
+        if not more:
+            break
+        names |= more
+    return names
+
+
+def _scan_changed_jars(
+    names: set[str],
+    plugins_folder: Path,
+    plugins_config: dict[str, sy.YAML],
+    fingerprint_cache: FingerprintCache | None,
+) -> tuple[bool, set[str]]:
+    """
+    Re-hash and re-parse the changed jars and update their plugin config.
+
+    Args:
+        names (set[str]): The changed file names.
+        plugins_folder (Path): The plugins folder.
+        plugins_config (dict[str, sy.YAML]): The config of every plugin, updated
+            in place.
+        fingerprint_cache (FingerprintCache | None): The fingerprint cache.
+
+    Returns:
+        tuple[bool, set[str]]: True if any plugin config was changed, and the
+            names of the new plugins.
+    """
+    log = get_logger()
+    changed = False
+    new_plugins: set[str] = set()
+    for name in sorted(names):
+        jar = Path(plugins_folder, name)
+        if jar.suffix != ".jar" or not jar.is_file():
+            continue
+        try:
+            jar_stat = FileStat.from_path(jar)
+            fingerprint = (
+                fingerprint_cache.get(str(jar), jar_stat) if fingerprint_cache else None
+            )
+            if not fingerprint:
+                fingerprint = fingerprint_jar(jar)
+                if fingerprint_cache:
+                    fingerprint_cache.put(str(jar), jar_stat, fingerprint)
+        except Exception as e:
+            # usually a jar that is still being copied, it is picked up again
+            # once it changes
+            log.warning(f"[yellow]Could not scan [cyan]{name}[yellow]: {e}")
+            continue
+        if not _has_plugin_config(plugins_config, fingerprint.jar_info.name):
+            new_plugins.add(fingerprint.jar_info.name)
+        changed |= _merge_fingerprint(
+            str(jar), fingerprint, plugins_config, fingerprint_cache
+        )
+    return changed, new_plugins
+
+
+def _watch_changes(
+    watcher: FolderWatcher,
+    config: Config,
+    plugins_folder: Path,
+    fingerprint_cache: FingerprintCache | None,
+):
+    """
+    Update the plugins config on every batch of changes.
+
+    Returns when stop_event is set or the whole folder has to be rescanned.
+    """
+    log = get_logger()
+    status = get_rich_status()
+    while not stop_event.is_set():
+        names = _wait_for_changes(watcher)
+        if names is None or stop_event.is_set():
+            return
+
+        # answers of the previous cycle may be outdated by now
+        clear_shared_responses()
+        # the config may have been edited since the last update
+        config.reload()
+        plugins_config = _load_plugins_config(config)
+        changed, new_plugins = _scan_changed_jars(
+            names, plugins_folder, plugins_config, fingerprint_cache
+        )
+        if not _keep_removed(config):
+            changed |= _remove_deleted_plugins(plugins_config, plugins_folder, names)
+        if new_plugins and not get_cmd_opts().no_identify:
+            new_plugins -= _identify_plugins(config, plugins_config, new_plugins)
+        for name in sorted(new_plugins):
+            log.info(f"[green]New plugin {name}, please fill the config")
+        if fingerprint_cache:
+            fingerprint_cache.save()
+        if changed:
+            with status:
+                _write_plugins_config(config, plugins_config, status)
+
+
+def watch_plugins(config: Config):
+    """
+    Keep the plugins config in sync with the plugins folder until stopped.
+
+    The folder is fully scanned once, after that only the jars that were added,
+    changed or removed are scanned again. Uses inotify on Linux and falls back
+    to polling elsewhere.
+
+    Args:
+        config (Config): The configuration object that holds plugin settings.
+    """
+    log = get_logger()
+    try:
+        get_remote_connection()
+        log.error("Watch mode only works with a local server folder")
+        return
+    except RuntimeError:
+        pass
+
+    plugins_folder = Path(config.get("settings.server_folder").data, "plugins")
+    while not stop_event.is_set():
+        clear_shared_responses()
+        # start watching before the full scan so no change falls in between
+        with get_folder_watcher(plugins_folder) as watcher:
+            scan_plugins(config, exit_on_new_plugin=False)
+            # load the cache after the scan, it has just been written by it
+            fingerprint_cache = _get_fingerprint_cache()
+            log.info(
+                f"[green]Watching [cyan]{plugins_folder}[green] for changes "
+                + f"({type(watcher).__name__})"
+            )
+            _watch_changes(watcher, config, plugins_folder, fingerprint_cache)
+        if not stop_event.is_set():
+            log.info("[yellow]Lost track of the plugins folder, rescanning")
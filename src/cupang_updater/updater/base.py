@@ -1,14 +1,26 @@
+import asyncio
 import logging
 from abc import ABCMeta, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
-from typing import Literal, Protocol, TypeVar, final
+from typing import Any, Literal, Protocol, Self, TypeVar, final
 
 from ..cmd_opts import get_cmd_opts
+from ..downloader.downloader import get_stream_downloader
 from ..logger.logger import get_logger
 from ..meta import default_headers
 from ..utils.common import parse_version
 from ..utils.hash import FileHash, Hashes
-from ..utils.url import check_content_type, make_requests, make_url
+from ..utils.url import (
+    check_content_type,
+    expect_content_types,
+    get_remembered_content_type,
+    make_requests,
+    make_url,
+    match_content_type,
+    read_json,
+    remember_content_type,
+)
 
 T = TypeVar("T", bound="_Comparable")
 
@@ -79,6 +91,9 @@ class UpdaterBase(metaclass=ABCMeta):
         - get_updater_version: Get the version of the updater.
         - get_config_path: Get the path to the configuration file for this updater.
         - get_update: Get the latest update information for the plugin/server.
+
+    Optional methods to implement:
+        - get_updates: Get the updates of many plugins/servers at once.
     """
 
     @staticmethod
@@ -114,6 +129,21 @@ class UpdaterBase(metaclass=ABCMeta):
         """
         ...
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        """
+        Retrieve the api hosts the updater sends requests to, so connections to
+        them can be opened before the update checks start.
+
+        Args:
+            config (dict): The plugin config or the server config of the resource.
+
+        Returns:
+            list[str]: URLs with the scheme and host of every api, empty if
+                there is none or they are not known in advance.
+        """
+        return []
+
     @abstractmethod
     def get_update(self) -> DownloadInfo | None:
         """
@@ -125,6 +155,54 @@ class UpdaterBase(metaclass=ABCMeta):
         """
         ...
 
+    async def get_update_async(self) -> DownloadInfo | None:
+        """
+        Retrieve the latest update information for the plugin/server, for the
+        asyncio update check engine.
+
+        Runs get_update in the thread pool of the engine, updaters with an
+        asynchronous client can override this instead.
+
+        Returns:
+            DownloadInfo | None: The latest update information, or None if update
+                is not available or an error occurred.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_update)
+
+    async def _get_update_logged(self) -> tuple[Self, DownloadInfo | None]:
+        try:
+            return self, await self.get_update_async()
+        except Exception as e:
+            self.log.exception(f"Failed to get update: {e}")
+            return self, None
+
+    @classmethod
+    async def get_updates(
+        cls, items: list[tuple[ResourceData, Any]]
+    ) -> AsyncIterator[tuple[Self, DownloadInfo | None]]:
+        """
+        Retrieve the latest update information for many plugins/servers, for the
+        asyncio update check engine.
+
+        Receives every resource the updater is asked about in one call, so
+        updaters for a source with a bulk api can answer them with a few
+        requests. The default creates an updater for every item and runs their
+        get_update_async at the same time.
+
+        Args:
+            items (list[tuple[ResourceData, Any]]): The resource data and the
+                updater config of every resource, as passed to the updater.
+
+        Yields:
+            tuple[Self, DownloadInfo | None]: The updater of a resource and its
+                update, or None if update is not available or an error occurred,
+                in the order they finish. The updater is used for the rest of
+                the update, like get_config_update.
+        """
+        checks = [cls(*item)._get_update_logged() for item in items]
+        for check in asyncio.as_completed(checks):
+            yield await check
+
     @final
     @property
     def log(self) -> logging.Logger:
@@ -148,6 +226,11 @@ class UpdaterBase(metaclass=ABCMeta):
     def make_requests(self):
         return make_requests
 
+    @final
+    @property
+    def read_json(self):
+        return read_json
+
     @final
     @property
     def check_content_type(self):
@@ -187,12 +270,34 @@ class UpdaterBase(metaclass=ABCMeta):
     def check_valid_content_types(
         self, url: str, name: str, content_types: list[str]
     ) -> bool:
+        """
+        Check if a download URL serves one of the given content types.
+
+        With the stream downloader the check is left to the download, which
+        aborts before writing the file on a mismatch. Other downloaders get a
+        HEAD request here. URLs that were already validated are not checked
+        again during the run.
+
+        Args:
+            url (str): The download URL.
+            name (str): The name of the plugin or server, for the error message.
+            content_types (list[str]): The accepted content types.
+
+        Returns:
+            bool: False if the URL serves another content type.
+        """
+        if match_content_type(get_remembered_content_type(url), content_types):
+            return True
+        if get_stream_downloader():
+            expect_content_types(url, content_types)
+            return True
         with self.make_requests(url, method="HEAD") as res:
             if not any(self.check_content_type(res, ct) for ct in content_types):
                 self.log.error(
                     f"Invalid content type for {url} when checking {name} update,"
-                    f" got [{res.getheader('content-type', "null")}] "
+                    f" got [{res.getheader('content-type', 'null')}] "
                     f" expecting one of these: {content_types}"
                 )
                 return False
+            remember_content_type(url, res.getheader("content-type"))
         return True
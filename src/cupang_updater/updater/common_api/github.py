@@ -1,12 +1,46 @@
 import json
 import re
+from collections.abc import Iterator
+from functools import lru_cache
 from typing import Any, Literal
 
 from ...utils.date import parse_date_string
-from ...utils.url import check_content_type, make_requests, make_url
+from ...utils.url import check_content_type, make_requests, make_url, read_json
+
+_API = "https://api.github.com"
+RELEASES_PER_PAGE = 10
+# how far back find_release looks before giving up
+_MAX_PAGES = 10
+# repositories per GraphQL query, every one costs up to per_page * 100 nodes
+_GRAPHQL_CHUNK_SIZE = 20
+_RELEASES_FRAGMENT = """
+fragment releases on Repository {
+  releases(first: $perPage, orderBy: {field: CREATED_AT, direction: DESC}) {
+    nodes {
+      name
+      tagName
+      isDraft
+      isPrerelease
+      publishedAt
+      tag { target { oid } }
+      releaseAssets(first: 100) { nodes { name downloadUrl } }
+    }
+  }
+}
+"""
+
+
+@lru_cache(maxsize=256)
+def _compile(name_regex: str) -> re.Pattern:
+    return re.compile(name_regex)
 
 
 class GithubAPI:
+    # release pages and find_release results of this run, they are shared by
+    # every updater that asks about the same repository
+    _pages: dict[tuple[str, int, int], list[dict[str, Any]] | None] = {}
+    _found: dict[tuple, tuple[dict[str, Any], dict[str, Any]] | None] = {}
+
     def __init__(self, repo: str, token: str = None):
         """
         Initialize the GithubAPI object.
@@ -20,7 +54,7 @@ class GithubAPI:
         """
 
         self.repo = repo
-        self.api = "https://api.github.com"
+        self.api = _API
         self.token = token
 
         self.headers = {"Accept": "application/json"}
@@ -40,18 +74,22 @@ class GithubAPI:
                 error occurred.
         """
         url = make_url(*url_parts, **url_query)
-        res = make_requests(url, headers=self.headers)
-        if not check_content_type(res, self.headers["Accept"]):
-            return
-        try:
-            return json.loads(res.read())
-        except json.JSONDecodeError:
-            return None
+        return read_json(url, headers=self.headers)
+
+    def _get_releases_page(
+        self, per_page: int, page: int
+    ) -> list[dict[str, Any]] | None:
+        key = (self.repo, per_page, page)
+        if key not in self._pages:
+            self._pages[key] = self._github_to_json(
+                self.api, "repos", self.repo, "releases", per_page=per_page, page=page
+            )
+        return self._pages[key]
 
     def get_releases_data(
         self,
         _filter: Literal["prerelease", "release", "all"] = "all",
-        per_page: int = 10,
+        per_page: int = RELEASES_PER_PAGE,
         page: int = 1,
     ) -> list[dict[str, Any]] | None:
         """
@@ -70,13 +108,111 @@ class GithubAPI:
                 occurred.
         """
 
-        releases = self._github_to_json(
-            self.api, "repos", self.repo, "releases", per_page=per_page, page=page
-        )
+        releases = self._get_releases_page(per_page, page)
 
         if not releases:
             return None
 
+        return self.filter_releases(releases, _filter)
+
+    def iter_releases(
+        self,
+        _filter: Literal["prerelease", "release", "all"] = "all",
+        start_page: int = 1,
+        max_pages: int = _MAX_PAGES,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over the releases of the repository, newest first, see
+        get_releases_data.
+
+        A page is only requested once the releases before it are used up.
+
+        Args:
+            _filter (Literal["prerelease", "release", "all"], optional):
+                Whether to include prereleases or releases. Defaults to "all".
+            start_page (int, optional): The first page. Defaults to 1.
+            max_pages (int, optional): The number of pages to look at at most.
+                Defaults to 10.
+
+        Yields:
+            dict[str, Any]: The release data.
+        """
+        for page in range(start_page, start_page + max_pages):
+            releases = self._get_releases_page(RELEASES_PER_PAGE, page)
+            if not releases:
+                return
+            yield from self.filter_releases(releases, _filter)
+            if len(releases) < RELEASES_PER_PAGE:
+                return
+
+    def find_release(
+        self,
+        name_regex: str,
+        _filter: Literal["prerelease", "release", "all"] = "all",
+        start_page: int = 1,
+    ) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        """
+        Find the newest release with an asset that matches the given name regex.
+
+        Pages are requested until one is found, the result is kept for the rest
+        of the run.
+
+        Args:
+            name_regex (str): The regex pattern to match the asset name.
+            _filter (Literal["prerelease", "release", "all"], optional):
+                Whether to include prereleases or releases. Defaults to "all".
+            start_page (int, optional): The first page. Defaults to 1.
+
+        Returns:
+            tuple[dict[str, Any], dict[str, Any]] | None: The release data and the
+                asset data, or None if no release matches.
+        """
+        key = (self.repo, name_regex, _filter, start_page)
+        if key not in self._found:
+            self._found[key] = self.match_release(
+                self.iter_releases(_filter, start_page), name_regex
+            )
+        return self._found[key]
+
+    @classmethod
+    def match_release(
+        cls, releases: list[dict[str, Any]] | Iterator[dict[str, Any]], name_regex: str
+    ) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        """
+        Get the first release with an asset that matches the given name regex.
+
+        Args:
+            releases (list[dict[str, Any]] | Iterator[dict[str, Any]]): The release
+                data, it is only consumed up to the match.
+            name_regex (str): The regex pattern to match the asset name.
+
+        Returns:
+            tuple[dict[str, Any], dict[str, Any]] | None: The release data and the
+                asset data, or None if no release matches.
+        """
+        for release_data in releases:
+            asset_data = cls.get_asset_data(release_data, name_regex)
+            if asset_data:
+                return release_data, asset_data
+        return None
+
+    @staticmethod
+    def filter_releases(
+        releases: list[dict[str, Any]],
+        _filter: Literal["prerelease", "release", "all"] = "all",
+    ) -> list[dict[str, Any]]:
+        """
+        Drop the drafts and the releases that don't pass the filter, and sort the
+        rest by their publish date, newest first.
+
+        Args:
+            releases (list[dict[str, Any]]): The list of release data.
+            _filter (Literal["prerelease", "release", "all"], optional):
+                Whether to keep prereleases or releases. Defaults to "all".
+
+        Returns:
+            list[dict[str, Any]]: The filtered list of release data.
+        """
         releases = [x for x in releases if not x.get("draft", False)]
 
         if _filter == "prerelease":
@@ -92,6 +228,95 @@ class GithubAPI:
         )
         return releases
 
+    @staticmethod
+    def _release_from_graphql(node: dict[str, Any]) -> dict[str, Any]:
+        """Turn a release of the GraphQL api into the shape of the REST api."""
+        target = (node.get("tag") or {}).get("target")
+        return {
+            "name": node["name"],
+            "tag_name": node["tagName"],
+            "draft": node["isDraft"],
+            "prerelease": node["isPrerelease"],
+            "published_at": node["publishedAt"],
+            "assets": [
+                {"name": x["name"], "browser_download_url": x["downloadUrl"]}
+                for x in node["releaseAssets"]["nodes"]
+            ],
+            # what get_tag_data returns for the tag of the release
+            "tag_data": {
+                "ref": f"refs/tags/{node['tagName']}",
+                "object": {"sha": target["oid"]},
+            }
+            if target
+            else None,
+        }
+
+    @classmethod
+    def get_releases_data_bulk(
+        cls, repos: list[str], token: str, per_page: int = RELEASES_PER_PAGE
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Get the latest releases of many repositories with the GraphQL api, one
+        request per 20 repositories.
+
+        Every release has the assets of get_release_data, and the data of
+        get_tag_data for its tag as "tag_data", so nothing else has to be
+        requested. The GraphQL api only answers authenticated requests.
+
+        Args:
+            repos (list[str]): The names of the repositories, e.g.
+                "EssentialsX/Essentials".
+            token (str): The Github API token to use for authentication.
+            per_page (int, optional): The number of releases per repository, the
+                newest created first. Defaults to 10.
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: The unfiltered list of release data of
+                every repository by name, repositories that were not found or
+                failed are missing.
+        """
+        found: dict[str, list[dict[str, Any]]] = {}
+        for i in range(0, len(repos), _GRAPHQL_CHUNK_SIZE):
+            chunk = repos[i : i + _GRAPHQL_CHUNK_SIZE]
+            variables: dict[str, Any] = {"perPage": per_page}
+            params = ["$perPage: Int!"]
+            fields = []
+            for n, repo in enumerate(chunk):
+                owner, _, name = repo.partition("/")
+                variables[f"owner{n}"], variables[f"name{n}"] = owner, name
+                params.append(f"$owner{n}: String!, $name{n}: String!")
+                fields.append(
+                    f"r{n}: repository(owner: $owner{n}, name: $name{n}) "
+                    + "{ ...releases }"
+                )
+            selections = "\n".join(fields)
+            query = (
+                f"query({', '.join(params)}) {{\n{selections}\n}}\n"
+                + _RELEASES_FRAGMENT
+            )
+            res = make_requests(
+                make_url(_API, "graphql"),
+                "POST",
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {token}",
+                },
+                data=json.dumps({"query": query, "variables": variables}).encode(),
+            )
+            if not check_content_type(res, "application/json"):
+                continue
+            # a missing repository is null in data and listed in errors
+            data = json.loads(res.read()).get("data") or {}
+            for n, repo in enumerate(chunk):
+                repository = data.get(f"r{n}")
+                if repository:
+                    found[repo] = [
+                        cls._release_from_graphql(x)
+                        for x in repository["releases"]["nodes"]
+                    ]
+        return found
+
     def get_release_data(self, tag: str = "latest") -> dict[str, Any] | None:
         """
         Get the release data for a specific tag in the given repository.
@@ -125,8 +350,9 @@ class GithubAPI:
             self.api, "repos", self.repo, "git", "ref", "tags", tag
         )
 
+    @staticmethod
     def get_asset_data(
-        self, release_data: dict[str, Any], name_regex: str
+        release_data: dict[str, Any], name_regex: str
     ) -> dict[str, Any] | None:
         """
         Get the URL of an asset from the release data that matches the given name regex.
@@ -141,11 +367,10 @@ class GithubAPI:
         if not release_data:
             return
 
-        _name_regex = re.compile(name_regex)
-        assets = list(
-            filter(lambda x: _name_regex.match(x["name"]), release_data["assets"])
+        _name_regex = _compile(name_regex)
+        return next(
+            (x for x in release_data["assets"] if _name_regex.match(x["name"])), None
         )
-        return assets[0] if assets else None
 
     def get_asset_url(self, asset_data: dict[str, Any]) -> str | None:
         return asset_data["browser_download_url"] if asset_data else None
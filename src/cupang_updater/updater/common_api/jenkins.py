@@ -1,12 +1,18 @@
-import json
 import re
 from typing import Any
 
-from ...utils.url import check_content_type, make_requests, make_url
+from ...utils.url import make_url, read_json
+
+# the fields of a build that are requested
+_BUILD_TREE = "number,artifacts[*]"
 
 
 # TODO make it more like new GithubAPI approach
 class JenkinsAPI:
+    # the builds of this run by job url and build number, a finished build
+    # never changes so every updater asking about the same build shares it
+    _builds: dict[tuple[str, int], dict[str, Any]] = {}
+
     def __init__(self, url: str):
         """
         Initialize the JenkinsAPI object.
@@ -31,13 +37,7 @@ class JenkinsAPI:
         """
 
         url = make_url(*url_parts, **url_query)
-        res = make_requests(url, headers=self.headers)
-        if not check_content_type(res, self.headers["Accept"]):
-            return
-        try:
-            return json.loads(res.read())
-        except json.JSONDecodeError:
-            return None
+        return read_json(url, headers=self.headers)
 
     def get_build_data(
         self, build_number: int = -1
@@ -53,20 +53,28 @@ class JenkinsAPI:
         Returns:
             tuple[dict[str, Any], int] | tuple[None, None]: The build data, or
                 None if an error occurred.
+
+        Note:
+            The latest successful build is requested together with its
+            artifacts in one request. Builds are kept for the rest of the run.
         """
+        job = self.url.rstrip("/")
+        if build_number >= 1 and (job, build_number) in self._builds:
+            return self._builds[(job, build_number)], build_number
 
         if build_number < 1:
-            last_successful_build = self._jenkins_to_json(
-                self.url, "api", "json", tree="lastSuccessfulBuild[id]"
+            job_data = self._jenkins_to_json(
+                self.url, "api", "json", tree=f"lastSuccessfulBuild[{_BUILD_TREE}]"
+            )
+            build = job_data.get("lastSuccessfulBuild") if job_data else None
+        else:
+            build = self._jenkins_to_json(
+                self.url, str(build_number), "api", "json", tree=_BUILD_TREE
             )
-            if not last_successful_build:
-                return None, None
-            build_number = int(last_successful_build["lastSuccessfulBuild"]["id"])
-        build = self._jenkins_to_json(
-            self.url, str(build_number), "api", "json", tree="artifacts[*]"
-        )
         if not build:
             return None, None
+        build_number = int(build["number"])
+        self._builds[(job, build_number)] = build
         return build, build_number
 
     def get_artifact_data(
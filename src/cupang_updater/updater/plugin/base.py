@@ -1,12 +1,15 @@
+import asyncio
 from abc import abstractmethod
+from collections.abc import AsyncIterator
 from copy import deepcopy
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Self
 
 from strictyaml.validators import MapValidator
 
+from ...logger.logger import get_logger
 from ...utils.common import reindent
-from ..base import ResourceData, UpdaterBase
+from ..base import DownloadInfo, ResourceData, UpdaterBase
 
 
 @dataclass
@@ -71,6 +74,9 @@ class PluginUpdater(UpdaterBase):
 
     Optional methods to implement:
         - get_config_update: Retrieve the updated configuration for the plugin updater.
+        - get_updates: Retrieve the latest update of many plugins at once.
+        - prepare: Look up every plugin at once before the update checks start.
+        - identify: Find the config of new plugins by their hashes.
 
     Note:
         See UpdaterBase class for inherited functionality.
@@ -99,6 +105,69 @@ class PluginUpdater(UpdaterBase):
         """
         ...
 
+    @classmethod
+    def prepare(cls, items: list[tuple[ResourceData, PluginUpdaterConfig]]) -> None:
+        """
+        Called by get_updates before the update checks start, with every plugin
+        the updater is asked about.
+
+        Updaters for a source with a bulk api can look up all the plugins here
+        and keep the results for get_update, which still runs per plugin.
+        The default does nothing.
+
+        Args:
+            items (list[tuple[ResourceData, PluginUpdaterConfig]]): The plugin data
+                and the updater config of every plugin.
+        """
+
+    @classmethod
+    async def get_updates(
+        cls, items: list[tuple[ResourceData, PluginUpdaterConfig]]
+    ) -> AsyncIterator[tuple[Self, DownloadInfo | None]]:
+        """
+        Retrieve the latest update information for every plugin assigned to the
+        updater.
+
+        Called once per updater in update order, with the plugins that did not
+        get an update from the updaters before it. The default runs prepare and
+        then get_update for every plugin, see UpdaterBase.get_updates.
+
+        Args:
+            items (list[tuple[ResourceData, PluginUpdaterConfig]]): The plugin data
+                and the updater config of every plugin.
+
+        Yields:
+            tuple[Self, DownloadInfo | None]: The updater of a plugin and its
+                update, or None if update is not available or an error occurred.
+        """
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, cls.prepare, items)
+        except Exception:
+            get_logger().getChild(cls.get_updater_name()).exception(
+                "Failed to prepare the plugin updates"
+            )
+        async for result in super().get_updates(items):
+            yield result
+
+    @classmethod
+    def identify(cls, plugins: dict[str, ResourceData]) -> dict[str, dict[str, Any]]:
+        """
+        Find the plugins that the source of the updater hosts, by the hashes
+        of their jar.
+
+        Called by the plugin scan with every new plugin, so their config can be
+        filled without asking. The default finds nothing.
+
+        Args:
+            plugins (dict[str, ResourceData]): The plugin data of every new plugin,
+                by plugin name.
+
+        Returns:
+            dict[str, dict[str, Any]]: The updater config of every found plugin,
+                by plugin name.
+        """
+        return {}
+
     def get_config_update(self) -> PluginUpdaterConfig:
         """
         Retrieve the updated configuration for the plugin updater.
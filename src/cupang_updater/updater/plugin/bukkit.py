@@ -22,6 +22,10 @@ class BukkitUpdater(PluginUpdater):
     def get_config_path():
         return "bukkit"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.curseforge.com"] if config.get("project_id") else []
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -3,7 +3,7 @@ from typing import Any
 import strictyaml as sy
 
 from ..base import DownloadInfo, ResourceData
-from ..common_api.github import GithubAPI
+from ..common_api.github import RELEASES_PER_PAGE, GithubAPI
 from .base import PluginUpdater, PluginUpdaterConfig, PluginUpdaterConfigSchema
 
 
@@ -18,6 +18,9 @@ class CompareToType(sy.Str):
 
 
 class GithubUpdater(PluginUpdater):
+    # the releases of every repository looked up by prepare, by repository
+    _prepared: dict[str, list[dict[str, Any]]] = {}
+
     def __init__(self, plugin_data: ResourceData, updater_config: PluginUpdaterConfig):
         self.token = updater_config.common_config.get("token")
         self.new_updater_config = PluginUpdaterConfig()
@@ -31,6 +34,10 @@ class GithubUpdater(PluginUpdater):
     def get_config_path():
         return "github"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.github.com"] if config.get("repo") else []
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -68,22 +75,59 @@ class GithubUpdater(PluginUpdater):
     def get_config_update(self) -> PluginUpdaterConfig:
         return self.new_updater_config
 
+    @classmethod
+    def prepare(cls, items: list[tuple[ResourceData, PluginUpdaterConfig]]) -> None:
+        """
+        Look up the releases of every repository with the GraphQL api, together
+        with their tags and assets, when a token is set.
+
+        Repositories that are not found are looked up one by one by get_update.
+        """
+        token = next(
+            (x.common_config.get("token") for _, x in items if x.common_config), None
+        )
+        if not token:
+            return
+        repos = list(
+            dict.fromkeys(
+                x.plugin_config["repo"]
+                for _, x in items
+                if x.plugin_config.get("repo") and x.plugin_config.get("name_regex")
+            )
+        )
+        if repos:
+            cls._prepared.update(GithubAPI.get_releases_data_bulk(repos, token))
+
+    def _find_release(
+        self, api: GithubAPI, _filter: str, name_regex: str
+    ) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        prepared = self._prepared.get(api.repo)
+        if prepared is None:
+            return api.find_release(name_regex, _filter)
+        found = GithubAPI.match_release(
+            GithubAPI.filter_releases(prepared, _filter), name_regex
+        )
+        # prepare only has the first page
+        if found or len(prepared) < RELEASES_PER_PAGE:
+            return found
+        return api.find_release(name_regex, _filter, start_page=2)
+
     def _get_git_data(
         self, api: GithubAPI, prerelease: bool, name_regex: str
     ) -> None | tuple[list[dict[str, Any]], dict[str, Any], str]:
         _null = [None, None, None]
-        api_release_data = api.get_releases_data(
-            _filter="prerelease" if prerelease else "release"
+        found = self._find_release(
+            api, "prerelease" if prerelease else "release", name_regex
         )
-        if not api_release_data:
+        if not found:
             return _null
-        api_release_data = api_release_data[0]
-        api_tag_data = api.get_tag_data(api_release_data["tag_name"])
+        api_release_data, api_asset_data = found
+        # releases from prepare come with their tag
+        api_tag_data = api_release_data.get("tag_data") or api.get_tag_data(
+            api_release_data["tag_name"]
+        )
         if not api_tag_data:
             return _null
-        api_asset_data = api.get_asset_data(api_release_data, name_regex)
-        if not api_asset_data:
-            return _null
 
         return api_release_data, api_tag_data, api_asset_data
 
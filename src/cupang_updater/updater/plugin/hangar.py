@@ -41,6 +41,10 @@ class HangarUpdater(PluginUpdater):
     def get_config_path():
         return "hangar"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://hangar.papermc.io"] if config.get("id") else []
+
     @staticmethod
     def get_updater_version():
         return "1.0"
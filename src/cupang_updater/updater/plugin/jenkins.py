@@ -18,6 +18,10 @@ class JenkinsUpdater(PluginUpdater):
     def get_config_path():
         return "jenkins"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return [config["url"]] if config.get("url") else []
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -1,13 +1,23 @@
 import ast
 import json
 import re
+from pathlib import Path
+from typing import Any
 
 import strictyaml as sy
 
 from ...utils.date import parse_date_string
+from ...utils.url import check_content_type, make_requests, make_url, read_json
 from ..base import DownloadInfo, ResourceData
 from .base import PluginUpdater, PluginUpdaterConfig, PluginUpdaterConfigSchema
 
+_API = "https://api.modrinth.com/v2"
+# file hashes per request to the bulk endpoints
+_BULK_CHUNK_SIZE = 500
+# project slugs per request to the projects endpoint, they go in the URL
+_PROJECTS_CHUNK_SIZE = 100
+_FILE_NAME_PREFIX = re.compile(r"^(.+?)[-_ ]*v?\d")
+
 
 class ModrinthList(sy.Str):
     def is_valid_list(self, s):
@@ -41,8 +51,15 @@ class ModrinthVersionType(sy.Str):
 
 
 class ModrinthUpdater(PluginUpdater):
+    # the latest version of every plugin looked up by prepare,
+    # by sha1, loaders and game_versions
+    _prepared: dict[tuple[str, str, str], dict] = {}
+    # the project id of every configured id or slug (lower case) that prepare
+    # had to resolve
+    _project_ids: dict[str, str] = {}
+
     def __init__(self, plugin_data: ResourceData, updater_config: PluginUpdaterConfig):
-        self.api = "https://api.modrinth.com/v2"
+        self.api = _API
         super().__init__(plugin_data, updater_config)
 
     @staticmethod
@@ -53,6 +70,10 @@ class ModrinthUpdater(PluginUpdater):
     def get_config_path():
         return "modrinth"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.modrinth.com"] if config.get("id") else []
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -101,6 +122,182 @@ class ModrinthUpdater(PluginUpdater):
         else:
             return f'["{text}"]'
 
+    @staticmethod
+    def _modrinth_list(text: str | None) -> list[str] | None:
+        if not text:
+            return None
+        if text.startswith("[") and text.endswith("]"):
+            try:
+                output = ast.literal_eval(text)
+            except (SyntaxError, ValueError):
+                return None
+            return [str(x) for x in output] if output else None
+        return [text]
+
+    @staticmethod
+    def _post_hashes(path: str, body: dict) -> dict[str, dict]:
+        # the bulk endpoints answer with a version per known file hash
+        res = make_requests(
+            make_url(_API, path),
+            "POST",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            data=json.dumps(body).encode(),
+        )
+        if not check_content_type(res, "application/json"):
+            return {}
+        data = json.loads(res.read())
+        return data if isinstance(data, dict) else {}
+
+    @classmethod
+    def _get_bulk_update_data(
+        cls, hashes: list[str], loaders: str = None, game_versions: str = None
+    ) -> dict[str, dict]:
+        # the latest version matching loaders and game_versions, by file hash
+        body = {"hashes": hashes, "algorithm": "sha1"}
+        if loaders := cls._modrinth_list(loaders):
+            body["loaders"] = loaders
+        if game_versions := cls._modrinth_list(game_versions):
+            body["game_versions"] = game_versions
+        return cls._post_hashes("version_files/update", body)
+
+    @staticmethod
+    def _file_name_regex(version_data: dict, sha512: str) -> str | None:
+        files: list[dict] = version_data.get("files") or []
+        file = next(
+            (x for x in files if x.get("hashes", {}).get("sha512") == sha512),
+            files[0] if files else None,
+        )
+        if not file or not file.get("filename"):
+            return None
+        # the part of the file name before its version, "LuckPerms-Bukkit-5.4.jar"
+        # gives "LuckPerms-Bukkit"
+        prefix = _FILE_NAME_PREFIX.match(Path(file["filename"]).stem)
+        return re.escape(prefix.group(1) if prefix else file["filename"])
+
+    @classmethod
+    def identify(cls, plugins: dict[str, ResourceData]) -> dict[str, dict[str, Any]]:
+        """
+        Find the Modrinth project of every plugin by the sha512 of its jar,
+        with one request.
+
+        The config is filled with the project id, a name_regex made from the
+        file name and the version_type of the found version. Loaders and
+        game_versions are left to the user, a version of one jar says little
+        about the next ones.
+        """
+        by_hash = {
+            x.hashes.sha512: name for name, x in plugins.items() if x.hashes.sha512
+        }
+        hashes = list(by_hash)
+        found: dict[str, dict[str, Any]] = {}
+        for i in range(0, len(hashes), _BULK_CHUNK_SIZE):
+            versions = cls._post_hashes(
+                "version_files",
+                {"hashes": hashes[i : i + _BULK_CHUNK_SIZE], "algorithm": "sha512"},
+            )
+            for sha512, version_data in versions.items():
+                name_regex = cls._file_name_regex(version_data, sha512)
+                if sha512 not in by_hash or not (
+                    version_data.get("project_id") and name_regex
+                ):
+                    continue
+                found[by_hash[sha512]] = {
+                    "id": version_data["project_id"],
+                    "name_regex": name_regex,
+                    "version_type": version_data.get("version_type") or "release",
+                }
+        return found
+
+    @classmethod
+    def prepare(cls, items: list[tuple[ResourceData, PluginUpdaterConfig]]) -> None:
+        """
+        Look up the latest version of every plugin by the sha1 of its jar, with one
+        request per loaders and game_versions combination.
+
+        Plugins that are not found, whose jar belongs to another project than
+        the configured one, or whose latest version is not of the wanted
+        version_type, are looked up one by one by get_update.
+        """
+        groups: dict[tuple[str, str], list[str]] = {}
+        configured: dict[tuple[str, str, str], str] = {}
+        for plugin_data, updater_config in items:
+            plugin_config = updater_config.plugin_config
+            sha1 = plugin_data.hashes.sha1
+            if not (
+                sha1 and plugin_config.get("id") and plugin_config.get("name_regex")
+            ):
+                continue
+            key = (
+                plugin_config.get("loaders") or "",
+                plugin_config.get("game_versions") or "",
+            )
+            groups.setdefault(key, []).append(sha1)
+            configured[(sha1, *key)] = plugin_config["id"]
+
+        for (loaders, game_versions), hashes in groups.items():
+            for i in range(0, len(hashes), _BULK_CHUNK_SIZE):
+                update_data = cls._get_bulk_update_data(
+                    hashes[i : i + _BULK_CHUNK_SIZE], loaders, game_versions
+                )
+                for sha1, version_data in update_data.items():
+                    cls._prepared[(sha1, loaders, game_versions)] = version_data
+
+        # the configured id can be a slug, resolve the ones that don't match
+        unresolved = {
+            project_id
+            for key, project_id in configured.items()
+            if key in cls._prepared
+            and cls._prepared[key].get("project_id") != project_id
+            and project_id.lower() not in cls._project_ids
+        }
+        cls._resolve_project_ids(sorted(unresolved))
+
+    @classmethod
+    def _resolve_project_ids(cls, slugs: list[str]):
+        for i in range(0, len(slugs), _PROJECTS_CHUNK_SIZE):
+            projects = read_json(
+                make_url(
+                    _API,
+                    "projects",
+                    ids=json.dumps(slugs[i : i + _PROJECTS_CHUNK_SIZE]),
+                )
+            )
+            for project in projects if isinstance(projects, list) else []:
+                for name in (project.get("id"), project.get("slug")):
+                    if name:
+                        cls._project_ids[name.lower()] = project["id"]
+
+    def _get_prepared_update_data(
+        self, project_id: str, version_type: str = None
+    ) -> dict | None:
+        plugin_config = self.updater_config.plugin_config
+        update_data = self._prepared.get(
+            (
+                self.plugin_data.hashes.sha1,
+                plugin_config.get("loaders") or "",
+                plugin_config.get("game_versions") or "",
+            )
+        )
+        if not update_data:
+            return None
+        # the jar may belong to another project than the configured one,
+        # like a fork or a re-upload, follow the configured one
+        if update_data.get("project_id") not in (
+            project_id,
+            self._project_ids.get(project_id.lower()),
+        ):
+            return None
+        # the bulk endpoint ignores the version type, fall back if it differs
+        if (
+            str(update_data.get("version_type")).lower()
+            != str(version_type or "release").lower()
+        ):
+            return None
+        return update_data
+
     def _get_update_data(
         self,
         project_id: str,
@@ -146,9 +343,9 @@ class ModrinthUpdater(PluginUpdater):
         game_versions = self.updater_config.plugin_config.get("game_versions")
         version_type = self.updater_config.plugin_config.get("version_type")
 
-        update_data = self._get_update_data(
-            project_id, loaders, game_versions, version_type
-        )
+        update_data = self._get_prepared_update_data(
+            project_id, version_type
+        ) or self._get_update_data(project_id, loaders, game_versions, version_type)
         if not update_data:
             return
 
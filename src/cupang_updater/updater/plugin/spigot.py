@@ -19,6 +19,10 @@ class SpigotUpdater(PluginUpdater):
     def get_config_path():
         return "spigot"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.spiget.org"] if config.get("resource_id") else []
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -17,6 +17,10 @@ class BungeeUpdater(ServerUpdater):
     def get_config_path():
         return "bungee"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://ci.md-5.net"]
+
     @staticmethod
     def get_updater_version():
         return "1.0"
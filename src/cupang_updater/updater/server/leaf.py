@@ -25,6 +25,10 @@ class LeafUpdater(ServerUpdater):
     def get_config_path():
         return "leaf"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.github.com"]
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -18,6 +18,10 @@ class PaperUpdater(ServerUpdater):
     def get_config_path():
         return "papermc"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.papermc.io"]
+
     @staticmethod
     def get_updater_version():
         return "1.0"
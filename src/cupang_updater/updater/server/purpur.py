@@ -19,6 +19,10 @@ class PurpurUpdater(ServerUpdater):
     def get_config_path():
         return "purpur"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.purpurmc.org"]
+
     @staticmethod
     def get_updater_version():
         return "1.0"
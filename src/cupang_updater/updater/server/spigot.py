@@ -25,6 +25,10 @@ class SpigotMCUpdater(ServerUpdater):
     def get_config_path():
         return "spigot"
 
+    @staticmethod
+    def get_api_hosts(config: dict) -> list[str]:
+        return ["https://api.github.com"]
+
     @staticmethod
     def get_updater_version():
         return "1.0"
@@ -55,16 +59,13 @@ class SpigotMCUpdater(ServerUpdater):
         self, api: GithubAPI, name_regex: str
     ) -> None | tuple[list[dict[str, Any]], dict[str, Any], str]:
         _null = [None, None, None]
-        api_release_data = api.get_releases_data("release")
-        if not api_release_data:
+        found = api.find_release(name_regex, "release")
+        if not found:
             return _null
-        api_release_data = api_release_data[0]
+        api_release_data, api_asset_data = found
         api_tag_data = api.get_tag_data(api_release_data["tag_name"])
         if not api_tag_data:
             return _null
-        api_asset_data = api.get_asset_data(api_release_data, name_regex)
-        if not api_asset_data:
-            return _null
 
         return api_release_data, api_tag_data, api_asset_data
 
@@ -0,0 +1,301 @@
+import http.client
+import io
+import select
+import socket
+from contextlib import suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from threading import Condition, Event, Lock, Thread
+
+import pycurl
+
+from .http import HTTPStatusError
+from .http_cache import BufferedResponse
+
+_DEFAULT_MAX_HOST_CONNECTIONS = 6
+_DEFAULT_MAX_TOTAL_CONNECTIONS = 64
+# the longest the transfer loop sleeps when curl has no timer of its own
+_MAX_SELECT_TIMEOUT = 1.0
+# curl decodes these itself, see CurlMultiEngine.request
+_DECODED_HEADERS = ("content-encoding", "content-length")
+
+
+class CurlError(OSError):
+    """Raised when a transfer of the CurlMultiEngine fails."""
+
+
+@dataclass(eq=False)
+class _Transfer:
+    method: str
+    url: str
+    headers: dict[str, str]
+    body: bytes | None
+    timeout: int
+    response_headers: list[tuple[str, str]] = field(default_factory=list)
+    buffer: io.BytesIO = field(default_factory=io.BytesIO)
+    done: Event = field(default_factory=Event)
+    status: int = 0
+    effective_url: str = None
+    error: Exception = None
+
+    def header_line(self, line: bytes):
+        text = line.decode("iso-8859-1").strip()
+        # every response of a redirect chain starts with its status line
+        if text.startswith("HTTP/"):
+            self.response_headers.clear()
+        elif ":" in text:
+            name, value = text.split(":", maxsplit=1)
+            self.response_headers.append((name.strip(), value.strip()))
+
+
+class CurlMultiEngine:
+    """
+    An HTTP client that drives every request from one thread with pycurl.CurlMulti.
+
+    DNS results, connections and TLS sessions are shared by every request, and
+    requests to the same host are multiplexed over one HTTP/2 connection when the
+    server supports it. Callers block until their response is complete, so any
+    number of threads can send requests without a connection each.
+    """
+
+    def __init__(
+        self,
+        max_host_connections: int = _DEFAULT_MAX_HOST_CONNECTIONS,
+        max_total_connections: int = _DEFAULT_MAX_TOTAL_CONNECTIONS,
+    ):
+        """
+        Initialize the engine, its thread is started by the first request.
+
+        Args:
+            max_host_connections (int, optional): The maximum number of
+                connections per host. Defaults to 6.
+            max_total_connections (int, optional): The maximum number of
+                connections. Defaults to 64.
+        """
+        self._multi = pycurl.CurlMulti()
+        self._multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+        self._multi.setopt(pycurl.M_MAX_HOST_CONNECTIONS, max_host_connections)
+        self._multi.setopt(pycurl.M_MAX_TOTAL_CONNECTIONS, max_total_connections)
+        self._share = pycurl.CurlShare()
+        for data in (
+            pycurl.LOCK_DATA_DNS,
+            pycurl.LOCK_DATA_SSL_SESSION,
+            pycurl.LOCK_DATA_CONNECT,
+        ):
+            self._share.setopt(pycurl.SH_SHARE, data)
+
+        self._pending: list[_Transfer] = []
+        self._active: dict[pycurl.Curl, _Transfer] = {}
+        self._cond = Condition()
+        self._closed = False
+        self._thread: Thread = None
+        self._thread_lock = Lock()
+        # wakes the transfer loop up from select when a request is submitted
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+
+    def _setup_curl(self, transfer: _Transfer) -> pycurl.Curl:
+        headers = dict(transfer.headers)
+        accept_encoding = None
+        for name in list(headers):
+            if name.lower() == "accept-encoding":
+                accept_encoding = headers.pop(name)
+
+        c = pycurl.Curl()
+        c.setopt(pycurl.SHARE, self._share)
+        c.setopt(pycurl.URL, transfer.url)
+        c.setopt(pycurl.FOLLOWLOCATION, True)
+        c.setopt(pycurl.MAXREDIRS, 10)
+        c.setopt(pycurl.NOSIGNAL, True)
+        c.setopt(pycurl.TIMEOUT, transfer.timeout)
+        c.setopt(pycurl.CONNECTTIMEOUT, min(transfer.timeout, 30))
+        c.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+        # wait for a connection that can be multiplexed instead of opening one
+        c.setopt(pycurl.PIPEWAIT, True)
+        c.setopt(pycurl.HTTPHEADER, [f"{k}: {v}" for k, v in headers.items()])
+        if accept_encoding is not None:
+            # curl asks for the encodings and decodes the body itself
+            c.setopt(pycurl.ACCEPT_ENCODING, accept_encoding)
+        c.setopt(pycurl.HEADERFUNCTION, transfer.header_line)
+        c.setopt(pycurl.WRITEDATA, transfer.buffer)
+
+        if transfer.method == "HEAD":
+            c.setopt(pycurl.NOBODY, True)
+        elif transfer.method != "GET":
+            if transfer.body is not None:
+                c.setopt(pycurl.POSTFIELDS, transfer.body)
+            c.setopt(pycurl.CUSTOMREQUEST, transfer.method)
+        return c
+
+    def _start_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="curl-multi", daemon=True)
+                self._thread.start()
+
+    def _wake(self):
+        with suppress(OSError):
+            self._wake_w.send(b"\0")
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] = None,
+        body: bytes = None,
+        timeout: int = 60,
+    ) -> BufferedResponse:
+        """
+        Send a request and wait for its response.
+
+        Redirects are followed. An Accept-Encoding header is handed to curl,
+        which decodes the body, so the response has no Content-Encoding.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL.
+            headers (dict[str, str], optional): The request headers.
+            body (bytes, optional): The request body.
+            timeout (int, optional): The timeout of the whole transfer in
+                seconds. Defaults to 60.
+
+        Raises:
+            HTTPStatusError: If the final response status is 400 or above.
+            CurlError: If the transfer failed or the engine is closed.
+
+        Returns:
+            BufferedResponse: The response.
+        """
+        transfer = _Transfer(method, url, headers or {}, body, timeout)
+        with self._cond:
+            if self._closed:
+                raise CurlError("The curl engine is closed")
+            self._pending.append(transfer)
+            self._cond.notify()
+        self._start_thread()
+        self._wake()
+        transfer.done.wait()
+
+        if transfer.error is not None:
+            raise transfer.error
+        response_headers = [
+            (k, v)
+            for k, v in transfer.response_headers
+            if k.lower() not in _DECODED_HEADERS
+        ]
+        if transfer.status >= 400:
+            message = http.client.HTTPMessage()
+            for name, value in response_headers:
+                message[name] = value
+            try:
+                reason = HTTPStatus(transfer.status).phrase
+            except ValueError:
+                reason = ""
+            raise HTTPStatusError(transfer.status, reason, message)
+        return BufferedResponse(
+            transfer.effective_url or url,
+            transfer.status,
+            response_headers,
+            transfer.buffer.getvalue(),
+        )
+
+    def _add_pending(self) -> bool:
+        """Move the submitted requests into the multi handle, False once closed."""
+        with self._cond:
+            while not self._pending and not self._active and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return False
+            pending, self._pending = self._pending, []
+        for transfer in pending:
+            try:
+                c = self._setup_curl(transfer)
+            except pycurl.error as e:
+                transfer.error = CurlError(*e.args)
+                transfer.done.set()
+                continue
+            self._active[c] = transfer
+            self._multi.add_handle(c)
+        return True
+
+    def _finish(self, c: pycurl.Curl, error: Exception = None):
+        transfer = self._active.pop(c)
+        self._multi.remove_handle(c)
+        if error is None:
+            transfer.status = c.getinfo(pycurl.RESPONSE_CODE)
+            transfer.effective_url = c.getinfo(pycurl.EFFECTIVE_URL)
+        transfer.error = error
+        c.close()
+        transfer.done.set()
+
+    def _perform(self):
+        while True:
+            ret, _ = self._multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+        while True:
+            queued, ok_list, err_list = self._multi.info_read()
+            for c in ok_list:
+                self._finish(c)
+            for c, errno, errmsg in err_list:
+                self._finish(c, CurlError(errno, errmsg))
+            if not queued:
+                break
+
+    def _wait(self):
+        """Sleep until a socket of curl or the wake socket is ready."""
+        read, write, exc = self._multi.fdset()
+        timeout = self._multi.timeout()
+        timeout = _MAX_SELECT_TIMEOUT if timeout < 0 else timeout / 1000
+        select.select(
+            [*read, self._wake_r], write, exc, min(timeout, _MAX_SELECT_TIMEOUT)
+        )
+        with suppress(OSError):
+            while self._wake_r.recv(1024):
+                pass
+
+    def _run(self):
+        while self._add_pending():
+            self._perform()
+            if self._active:
+                self._wait()
+
+        error = CurlError("The curl engine is closed")
+        for c in list(self._active):
+            self._finish(c, error)
+
+    def close(self):
+        """Stop the engine, requests that are still running fail with a CurlError."""
+        with self._cond:
+            self._closed = True
+            pending, self._pending = self._pending, []
+            self._cond.notify()
+        for transfer in pending:
+            transfer.error = CurlError("The curl engine is closed")
+            transfer.done.set()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join()
+        self._multi.close()
+        self._share.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+_engine: CurlMultiEngine = None
+
+
+def setup_curl_engine(engine: CurlMultiEngine):
+    global _engine
+    _engine = engine
+
+
+def get_curl_engine() -> CurlMultiEngine | None:
+    """
+    Get the curl engine that sends the HTTP requests of make_requests.
+
+    Returns:
+        CurlMultiEngine | None: The engine, or None if requests go through the
+            connection pool.
+    """
+    return _engine
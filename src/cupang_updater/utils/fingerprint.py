@@ -0,0 +1,250 @@
+import io
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from typing import IO
+
+from ..remote_storage.base import RemoteIO
+from .common import ensure_path
+from .hash import FileHash, Hashes, MultiHash
+from .jar import JarInfo, get_jar_info
+
+_CACHE_VERSION = 1
+_DEFAULT_MAX_ENTRIES = 4096
+
+
+@dataclass
+class Fingerprint:
+    """
+    The hashes and metadata of a jar file.
+
+    Attributes:
+        hashes (Hashes): The hash values of the jar file.
+        jar_info (JarInfo): The metadata of the jar file.
+    """
+
+    hashes: Hashes
+    jar_info: JarInfo
+
+
+@dataclass
+class FileStat:
+    """
+    The file attributes used to tell if a cached fingerprint is still valid.
+
+    Attributes:
+        size (int): The size of the file in bytes.
+        mtime_ns (int): The modification time of the file in nanoseconds.
+        inode (int): The inode number of the file, 0 if not available.
+    """
+
+    size: int
+    mtime_ns: int
+    inode: int = 0
+
+    @classmethod
+    def from_path(cls, path: str | Path) -> "FileStat":
+        """
+        Create a FileStat from a local file.
+
+        Args:
+            path (str | Path): The path to the file.
+
+        Returns:
+            FileStat: The attributes of the file.
+        """
+        st = os.stat(path)
+        return cls(st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def fingerprint_jar(jar: str | Path | IO[bytes]) -> Fingerprint:
+    """
+    Compute the hashes and extract the metadata of a jar file.
+
+    This function is self-contained so it can run in a worker process.
+
+    Args:
+        jar (str | Path | IO[bytes]): The jar file.
+
+    Returns:
+        Fingerprint: The hashes and metadata of the jar file.
+    """
+    hashes = FileHash(jar).compute()
+    if not isinstance(jar, str | Path):
+        jar.seek(0)
+    return Fingerprint(hashes, get_jar_info(jar))
+
+
+class _HashSink(io.RawIOBase):
+    """A write-only stream that feeds everything written to it into a MultiHash."""
+
+    def __init__(self, multi_hash: MultiHash):
+        self._multi_hash = multi_hash
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        # RemoteIO.downloadfo rewinds the stream before writing to it
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if offset or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("can only seek to the start")
+        return 0
+
+    def write(self, data) -> int:
+        self._multi_hash.update(data)
+        return len(data)
+
+
+def fingerprint_remote_jar(remote_connection: RemoteIO, path: str) -> Fingerprint:
+    """
+    Compute the hashes and extract the metadata of a remote jar file.
+
+    The metadata is read with range reads, so only the zip central directory and
+    the plugin descriptor are transferred for it. The hashes are computed while
+    the file streams through the storage's own download, the jar is never held
+    in memory.
+
+    Args:
+        remote_connection (RemoteIO): The remote storage connection.
+        path (str): The remote path of the jar file.
+
+    Returns:
+        Fingerprint: The hashes and metadata of the jar file.
+    """
+    with remote_connection.open(path) as f:
+        jar_info = get_jar_info(f)
+    multi_hash = MultiHash()
+    remote_connection.downloadfo(path, _HashSink(multi_hash))
+    return Fingerprint(multi_hash.hashes(), jar_info)
+
+
+class FingerprintCache:
+    """
+    A persistent, size bounded cache of jar fingerprints.
+
+    Entries are keyed by path, and only returned when the size, mtime and inode
+    of the file still match the ones stored with the entry. The least recently
+    used entries are dropped when the cache grows over max_entries.
+    """
+
+    def __init__(self, cache_file: str | Path, max_entries: int = _DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache and load it from cache_file if it exists.
+
+        Args:
+            cache_file (str | Path): The file where the cache is stored.
+            max_entries (int, optional): The maximum number of entries to keep.
+                Defaults to 4096.
+        """
+        self._cache_file = ensure_path(cache_file)
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """
+        Load the cache from the cache file.
+
+        A missing, corrupted or outdated cache file results in an empty cache.
+        """
+        self._entries.clear()
+        try:
+            data = json.loads(self._cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries.update(entries)
+
+    def save(self):
+        """
+        Save the cache to the cache file if it has changed.
+
+        The cache file is replaced atomically, so an interrupted save never
+        leaves a partially written cache behind.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            data = {"version": _CACHE_VERSION, "entries": self._entries}
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self._cache_file.with_name(self._cache_file.name + ".tmp")
+            temp_file.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(temp_file, self._cache_file)
+            self._dirty = False
+
+    def get(self, key: str, stat: FileStat) -> Fingerprint | None:
+        """
+        Get the fingerprint of a file if its attributes have not changed.
+
+        Args:
+            key (str): The cache key, usually the path of the file.
+            stat (FileStat): The current attributes of the file.
+
+        Returns:
+            Fingerprint | None: The cached fingerprint, or None if there is no
+                entry or the entry is stale. Stale entries are removed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.get("stat") != asdict(stat):
+                del self._entries[key]
+                self._dirty = True
+                return None
+            if next(reversed(self._entries)) != key:
+                # the order decides which entries are dropped first, keep it
+                self._entries.move_to_end(key)
+                self._dirty = True
+            try:
+                return Fingerprint(
+                    Hashes(**entry["hashes"]), JarInfo(**entry["jar_info"])
+                )
+            except (KeyError, TypeError, ValueError):
+                del self._entries[key]
+                self._dirty = True
+                return None
+
+    def put(self, key: str, stat: FileStat, fingerprint: Fingerprint):
+        """
+        Store the fingerprint of a file.
+
+        Args:
+            key (str): The cache key, usually the path of the file.
+            stat (FileStat): The attributes of the file the fingerprint belongs to.
+            fingerprint (Fingerprint): The fingerprint to store.
+        """
+        with self._lock:
+            self._entries[key] = {
+                "stat": asdict(stat),
+                "hashes": asdict(fingerprint.hashes),
+                "jar_info": asdict(fingerprint.jar_info),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def pop(self, key: str):
+        """
+        Remove the entry of a file from the cache.
+
+        Args:
+            key (str): The cache key, usually the path of the file.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
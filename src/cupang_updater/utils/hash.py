@@ -5,7 +5,8 @@ from typing import IO, Self
 
 from .common import ensure_path
 
-_DEFAULT_CHUNK_SIZE = 64 * 2**10  # 64 KiB
+_DEFAULT_BUFFER_SIZE = 2**20  # 1 MiB
+_HASH_NAMES = ("md5", "sha1", "sha256", "sha512")
 
 
 @dataclass
@@ -24,6 +25,54 @@ class Hashes:
     sha512: str = field(default=None)
 
 
+class MultiHash:
+    """
+    Feed the same data into several hashlib objects at once.
+
+    Attributes:
+        hash_names (tuple[str, ...]): The hash algorithm names being computed.
+    """
+
+    def __init__(self, *hash_names: str):
+        self.hash_names = hash_names or _HASH_NAMES
+        self._hash_tools = [hashlib.new(name) for name in self.hash_names]
+
+    def update(self, data: bytes | bytearray | memoryview):
+        """
+        Update every hash tool with the given data.
+
+        Args:
+            data (bytes | bytearray | memoryview): The data to hash.
+        """
+        for hash_tool in self._hash_tools:
+            hash_tool.update(data)
+
+    def hexdigests(self) -> dict[str, str]:
+        """
+        Get the computed hash values.
+
+        Returns:
+            dict[str, str]: A mapping of hash algorithm name to its hexadecimal
+                hash value.
+        """
+        return {
+            name: hash_tool.hexdigest()
+            for name, hash_tool in zip(self.hash_names, self._hash_tools, strict=True)
+        }
+
+    def hashes(self) -> Hashes:
+        """
+        Get the computed hash values as a Hashes instance.
+
+        Returns:
+            Hashes: The computed hash values, algorithms that are not computed
+                are left as None.
+        """
+        return Hashes(
+            **{k: v for k, v in self.hexdigests().items() if k in _HASH_NAMES}
+        )
+
+
 class FileHash:
     def __init__(self, file: str | Path | IO[bytes]):
         self._file: Path | IO[bytes] = (
@@ -57,24 +106,38 @@ class FileHash:
     def dummy(cls) -> Self:
         return cls(__file__)
 
-    def _hash(self, stream: IO[bytes], hash_tool) -> str:
+    def _hash_many(self, stream: IO[bytes], multi_hash: MultiHash) -> dict[str, str]:
         """
-        Compute the hash of the given stream using the specified hash tool.
+        Compute several hashes of the given stream in a single read.
+
+        The stream is read into one reusable buffer, so every byte is read once
+        no matter how many hash algorithms are requested.
 
         Args:
             stream (IO[bytes]): The stream to read data from.
-            hash_tool: The hashing tool to use for computing the hash.
+            multi_hash (MultiHash): The hash tools to feed.
 
         Returns:
-            str: The computed hash value as a hexadecimal string.
+            dict[str, str]: A mapping of hash algorithm name to its hexadecimal
+                hash value.
         """
         stream.seek(0)
+        if not hasattr(stream, "readinto"):
+            while True:
+                data = stream.read(_DEFAULT_BUFFER_SIZE)
+                if not data:
+                    break
+                multi_hash.update(data)
+            return multi_hash.hexdigests()
+
+        buffer = bytearray(_DEFAULT_BUFFER_SIZE)
+        view = memoryview(buffer)
         while True:
-            data = stream.read(_DEFAULT_CHUNK_SIZE)
-            if not data:
+            size = stream.readinto(buffer)
+            if not size:
                 break
-            hash_tool.update(data)
-        return hash_tool.hexdigest()
+            multi_hash.update(view[:size])
+        return multi_hash.hexdigests()
 
     def _get_hash(self, hash_name: str) -> str:
         """
@@ -87,18 +150,50 @@ class FileHash:
         Returns:
             str: The computed or cached hash value as a hexadecimal string.
         """
-        if getattr(self._hashes, hash_name, None) is not None:
-            return getattr(self._hashes, hash_name)
-
-        hash_tool = hashlib.new(hash_name)
-        if isinstance(self._file, str | Path):
-            with self._file.open("rb") as stream:
-                hash = self._hash(stream, hash_tool)
-                setattr(self._hashes, hash_name, hash)
-        else:
-            hash = self._hash(self._file, hash_tool)
-            setattr(self._hashes, hash_name, hash)
-        return hash
+        return self._get_hashes(hash_name)[hash_name]
+
+    def _get_hashes(self, *hash_names: str) -> dict[str, str]:
+        """
+        Get or compute the hash values for the specified hash algorithms.
+
+        Hashes that are not known yet are computed together from a single read
+        of the file.
+
+        Args:
+            *hash_names (str): The names of the hash algorithms to use
+                (e.g., 'md5', 'sha256').
+
+        Returns:
+            dict[str, str]: A mapping of hash algorithm name to its computed or
+                cached hexadecimal hash value.
+        """
+        missing = [
+            name for name in hash_names if getattr(self._hashes, name, None) is None
+        ]
+        if missing:
+            multi_hash = MultiHash(*missing)
+            if isinstance(self._file, str | Path):
+                with self._file.open("rb", buffering=0) as stream:
+                    hashes = self._hash_many(stream, multi_hash)
+            else:
+                hashes = self._hash_many(self._file, multi_hash)
+            for name, value in hashes.items():
+                setattr(self._hashes, name, value)
+        return {name: getattr(self._hashes, name) for name in hash_names}
+
+    def compute(self, *hash_names: str) -> Hashes:
+        """
+        Compute the given hashes of the file in a single pass.
+
+        Args:
+            *hash_names (str): The names of the hash algorithms to compute.
+                Defaults to md5, sha1, sha256 and sha512.
+
+        Returns:
+            Hashes: The known hash values of the file.
+        """
+        self._get_hashes(*(hash_names or _HASH_NAMES))
+        return self._hashes
 
     @property
     def md5(self) -> str:
@@ -0,0 +1,493 @@
+import http.client
+import ssl
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from collections.abc import Callable
+from http import HTTPStatus
+from threading import Lock
+
+# connections idle for longer than this are likely closed by the server already
+_IDLE_TIMEOUT = 30.0
+_MAX_IDLE_PER_HOST = 8
+_MAX_REDIRECTS = 10
+_WARM_TIMEOUT = 10.0
+# warmed connections wait for the config and the plugin scan, which can take
+# minutes on large plugin folders, a connection the server closed meanwhile is
+# replaced by the first request anyway
+_WARM_IDLE_TIMEOUT = 300.0
+_REDIRECT_STATUSES = (
+    HTTPStatus.MOVED_PERMANENTLY,
+    HTTPStatus.FOUND,
+    HTTPStatus.SEE_OTHER,
+    HTTPStatus.TEMPORARY_REDIRECT,
+    HTTPStatus.PERMANENT_REDIRECT,
+)
+# errors of a kept alive connection that the server closed in the meantime
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_HostKey = tuple[str, str, int]
+_DECODE_CHUNK_SIZE = 64 * 1024
+# the encodings DecodedResponse handles
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+class HTTPStatusError(Exception):
+    """Raised by ConnectionPool.request when the server answers with an error."""
+
+    def __init__(self, status: int, reason: str, headers: http.client.HTTPMessage):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        super().__init__(f"HTTP Error {status}: {reason}")
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """An HTTPSConnection that resumes the TLS session of a previous connection."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: float,
+        context: ssl.SSLContext,
+        sessions: dict[_HostKey, ssl.SSLSession],
+        sessions_lock: Lock,
+    ):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._sessions = sessions
+        self._sessions_lock = sessions_lock
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        key = ("https", self.host, self.port)
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=self.host, session=session
+        )
+
+    def getresponse(self) -> http.client.HTTPResponse:
+        # TLS 1.3 sends the session ticket after the handshake, so it is only known
+        # once the response arrived, and the socket is dropped on Connection: close
+        sock = self.sock
+        response = super().getresponse()
+        session = getattr(sock, "session", None)
+        if session is not None:
+            with self._sessions_lock:
+                self._sessions[("https", self.host, self.port)] = session
+        return response
+
+
+class PooledResponse:
+    """
+    A response of the ConnectionPool.
+
+    Behaves like http.client.HTTPResponse. The connection goes back to the pool
+    as soon as the body has been read completely, closing the response before
+    that discards the connection.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        response: http.client.HTTPResponse,
+        release: Callable[[bool], None],
+    ):
+        self.url = url
+        self._response = response
+        self._release = release
+        self._released = False
+        self._release_if_done()
+
+    def _release_if_done(self):
+        if not self._released and self._response.isclosed():
+            self._released = True
+            self._release(not self._response.will_close)
+
+    @property
+    def status(self) -> int:
+        return self._response.status
+
+    @property
+    def reason(self) -> str:
+        return self._response.reason
+
+    @property
+    def headers(self) -> http.client.HTTPMessage:
+        return self._response.headers
+
+    def getheader(self, name: str, default: str = None) -> str | None:
+        return self._response.getheader(name, default)
+
+    def getheaders(self) -> list[tuple[str, str]]:
+        return self._response.getheaders()
+
+    def geturl(self) -> str:
+        return self.url
+
+    def read(self, amt: int = None) -> bytes:
+        data = self._response.read(amt)
+        self._release_if_done()
+        return data
+
+    def readinto(self, buffer) -> int:
+        size = self._response.readinto(buffer)
+        self._release_if_done()
+        return size
+
+    def isclosed(self) -> bool:
+        return self._response.isclosed()
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            reusable = self._response.isclosed() and not self._response.will_close
+            self._response.close()
+            self._release(reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class DecodedResponse:
+    """
+    A response whose gzip or deflate encoded body is decoded while it is read.
+
+    Wraps an HTTPResponse like object. The body is decompressed chunk by chunk,
+    so the encoded body is never held in memory as a whole. Content-Encoding and
+    Content-Length are removed from the headers, they describe the encoded body.
+    """
+
+    def __init__(self, response, encoding: str):
+        """
+        Initialize the response.
+
+        Args:
+            response: The HTTPResponse like object to decode.
+            encoding (str): The content encoding, gzip, x-gzip or deflate.
+        """
+        self._response = response
+        self._gzip = encoding in ("gzip", "x-gzip")
+        self._decompressor = zlib.decompressobj(
+            16 + zlib.MAX_WBITS if self._gzip else zlib.MAX_WBITS
+        )
+        self._started = False
+        self._pending = b""
+        self._eof = False
+        del self._response.headers["content-encoding"]
+        del self._response.headers["content-length"]
+
+    def _decode_chunk(self) -> bytes:
+        data = self._response.read(_DECODE_CHUNK_SIZE)
+        if not data:
+            self._eof = True
+            return self._decompressor.flush()
+        try:
+            decoded = self._decompressor.decompress(data)
+        except zlib.error:
+            if self._gzip or self._started:
+                raise
+            # some servers send raw deflate data without the zlib header
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            decoded = self._decompressor.decompress(data)
+        self._started = True
+        return decoded
+
+    def __getattr__(self, name: str):
+        return getattr(self._response, name)
+
+    def read(self, amt: int = None) -> bytes:
+        if amt is None or amt < 0:
+            chunks = [self._pending]
+            self._pending = b""
+            while not self._eof:
+                chunks.append(self._decode_chunk())
+            return b"".join(chunks)
+        while len(self._pending) < amt and not self._eof:
+            self._pending += self._decode_chunk()
+        data, self._pending = self._pending[:amt], self._pending[amt:]
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def decode_response(response):
+    """
+    Decode the body of a response if it is gzip or deflate encoded.
+
+    Args:
+        response: The HTTPResponse like object.
+
+    Returns:
+        The response itself, or a DecodedResponse if its body is encoded.
+    """
+    encoding = (response.headers.get("content-encoding") or "").strip().lower()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        return DecodedResponse(response, encoding)
+    return response
+
+
+def _host_key(parsed: urllib.parse.SplitResult) -> _HostKey:
+    default_port = 443 if parsed.scheme == "https" else 80
+    return (parsed.scheme, parsed.hostname, parsed.port or default_port)
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of keep-alive HTTP connections, grouped by host.
+
+    HTTPS connections to a host resume the TLS session of the previous one, so
+    only the first connection pays for a full handshake.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = _MAX_IDLE_PER_HOST,
+        idle_timeout: float = _IDLE_TIMEOUT,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_idle_per_host (int, optional): The maximum number of idle
+                connections kept per host. Defaults to 8.
+            idle_timeout (float, optional): Idle connections older than this
+                many seconds are not reused, warmed connections have their own
+                timeout, see warm. Defaults to 30.
+        """
+        self._max_idle_per_host = max_idle_per_host
+        self._idle_timeout = idle_timeout
+        # idle connections and the time.monotonic() they expire at
+        self._idle: dict[_HostKey, list[tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = Lock()
+        self._sessions: dict[_HostKey, ssl.SSLSession] = {}
+        self._sessions_lock = Lock()
+        self._context = ssl.create_default_context()
+        self._context.set_alpn_protocols(["http/1.1"])
+
+    def _new_connection(
+        self, key: _HostKey, timeout: float
+    ) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return _HTTPSConnection(
+                host, port, timeout, self._context, self._sessions, self._sessions_lock
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key: _HostKey) -> http.client.HTTPConnection | None:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, expires_at = idle.pop()
+                if now < expires_at:
+                    return conn
+                conn.close()
+        return None
+
+    def _release(
+        self,
+        key: _HostKey,
+        conn: http.client.HTTPConnection,
+        reuse: bool,
+        idle_timeout: float = None,
+    ):
+        if not reuse or conn.sock is None:
+            conn.close()
+            return
+        expires_at = time.monotonic() + (idle_timeout or self._idle_timeout)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle_per_host:
+                idle.append((conn, expires_at))
+                return
+        conn.close()
+
+    def _send(
+        self,
+        key: _HostKey,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout: float,
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        conn = self._acquire(key)
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, target, body, headers)
+                return conn, conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                # the server closed the idle connection, retry on a new one
+                conn.close()
+        conn = self._new_connection(key, timeout)
+        try:
+            conn.request(method, target, body, headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] = None,
+        body: bytes = None,
+        timeout: float = 60,
+    ) -> PooledResponse:
+        """
+        Send a request, following redirects.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The http or https URL.
+            headers (dict[str, str], optional): The request headers.
+            body (bytes, optional): The request body.
+            timeout (float, optional): The socket timeout in seconds.
+                Defaults to 60.
+
+        Returns:
+            PooledResponse: The response.
+
+        Raises:
+            HTTPStatusError: If the server answers with a status of 400 or above.
+            OSError, http.client.HTTPException: On connection errors.
+        """
+        headers = dict(headers or {})
+        for _ in range(_MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            key = _host_key(parsed)
+            target = urllib.parse.urlunsplit(
+                ("", "", parsed.path or "/", parsed.query, "")
+            )
+            conn, res = self._send(key, method, target, headers, body, timeout)
+            response = PooledResponse(
+                url,
+                res,
+                lambda reuse, key=key, conn=conn: self._release(key, conn, reuse),
+            )
+
+            location = res.getheader("location")
+            if res.status in _REDIRECT_STATUSES and location:
+                response.read()
+                new_url = urllib.parse.urljoin(url, location)
+                if res.status == HTTPStatus.SEE_OTHER or (
+                    res.status in (HTTPStatus.MOVED_PERMANENTLY, HTTPStatus.FOUND)
+                    and method == "POST"
+                ):
+                    method, body = "GET", None
+                    headers.pop("Content-Type", None)
+                if urllib.parse.urlsplit(new_url).hostname != parsed.hostname:
+                    # never leak credentials to another host
+                    headers.pop("Authorization", None)
+                url = new_url
+                continue
+
+            if res.status >= 400:
+                response.close()
+                raise HTTPStatusError(res.status, res.reason, res.headers)
+            return response
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+
+    def warm(
+        self,
+        url: str,
+        timeout: float = _WARM_TIMEOUT,
+        idle_timeout: float = _WARM_IDLE_TIMEOUT,
+    ):
+        """
+        Open a connection to the host of a URL and keep it idle in the pool,
+        so the first request to the host does not wait for DNS and TLS.
+
+        Args:
+            url (str): The http or https URL.
+            timeout (float, optional): The socket timeout in seconds.
+                Defaults to 10.
+            idle_timeout (float, optional): How many seconds the connection is
+                kept for the first request, longer than other idle connections
+                since it may wait for the plugin scan. Defaults to 300.
+
+        Raises:
+            OSError: If the connection failed.
+        """
+        key = _host_key(urllib.parse.urlsplit(url))
+        conn = self._new_connection(key, timeout)
+        try:
+            conn.connect()
+        except BaseException:
+            conn.close()
+            raise
+        self._release(key, conn, True, idle_timeout)
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+
+def can_pool(url: str) -> bool:
+    """
+    Check if a URL can be requested through the connection pool.
+
+    Only plain http and https URLs that do not go through a proxy can.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        bool: True if the URL can be pooled.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    proxies = urllib.request.getproxies()
+    return parsed.scheme not in proxies or bool(
+        urllib.request.proxy_bypass(parsed.hostname)
+    )
+
+
+_pool: ConnectionPool = None
+_pool_lock = Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """
+    Get the connection pool shared by every HTTP request of the app.
+
+    Returns:
+        ConnectionPool: The shared connection pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
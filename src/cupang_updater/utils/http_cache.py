@@ -0,0 +1,356 @@
+import hashlib
+import http.client
+import io
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from pathlib import Path
+from threading import Lock
+
+from .common import ensure_path
+
+_CACHE_VERSION = 1
+_DEFAULT_MAX_SIZE = 32 * 1024 * 1024
+_INDEX_FILE = "index.json"
+# request headers that change the response of the apis we talk to
+_KEY_HEADERS = ("accept", "authorization")
+# response headers that a 304 response updates
+_REFRESHED_HEADERS = ("cache-control", "date", "etag", "expires", "last-modified")
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+class BufferedResponse:
+    """
+    A response whose body is already in memory.
+
+    Behaves like http.client.HTTPResponse, it is what make_requests returns for
+    responses that went through the HTTPCache.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: list[tuple[str, str]],
+        body: bytes,
+    ):
+        self.url = url
+        self.status = status
+        try:
+            self.reason = HTTPStatus(status).phrase
+        except ValueError:
+            self.reason = ""
+        self.headers = http.client.HTTPMessage()
+        for name, value in headers:
+            self.headers[name] = value
+        self._body = io.BytesIO(body)
+
+    def getheader(self, name: str, default: str = None) -> str | None:
+        values = self.headers.get_all(name)
+        return ", ".join(values) if values else default
+
+    def getheaders(self) -> list[tuple[str, str]]:
+        return self.headers.items()
+
+    def geturl(self) -> str:
+        return self.url
+
+    def read(self, amt: int = None) -> bytes:
+        return self._body.read(amt)
+
+    def readinto(self, buffer) -> int:
+        return self._body.readinto(buffer)
+
+    def isclosed(self) -> bool:
+        return self._body.closed
+
+    def close(self):
+        self._body.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+@dataclass
+class CachedResponse:
+    """
+    A response stored in the HTTPCache.
+
+    Attributes:
+        url (str): The URL of the response.
+        headers (list[tuple[str, str]]): The response headers.
+        body (bytes): The response body.
+        stored_at (float): When the response was stored or last revalidated,
+            in seconds since the epoch.
+    """
+
+    url: str
+    headers: list[tuple[str, str]]
+    body: bytes
+    stored_at: float
+
+    def _header(self, name: str) -> str | None:
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def freshness_lifetime(self) -> float:
+        """
+        Get how long the response is fresh after it was stored.
+
+        Returns:
+            float: The lifetime in seconds, 0 if it must always be revalidated.
+        """
+        cache_control = self._header("cache-control") or ""
+        if "no-cache" in cache_control.lower():
+            return 0
+        lifetime = 0.0
+        if match := _MAX_AGE.search(cache_control):
+            lifetime = float(match.group(1))
+        elif (expires := self._header("expires")) and (date := self._header("date")):
+            try:
+                lifetime = (
+                    parsedate_to_datetime(expires) - parsedate_to_datetime(date)
+                ).total_seconds()
+            except (TypeError, ValueError):
+                lifetime = 0
+        with suppress(ValueError):
+            lifetime -= float(self._header("age") or 0)
+        return max(lifetime, 0)
+
+    def is_fresh(self) -> bool:
+        """
+        Check if the response can be used without asking the server.
+
+        Returns:
+            bool: True if the response is still fresh.
+        """
+        return time.time() - self.stored_at < self.freshness_lifetime()
+
+    def validators(self) -> dict[str, str]:
+        """
+        Get the headers to revalidate the response with a conditional request.
+
+        Returns:
+            dict[str, str]: The If-None-Match and If-Modified-Since headers.
+        """
+        headers = {}
+        if etag := self._header("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self._header("last-modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def to_response(self) -> BufferedResponse:
+        """
+        Turn the cached response into a response for the caller.
+
+        Returns:
+            BufferedResponse: A 200 response with the cached headers and body.
+        """
+        return BufferedResponse(self.url, HTTPStatus.OK, self.headers, self.body)
+
+
+class HTTPCache:
+    """
+    A persistent, size bounded cache of GET responses.
+
+    Responses are revalidated with If-None-Match and If-Modified-Since, and
+    served without a request while their max-age has not passed. Bodies are
+    stored one file per response next to an index, the least recently used
+    responses are dropped when the bodies grow over max_size.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_size: int = _DEFAULT_MAX_SIZE):
+        """
+        Initialize the cache and load its index from cache_dir if it exists.
+
+        Args:
+            cache_dir (str | Path): The folder where the responses are stored.
+            max_size (int, optional): The maximum total size of the stored
+                bodies in bytes. Defaults to 32 MiB.
+        """
+        self._cache_dir = ensure_path(cache_dir)
+        self._max_size = max_size
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def key(url: str, headers: dict[str, str]) -> str:
+        """
+        Get the cache key of a request.
+
+        Args:
+            url (str): The request URL.
+            headers (dict[str, str]): The request headers.
+
+        Returns:
+            str: The cache key, which does not reveal the request headers.
+        """
+        lowered = {k.lower(): v for k, v in headers.items()}
+        parts = [url, *(lowered.get(x, "") for x in _KEY_HEADERS)]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.body"
+
+    def load(self):
+        """
+        Load the index from the cache folder.
+
+        A missing, corrupted or outdated index results in an empty cache.
+        """
+        self._entries.clear()
+        try:
+            data = json.loads(
+                (self._cache_dir / _INDEX_FILE).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries.update(entries)
+
+    def save(self):
+        """
+        Evict the least recently used responses and save the index.
+
+        The index is replaced atomically, and body files that are not in the
+        index anymore are removed.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            total = sum(x.get("size", 0) for x in self._entries.values())
+            while total > self._max_size and self._entries:
+                _, entry = self._entries.popitem(last=False)
+                total -= entry.get("size", 0)
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            data = {"version": _CACHE_VERSION, "entries": self._entries}
+            index_file = self._cache_dir / _INDEX_FILE
+            temp_file = index_file.with_name(index_file.name + ".tmp")
+            temp_file.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(temp_file, index_file)
+            for body_file in self._cache_dir.glob("*.body"):
+                if body_file.stem not in self._entries:
+                    body_file.unlink(missing_ok=True)
+            self._dirty = False
+
+    def get(self, key: str) -> CachedResponse | None:
+        """
+        Get a stored response.
+
+        Args:
+            key (str): The cache key of the request.
+
+        Returns:
+            CachedResponse | None: The stored response, or None if there is none.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            try:
+                body = self._body_path(key).read_bytes()
+                cached = CachedResponse(
+                    entry["url"],
+                    [tuple(x) for x in entry["headers"]],
+                    body,
+                    entry["stored_at"],
+                )
+            except (OSError, KeyError, TypeError, ValueError):
+                del self._entries[key]
+                self._dirty = True
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def _put(self, key: str, cached: CachedResponse, write_body: bool):
+        if write_body:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            body_file = self._body_path(key)
+            temp_file = body_file.with_name(body_file.name + ".tmp")
+            temp_file.write_bytes(cached.body)
+            os.replace(temp_file, body_file)
+        with self._lock:
+            self._entries[key] = {
+                "url": cached.url,
+                "headers": cached.headers,
+                "stored_at": cached.stored_at,
+                "size": len(cached.body),
+            }
+            self._entries.move_to_end(key)
+            self._dirty = True
+
+    def update(self, key: str, res, cached: CachedResponse = None):
+        """
+        Store or revalidate the response of a GET request.
+
+        Args:
+            key (str): The cache key of the request.
+            res: The response of the server, an HTTPResponse like object.
+            cached (CachedResponse, optional): The stored response the request
+                was made conditional with.
+
+        Returns:
+            The response for the caller. A BufferedResponse for 200 responses
+            and for 304 responses to a conditional request, res otherwise.
+        """
+        if res.status == HTTPStatus.NOT_MODIFIED and cached is not None:
+            res.close()
+            fresh = [
+                (k, v)
+                for k, v in res.headers.items()
+                if k.lower() in _REFRESHED_HEADERS
+            ]
+            names = {k.lower() for k, _ in fresh}
+            headers = [(k, v) for k, v in cached.headers if k.lower() not in names]
+            cached = CachedResponse(
+                cached.url, headers + fresh, cached.body, time.time()
+            )
+            self._put(key, cached, write_body=False)
+            return cached.to_response()
+        if res.status != HTTPStatus.OK:
+            return res
+
+        with res:
+            body = res.read()
+        response = CachedResponse(
+            res.geturl(), list(res.headers.items()), body, time.time()
+        )
+        if (
+            "no-store" not in res.headers.get("cache-control", "").lower()
+            and res.headers.get("vary", "").strip() != "*"
+            and len(body) <= self._max_size
+            and (response.validators() or response.freshness_lifetime())
+        ):
+            self._put(key, response, write_body=True)
+        return response.to_response()
+
+
+_cache: HTTPCache = None
+
+
+def setup_http_cache(cache: HTTPCache):
+    global _cache
+    _cache = cache
+
+
+def get_http_cache() -> HTTPCache:
+    if not isinstance(_cache, HTTPCache):
+        raise RuntimeError("HTTP cache is not initialized")
+    return _cache
@@ -0,0 +1,396 @@
+import base64
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+
+from .common import ensure_path
+from .http import HTTPStatusError
+from .http_cache import BufferedResponse
+
+_CASSETTE_VERSION = 1
+# never written into a cassette
+_SECRET_HEADERS = ("authorization", "cookie", "set-cookie", "x-api-key")
+# set by the replay server itself
+_HOP_HEADERS = ("connection", "content-length", "keep-alive", "transfer-encoding")
+# the URL of the recorded response, which differs from the request after redirects
+_REPLAY_URL_HEADER = "X-Replay-URL"
+_REPLAY_PATH = "/replay"
+_WRITE_CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class Interaction:
+    """
+    A recorded request and its response.
+
+    Attributes:
+        method (str): The request method.
+        url (str): The request URL.
+        status (int): The response status.
+        headers (list[tuple[str, str]]): The response headers.
+        body (bytes): The decoded response body.
+        final_url (str): The URL of the response, after redirects.
+        request_digest (str): The request_digest of the request body, empty for
+            requests without one.
+    """
+
+    method: str
+    url: str
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    final_url: str
+    request_digest: str = ""
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return self.method, self.url, self.request_digest
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "request_digest": self.request_digest,
+            "status": self.status,
+            "headers": self.headers,
+            "body": base64.b64encode(self.body).decode("ascii"),
+            "final_url": self.final_url,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Interaction":
+        return cls(
+            data["method"],
+            data["url"],
+            data["status"],
+            [tuple(x) for x in data["headers"]],
+            base64.b64decode(data["body"]),
+            data.get("final_url") or data["url"],
+            data.get("request_digest") or "",
+        )
+
+
+def request_digest(data: bytes | None) -> str:
+    """
+    Get the digest that tells requests to the same URL apart by their body.
+
+    Args:
+        data (bytes | None): The request body.
+
+    Returns:
+        str: The sha256 of the body, or an empty string if there is none.
+    """
+    return hashlib.sha256(data).hexdigest() if data else ""
+
+
+class Cassette:
+    """
+    A file of recorded interactions, one per method, URL and request body.
+
+    Headers that carry credentials are never stored.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Initialize the cassette and load it from path if it exists.
+
+        Args:
+            path (str | Path): The cassette file.
+
+        Raises:
+            ValueError: If the file is not a cassette.
+        """
+        self.path = ensure_path(path)
+        self._interactions: dict[tuple[str, str, str], Interaction] = {}
+        self._lock = Lock()
+        if self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def __iter__(self):
+        return iter(list(self._interactions.values()))
+
+    def load(self):
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict) or data.get("version") != _CASSETTE_VERSION:
+            raise ValueError(f"{self.path} is not a cassette")
+        with self._lock:
+            self._interactions.clear()
+            for entry in data.get("interactions", []):
+                interaction = Interaction.from_dict(entry)
+                self._interactions[interaction.key] = interaction
+
+    def save(self):
+        """Save the cassette, the file is replaced atomically."""
+        with self._lock:
+            data = {
+                "version": _CASSETTE_VERSION,
+                "interactions": [x.to_dict() for x in self._interactions.values()],
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_name(self.path.name + ".tmp")
+        temp_file.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        os.replace(temp_file, self.path)
+
+    def add(self, interaction: Interaction):
+        """
+        Add an interaction, replacing the one with the same method, URL and
+        request body.
+        """
+        interaction.headers = [
+            (k, v) for k, v in interaction.headers if k.lower() not in _SECRET_HEADERS
+        ]
+        with self._lock:
+            self._interactions[interaction.key] = interaction
+
+    def find(self, method: str, url: str, digest: str = "") -> Interaction | None:
+        """
+        Find a recorded interaction.
+
+        Args:
+            method (str): The request method.
+            url (str): The request URL.
+            digest (str, optional): The request_digest of the request body.
+                Defaults to no body.
+
+        Returns:
+            Interaction | None: The interaction, or None if it was not recorded.
+        """
+        with self._lock:
+            return self._interactions.get((method, url, digest))
+
+
+class HTTPRecorder:
+    """Records the responses of make_requests into a cassette."""
+
+    def __init__(self, cassette: Cassette):
+        """
+        Initialize the recorder.
+
+        Args:
+            cassette (Cassette): Where the interactions are recorded.
+        """
+        self.cassette = cassette
+
+    def record(
+        self, method: str, url: str, res, data: bytes | None = None
+    ) -> BufferedResponse:
+        """
+        Record a response.
+
+        Args:
+            method (str): The request method.
+            url (str): The request URL.
+            res: The response, an HTTPResponse like object. It is read and closed.
+            data (bytes | None, optional): The request body. Defaults to None.
+
+        Returns:
+            BufferedResponse: The same response for the caller.
+        """
+        with res:
+            body = res.read()
+        headers = list(res.headers.items())
+        self.cassette.add(
+            Interaction(
+                method,
+                url,
+                res.status,
+                headers,
+                body,
+                res.geturl(),
+                request_digest(data),
+            )
+        )
+        return BufferedResponse(res.geturl(), res.status, headers, body)
+
+    def record_error(
+        self,
+        method: str,
+        url: str,
+        error: urllib.error.HTTPError | HTTPStatusError,
+        data: bytes | None = None,
+    ):
+        """
+        Record an error response, without its body.
+
+        Args:
+            method (str): The request method.
+            url (str): The request URL.
+            error (urllib.error.HTTPError | HTTPStatusError): The raised error.
+            data (bytes | None, optional): The request body. Defaults to None.
+        """
+        status = (
+            error.code if isinstance(error, urllib.error.HTTPError) else error.status
+        )
+        headers = list(error.headers.items()) if error.headers else []
+        self.cassette.add(
+            Interaction(method, url, status, headers, b"", url, request_digest(data))
+        )
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, don't let them wait for an ACK
+    disable_nagle_algorithm = True
+    server: "_ReplayHTTPServer"
+
+    def log_message(self, *_):
+        pass
+
+    def _replay(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        url = query.get("url", [""])[0]
+        digest = query.get("digest", [""])[0]
+        interaction = self.server.replay.cassette.find(self.command, url, digest)
+        time.sleep(self.server.replay.latency)
+        if interaction is None:
+            self.server.replay.misses.append((self.command, url))
+            self.send_response(404, "Not recorded")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = b"" if self.command == "HEAD" else interaction.body
+        self.send_response(interaction.status)
+        for name, value in interaction.headers:
+            if name.lower() not in _HOP_HEADERS:
+                self.send_header(name, value)
+        self.send_header(_REPLAY_URL_HEADER, interaction.final_url)
+        self.send_header("Content-Length", str(len(interaction.body)))
+        self.end_headers()
+        self._write_throttled(body)
+
+    def _write_throttled(self, body: bytes):
+        bandwidth = self.server.replay.bandwidth
+        start = time.monotonic()
+        for offset in range(0, len(body), _WRITE_CHUNK_SIZE):
+            chunk = body[offset : offset + _WRITE_CHUNK_SIZE]
+            self.wfile.write(chunk)
+            if bandwidth:
+                # sleep until the bytes sent so far fit the bandwidth
+                ahead = (offset + len(chunk)) / bandwidth - (time.monotonic() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def do_GET(self):
+        self._replay()
+
+    def do_HEAD(self):
+        self._replay()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._replay()
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, replay: "ReplayServer"):
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.replay = replay
+
+
+class ReplayServer:
+    """
+    A local HTTP stand-in that serves the interactions of a cassette.
+
+    make_requests sends every request to it while it is set up, through the
+    connection pool or the curl engine like any other request. Responses are
+    delayed by latency and sent at most as fast as bandwidth, so recorded runs
+    can be timed offline under network conditions of choice.
+    """
+
+    def __init__(self, cassette: Cassette, latency: float = 0, bandwidth: int = 0):
+        """
+        Initialize the server and start it in a thread.
+
+        Args:
+            cassette (Cassette): The recorded interactions.
+            latency (float, optional): The delay of every response in seconds.
+                Defaults to 0.
+            bandwidth (int, optional): The bytes per second of every response,
+                0 is unlimited. Defaults to 0.
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.bandwidth = bandwidth
+        # requests that are not in the cassette, as (method, url)
+        self.misses: list[tuple[str, str]] = []
+        self._server = _ReplayHTTPServer(self)
+        self._thread = Thread(
+            target=self._server.serve_forever, name="http-replay", daemon=True
+        )
+        self._thread.start()
+
+    def url_for(self, url: str, data: bytes | None = None) -> str:
+        """
+        Get the URL of the server that replays the given URL.
+
+        Args:
+            url (str): The request URL, as it was recorded.
+            data (bytes | None, optional): The request body, requests to the same
+                URL are told apart by it. Defaults to None.
+
+        Returns:
+            str: The URL to send the request to instead.
+        """
+        host, port = self._server.server_address[:2]
+        query = {"url": url}
+        if digest := request_digest(data):
+            query["digest"] = digest
+        query = urllib.parse.urlencode(query)
+        return f"http://{host}:{port}{_REPLAY_PATH}?{query}"
+
+    def restore(self, url: str, res) -> BufferedResponse:
+        """
+        Turn a response of the server back into the recorded response.
+
+        Args:
+            url (str): The request URL, as it was recorded.
+            res: The response to the URL from url_for, an HTTPResponse like
+                object. It is read and closed.
+
+        Returns:
+            BufferedResponse: The recorded response.
+        """
+        with res:
+            body = res.read()
+        final_url = res.headers.get(_REPLAY_URL_HEADER) or url
+        headers = [(k, v) for k, v in res.headers.items() if k != _REPLAY_URL_HEADER]
+        return BufferedResponse(final_url, res.status, headers, body)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+_recorder: HTTPRecorder = None
+_replay: ReplayServer = None
+
+
+def setup_http_recorder(recorder: HTTPRecorder):
+    global _recorder
+    _recorder = recorder
+
+
+def get_http_recorder() -> HTTPRecorder | None:
+    return _recorder
+
+
+def setup_replay_server(replay: ReplayServer):
+    global _replay
+    _replay = replay
+
+
+def get_replay_server() -> ReplayServer | None:
+    return _replay
@@ -1,8 +1,8 @@
 import json
+import re
 import shutil
 import zipfile
 from dataclasses import dataclass
-from io import BytesIO
 from pathlib import Path
 from typing import IO, Any
 
@@ -28,6 +28,181 @@ _jar_yaml_schema = sy.MapCombined(
 )
 
 
+# the keys read from bukkit style descriptors
+_DESCRIPTOR_KEYS = ("name", "version", "author", "authors")
+_TOP_LEVEL_KEY = re.compile(r"([A-Za-z0-9_.-]+):(?:[ \t]+(.*))?")
+_COMMENT = re.compile(r" #")
+# characters that start something other than a plain scalar
+_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`")
+# anchors, aliases, tags, directives, document markers and tabs are left to
+# strictyaml, which rejects most of them
+_UNSUPPORTED = re.compile(
+    r"(?:^[ ]*|[\[{,][ ]*|[:-][ ]+)[&*!]|^(?:---|\.\.\.|%)|\t", re.M
+)
+
+
+def _strip_comment(value: str) -> str | None:
+    """Strip the trailing comment of a value, None if a quote is not closed."""
+    if value[:1] == "'":
+        end = 1
+        while True:
+            end = value.find("'", end)
+            if end < 0:
+                return None
+            if value[end + 1 : end + 2] != "'":
+                break
+            end += 2
+    elif value[:1] == '"':
+        end = value.find('"', 1)
+        if end < 0:
+            return None
+    else:
+        if value.startswith("#"):
+            return ""
+        match = _COMMENT.search(value)
+        return (value[: match.start()] if match else value).strip()
+    rest = value[end + 1 :].strip()
+    if rest and not rest.startswith("#"):
+        return None
+    return value[: end + 1]
+
+
+def _parse_scalar(value: str) -> str | None:
+    """Parse a single line scalar, None if it is not a simple one."""
+    if not value:
+        return ""
+    if value[0] == "'":
+        return value[1:-1].replace("''", "'")
+    if value[0] == '"':
+        # escape sequences are left to strictyaml
+        return None if "\\" in value else value[1:-1]
+    if value[0] in _INDICATORS or ": " in value or value.endswith(":"):
+        return None
+    return value
+
+
+def _parse_flow_list(value: str) -> list[str] | None:
+    """Parse a single line [a, b] list of plain scalars."""
+    if not value.endswith("]"):
+        return None
+    inner = value[1:-1].strip()
+    if not inner:
+        return []
+    if any(c in inner for c in "[]{}'\""):
+        return None
+    items = []
+    for item in inner.split(","):
+        item = _parse_scalar(item.strip())
+        if not item:
+            return None
+        items.append(item)
+    return items
+
+
+def _parse_block_list(block: list[str]) -> list[str] | None:
+    """Parse the indented "- item" lines of a block list."""
+    items = []
+    indent = None
+    for line in block:
+        stripped = line.lstrip(" ")
+        if not stripped.startswith("- "):
+            return None
+        if indent is None:
+            indent = len(line) - len(stripped)
+        elif len(line) - len(stripped) != indent:
+            return None
+        value = _strip_comment(stripped[2:].strip())
+        item = _parse_scalar(value) if value is not None else None
+        if not item:
+            return None
+        items.append(item)
+    return items
+
+
+def _take_block(lines: list[str], start: int) -> tuple[list[str], int]:
+    """Get the indented lines that belong to a top level key, without comments."""
+    block = []
+    end = start
+    # a list may also start at column 0, right below its key
+    while end < len(lines) and (
+        not lines[end][:1].strip() or lines[end][0] == "#" or lines[end][:2] == "- "
+    ):
+        line = lines[end]
+        if line.strip() and not line.lstrip().startswith("#"):
+            block.append(line)
+        end += 1
+    return block, end
+
+
+def _parse_field(key: str, value: str, block: list[str]) -> str | list[str] | None:
+    """Parse the value of a descriptor key, None if it is not a simple one."""
+    if block:
+        # a multi line scalar, or a list that name does not accept
+        return None if value or key == "name" else _parse_block_list(block)
+    if value.startswith("["):
+        return None if key == "name" else _parse_flow_list(value)
+    return _parse_scalar(value)
+
+
+def _parse_descriptor(text: str) -> dict[str, str | list[str]] | None:
+    """
+    Read the name, version and author(s) keys of a bukkit style descriptor.
+
+    Only the top level lines are parsed, the sections that are not needed
+    (commands, permissions, ...) are skipped without being parsed.
+
+    Args:
+        text (str): The content of the descriptor.
+
+    Returns:
+        dict[str, str | list[str]] | None: The keys that were found, None if the
+            descriptor uses anything this parser does not handle.
+    """
+    if text.startswith("\ufeff") or _UNSUPPORTED.search(text):
+        return None
+    lines = text.splitlines()
+    fields: dict[str, str | list[str]] = {}
+    seen: set[str] = set()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = _TOP_LEVEL_KEY.fullmatch(line.rstrip())
+        if not match or match.group(1) in seen:
+            return None
+        key = match.group(1)
+        seen.add(key)
+        value = _strip_comment(match.group(2) or "")
+        if value is None or (
+            value.startswith(("[", "{")) and not value.endswith(("]", "}"))
+        ):
+            return None
+
+        block, i = _take_block(lines, i)
+        if any(line[:2] == "- " for line in block) and (
+            value or block[0][:2] != "- "
+        ):
+            return None
+
+        if key not in _DESCRIPTOR_KEYS:
+            # not needed, only make sure it is not a plain scalar strictyaml rejects
+            if (
+                not block
+                and value[:1] not in ("'", '"', "[", "{", "|", ">")
+                and _parse_scalar(value) is None
+            ):
+                return None
+            continue
+        parsed = _parse_field(key, value, block)
+        if parsed is None:
+            return None
+        fields[key] = parsed
+    # an empty document is not a mapping
+    return fields if seen else None
+
+
 @dataclass
 class JarInfo:
     name: str
@@ -56,20 +231,25 @@ def get_jar_info(jar_file: str | Path | IO[bytes]) -> JarInfo:
         plugin_version: str | None = None
         plugin_authors: list[str] | None = None
 
+        names = set(jar.namelist())
+
         # Bukkit (including Paper)
         bukkit_files = [
             file_name
             for file_name in ["paper-plugin.yml", "plugin.yml", "bungee.yml"]
-            if file_name in jar.namelist()
+            if file_name in names
         ]
         if bukkit_files:
             for bukkit_file in bukkit_files:
                 with jar.open(bukkit_file, "r") as file:
-                    config = sy.dirty_load(
-                        file.read().decode(),
-                        schema=_jar_yaml_schema,
-                        allow_flow_style=True,
-                    ).data
+                    text = file.read().decode()
+                    config = _parse_descriptor(text)
+                    if config is None:
+                        config = sy.dirty_load(
+                            text,
+                            schema=_jar_yaml_schema,
+                            allow_flow_style=True,
+                        ).data
 
                     plugin_name = config.get("name")
                     plugin_version = config.get("version")
@@ -77,7 +257,7 @@ def get_jar_info(jar_file: str | Path | IO[bytes]) -> JarInfo:
                 break
 
         # Velocity
-        elif "velocity-plugin.json" in jar.namelist():
+        elif "velocity-plugin.json" in names:
             with jar.open("velocity-plugin.json", "r") as file:
                 config = json.load(file)
 
@@ -86,7 +266,7 @@ def get_jar_info(jar_file: str | Path | IO[bytes]) -> JarInfo:
                 plugin_authors = config.get("authors")
 
         # Fabric
-        elif "fabric.mod.json" in jar.namelist():
+        elif "fabric.mod.json" in names:
             with jar.open("fabric.mod.json", "r") as file:
                 config = json.load(file)
 
@@ -95,7 +275,7 @@ def get_jar_info(jar_file: str | Path | IO[bytes]) -> JarInfo:
                 plugin_authors = config.get("authors")
 
         # Forge
-        elif "META-INF/mods.toml" in jar.namelist():
+        elif "META-INF/mods.toml" in names:
             with jar.open("META-INF/mods.toml", "r") as file:
                 config = toml.loads(file.read().decode())
 
@@ -141,8 +321,7 @@ def jar_rename(
     jar_path = ensure_path(jar_path)
     if not jar_info:
         if remote_connection:
-            with BytesIO() as f:
-                remote_connection.downloadfo(jar_path.as_posix(), f)
+            with remote_connection.open(jar_path.as_posix()) as f:
                 jar_info = get_jar_info(f)
         else:
             jar_info = get_jar_info(jar_path)
@@ -0,0 +1,273 @@
+import time
+from contextlib import contextmanager
+from email.message import Message
+from email.utils import parsedate_to_datetime
+from threading import BoundedSemaphore, Lock
+
+from ..meta import stop_event
+
+_DEFAULT_RATE = 10.0
+_DEFAULT_BURST = 10
+_DEFAULT_MAX_CONCURRENCY = 4
+# park a host at most this long, a longer wait fails the request instead
+_DEFAULT_MAX_WAIT = 90.0
+# used when a host throttles without saying for how long
+_DEFAULT_BACKOFF = 60.0
+# X-RateLimit-Reset is an epoch timestamp on GitHub and a delay elsewhere
+_EPOCH_THRESHOLD = 1_000_000_000
+
+
+class RateLimitError(Exception):
+    """Raised when a host is rate limited for longer than the limiter waits."""
+
+    def __init__(self, host: str, delay: float):
+        self.host = host
+        self.delay = delay
+        super().__init__(f"{host} is rate limited for {delay:.0f} more seconds")
+
+
+def _header_number(headers: Message, *names: str) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value.split(",")[0].strip())
+        except ValueError:
+            continue
+    return None
+
+
+def _retry_after(headers: Message) -> float | None:
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _path_key(path: str) -> str:
+    return path.lstrip("/").split("/", 1)[0]
+
+
+class _Budget:
+    def __init__(self):
+        # the request budget the host announced, minus the requests sent since
+        self.remaining: float | None = None
+        self.reset_at = 0.0
+
+
+class _HostState:
+    def __init__(self, burst: int, max_concurrency: int):
+        self.semaphore = BoundedSemaphore(max_concurrency)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        # budgets by X-RateLimit-Resource, "" for hosts that send one budget
+        self.budgets: dict[str, _Budget] = {}
+        # the resource of the responses by the first segment of their path
+        self.resources: dict[str, str] = {}
+
+    def budget(self, path: str) -> _Budget:
+        resource = self.resources.get(_path_key(path), "")
+        return self.budgets.setdefault(resource, _Budget())
+
+
+class RateLimiter:
+    """
+    A per-host request scheduler.
+
+    Every host gets a token bucket and a cap on concurrent requests. The budget
+    announced by X-RateLimit-Remaining and X-RateLimit-Reset (as sent by
+    GitHub, Modrinth and Hangar) is spent locally, so a host is parked until its
+    reset before it starts to throttle. A host that sends X-RateLimit-Resource,
+    like GitHub for its REST and GraphQL apis, gets a budget per resource.
+    Retry-After and throttled responses park the host as well. Parked hosts
+    only block their own requests.
+    """
+
+    def __init__(
+        self,
+        rate: float = _DEFAULT_RATE,
+        burst: int = _DEFAULT_BURST,
+        max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+        max_wait: float = _DEFAULT_MAX_WAIT,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate (float, optional): The requests per second per host.
+                Defaults to 10.
+            burst (int, optional): How many requests a host gets at once.
+                Defaults to 10.
+            max_concurrency (int, optional): The maximum number of concurrent
+                requests per host. Defaults to 4.
+            max_wait (float, optional): The longest a request waits for its host,
+                in seconds. Defaults to 90.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._max_concurrency = max_concurrency
+        self._max_wait = max_wait
+        self._hosts: dict[str, _HostState] = {}
+        self._lock = Lock()
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(
+                    self._burst, self._max_concurrency
+                )
+            return state
+
+    def _reserve(self, state: _HostState, budget: _Budget) -> float:
+        """Take a request slot, or return how long to wait for one."""
+        now = time.monotonic()
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if budget.remaining is not None:
+            if now >= budget.reset_at:
+                budget.remaining = None
+            elif budget.remaining < 1:
+                return budget.reset_at - now
+
+        elapsed = now - state.updated
+        state.tokens = min(self._burst, state.tokens + elapsed * self._rate)
+        state.updated = now
+        if state.tokens < 1:
+            return (1 - state.tokens) / self._rate
+        state.tokens -= 1
+        if budget.remaining is not None:
+            budget.remaining -= 1
+        return 0
+
+    def delay(self, host: str, path: str = "") -> float:
+        """
+        Get how long a host is parked for.
+
+        Args:
+            host (str): The host name.
+            path (str, optional): The URL path, picks the budget of its resource.
+                Defaults to "".
+
+        Returns:
+            float: The seconds until the host takes requests again, 0 if it does,
+                at most max_wait.
+        """
+        state = self._state(host)
+        with self._lock:
+            now = time.monotonic()
+            delay = state.blocked_until - now
+            budget = state.budget(path)
+            if budget.remaining is not None and budget.remaining < 1:
+                delay = max(delay, budget.reset_at - now)
+            return min(max(delay, 0), self._max_wait)
+
+    @contextmanager
+    def limit(self, host: str, path: str = ""):
+        """
+        Wait until a request to the host may be sent, and hold a slot of its
+        concurrency cap while the request is sent.
+
+        Args:
+            host (str): The host name.
+            path (str, optional): The URL path, picks the budget of its resource.
+                Defaults to "".
+
+        Raises:
+            RateLimitError: If the host is parked for longer than max_wait, or the
+                app is stopping.
+        """
+        state = self._state(host)
+        with state.semaphore:
+            while True:
+                with self._lock:
+                    delay = self._reserve(state, state.budget(path))
+                if delay <= 0:
+                    break
+                if delay > self._max_wait or stop_event.wait(delay):
+                    raise RateLimitError(host, delay)
+            yield
+
+    def update(self, host: str, status: int, headers: Message, path: str = "") -> bool:
+        """
+        Update the budget of a host from the headers of its response.
+
+        Args:
+            host (str): The host name.
+            status (int): The response status.
+            headers (Message): The response headers.
+            path (str, optional): The URL path of the request. Defaults to "".
+
+        Returns:
+            bool: True if the host throttled the request, which is worth retrying
+                once the host is not parked anymore.
+        """
+        remaining = _header_number(
+            headers, "x-ratelimit-remaining", "ratelimit-remaining"
+        )
+        reset = _header_number(headers, "x-ratelimit-reset", "ratelimit-reset")
+        retry_after = _retry_after(headers)
+        resource = headers.get("x-ratelimit-resource")
+        if reset is not None and reset > _EPOCH_THRESHOLD:
+            reset -= time.time()
+
+        state = self._state(host)
+        with self._lock:
+            now = time.monotonic()
+            if resource:
+                state.resources[_path_key(path)] = resource
+            budget = state.budgets.setdefault(resource or "", _Budget())
+            if remaining is not None:
+                reset_at = now + max(reset, 0) if reset is not None else budget.reset_at
+                if budget.remaining is None or reset_at > budget.reset_at + 1:
+                    # a new window
+                    budget.remaining = remaining
+                else:
+                    # responses arrive out of order, keep the smallest budget
+                    budget.remaining = min(budget.remaining, remaining)
+                budget.reset_at = reset_at or now + _DEFAULT_BACKOFF
+
+            throttled = status == 429 or (
+                status == 403 and (retry_after is not None or remaining == 0)
+            )
+            if throttled and retry_after is None and remaining == 0:
+                # only this budget is spent, the other resources of the host go on,
+                # a reset in the past means our clocks disagree, back off a bit
+                wait = max(reset, 1) if reset is not None else _DEFAULT_BACKOFF
+                budget.reset_at = max(budget.reset_at, now + wait)
+            elif throttled:
+                if retry_after is None:
+                    retry_after = (
+                        max(reset, 0) if reset is not None else _DEFAULT_BACKOFF
+                    )
+                # a reset in the past means our clocks disagree, back off a bit
+                retry_after = max(retry_after, 1)
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            return throttled
+
+
+_limiter: RateLimiter = None
+_limiter_lock = Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the rate limiter shared by every HTTP request of the app.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
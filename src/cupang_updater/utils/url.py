@@ -1,11 +1,35 @@
+import json
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from collections import OrderedDict
+from contextlib import suppress
 from http import HTTPStatus
-from http.client import HTTPResponse
+from http.client import HTTPException, HTTPResponse
+from threading import Event, Lock
 
 from ..logger.logger import get_logger
 from ..meta import default_headers
+from .curl_multi import get_curl_engine
+from .http import (
+    ACCEPT_ENCODING,
+    DecodedResponse,
+    HTTPStatusError,
+    PooledResponse,
+    can_pool,
+    decode_response,
+    get_connection_pool,
+)
+from .http_cache import BufferedResponse, get_http_cache
+from .http_replay import get_http_recorder, get_replay_server
+from .rate_limit import RateLimitError, get_rate_limiter
+
+# how often a request is sent again after its host throttled it
+_THROTTLED_RETRIES = 2
+# how many answered GET and HEAD requests are shared, and for how long
+_MAX_SHARED_RESPONSES = 256
+_SHARED_RESPONSE_TTL = 300.0
 
 
 def make_url(base: str, *paths: str, **queries: str) -> str:
@@ -34,43 +58,299 @@ def make_url(base: str, *paths: str, **queries: str) -> str:
     )
 
 
+def _log_request_error(url: str, e: Exception):
+    msg = f'Error while requesting data from "{url}" {type(e).__qualname__}: {e}'
+    try:
+        get_logger().error(msg)
+    except RuntimeError:
+        print(msg)
+
+
+def _open_network(
+    url: str,
+    method: str,
+    headers: dict[str, str],
+    timeout: int,
+    data: bytes | None = None,
+) -> HTTPResponse | PooledResponse | DecodedResponse | BufferedResponse:
+    engine = get_curl_engine()
+    if engine is not None and urllib.parse.urlsplit(url).scheme in ("http", "https"):
+        return engine.request(method, url, headers=headers, body=data, timeout=timeout)
+    if can_pool(url):
+        # keep-alive connections shared by every updater and api client
+        res = get_connection_pool().request(
+            method, url, headers=headers, body=data, timeout=timeout
+        )
+    else:
+        req = urllib.request.Request(url, data=data, method=method, headers=headers)
+        res = urllib.request.urlopen(req, timeout=timeout)
+    return decode_response(res)
+
+
+def _open(
+    url: str,
+    method: str,
+    headers: dict[str, str],
+    timeout: int,
+    data: bytes | None = None,
+) -> HTTPResponse | PooledResponse | DecodedResponse | BufferedResponse:
+    replay = get_replay_server()
+    if replay is not None:
+        res = _open_network(replay.url_for(url, data), method, headers, timeout, data)
+        return replay.restore(url, res)
+    recorder = get_http_recorder()
+    try:
+        res = _open_network(url, method, headers, timeout, data)
+    except (urllib.error.HTTPError, HTTPStatusError) as e:
+        if recorder is not None:
+            recorder.record_error(method, url, e, data)
+        raise
+    if recorder is not None:
+        return recorder.record(method, url, res, data)
+    return res
+
+
+def _send_request(
+    url: str,
+    method: str,
+    headers: dict[str, str],
+    timeout: int,
+    conditional: bool = False,
+    data: bytes | None = None,
+) -> HTTPResponse | PooledResponse | urllib.error.HTTPError | None:
+    limiter = get_rate_limiter()
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.hostname or ""
+    for _ in range(_THROTTLED_RETRIES + 1):
+        try:
+            with limiter.limit(host, parsed.path):
+                res = _open(url, method, headers, timeout, data)
+            limiter.update(host, res.status, res.headers, parsed.path)
+            return res
+        except (urllib.error.HTTPError, HTTPStatusError) as e:
+            error = e
+            status = e.code if isinstance(e, urllib.error.HTTPError) else e.status
+            throttled = limiter.update(host, status, e.headers, parsed.path)
+        except (
+            urllib.error.URLError,
+            HTTPException,
+            OSError,
+            RateLimitError,
+        ) as e:
+            _log_request_error(url, e)
+            return None
+        # urllib raises on 304, which answers a conditional request just fine
+        if conditional and status == HTTPStatus.NOT_MODIFIED:
+            return error
+        if not throttled:
+            break
+    _log_request_error(url, error)
+    return None
+
+
 def make_requests(
     url: str,
     method: str = "GET",
     headers: dict[str, str] | None = None,
     timeout: int = 60,
-) -> HTTPResponse | None:
+    data: bytes | None = None,
+) -> HTTPResponse | PooledResponse | BufferedResponse | None:
     """
     Make an HTTP request to the given URL using the given method and headers.
 
+    Requests are paced per host by the rate limiter. GET requests go through
+    the HTTP cache, and concurrent GET and HEAD requests for the same URL and
+    headers share one response for a few minutes.
+
     Args:
         url (str): The URL to request.
         method (str): The HTTP method to use (default: "GET").
         headers (dict[str, str]): Additional HTTP headers to include in the request.
+        timeout (int): The socket timeout in seconds (default: 60).
+        data (bytes | None): The request body, ignored by GET and HEAD requests.
 
     Returns:
-        HTTPResponse | None: The response from the server, or None if an error occurred.
+        HTTPResponse | PooledResponse | BufferedResponse | None: The response from
+            the server, or None if an error occurred. GET and HEAD requests always
+            return a BufferedResponse.
 
     Example:
     >>> make_requests("https://example.com", "GET", {"Accept": "text/html"})
-    <http.client.HTTPResponse object at 0x...>
+    <cupang_updater.utils.http_cache.BufferedResponse object at 0x...>
     >>> make_requests(
-    ...     "https://example.com", "POST", {"Content-Type": "application/json"}
+    ...     "https://example.com",
+    ...     "POST",
+    ...     {"Content-Type": "application/json"},
+    ...     data=b'{"key": "value"}',
     ... )
-    <http.client.HTTPResponse object at 0x...>
+    <cupang_updater.utils.http.PooledResponse object at 0x...>
     """
-    headers = {**default_headers, **(headers or {})}
-    req = urllib.request.Request(url, method=method, headers=headers)
-    try:
-        res = urllib.request.urlopen(req, timeout=timeout)
-    except (urllib.error.URLError, urllib.error.HTTPError) as e:
-        msg = f'Error while requesting data from "{url}" {type(e).__qualname__}: {e}'
-        try:
-            get_logger().error(msg)
-        except RuntimeError:
-            print(msg)
+    headers = {
+        **default_headers,
+        "Accept-Encoding": ACCEPT_ENCODING,
+        **(headers or {}),
+    }
+    if method in ("GET", "HEAD"):
+        return _coalesced_request(url, method, headers, timeout).to_response()
+    return _cached_request(url, method, headers, timeout, data)
+
+
+def read_json(url: str, headers: dict[str, str] | None = None, timeout: int = 60):
+    """
+    GET the given URL and parse its JSON response.
+
+    The response is checked against the Accept header, application/json unless
+    headers sets another one. The parsed result is shared with every caller of
+    the same URL and headers for a few minutes, so it must not be modified.
+
+    Args:
+        url (str): The URL to request.
+        headers (dict[str, str]): Additional HTTP headers to include in the request.
+        timeout (int): The socket timeout in seconds (default: 60).
+
+    Returns:
+        Any: The parsed JSON, or None if an error occurred.
+
+    Example:
+    >>> read_json("https://api.github.com/repos/EssentialsX/Essentials")["name"]
+    'Essentials'
+    """
+    headers = {
+        **default_headers,
+        "Accept": "application/json",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        **(headers or {}),
+    }
+    flight = _coalesced_request(url, "GET", headers, timeout)
+    if not check_content_type(flight.to_response(), headers["Accept"]):
+        return None
+    return flight.json()
+
+
+class _Flight:
+    """One request shared by every concurrent caller with the same key."""
+
+    def __init__(self):
+        self.done = Event()
+        self.response: tuple[str, int, list[tuple[str, str]], bytes] | None = None
+        # time.monotonic() of the answer
+        self.answered_at: float = None
+        self._json = _UNPARSED
+        self._json_lock = Lock()
+
+    def to_response(self) -> BufferedResponse | None:
+        return BufferedResponse(*self.response) if self.response else None
+
+    def json(self):
+        with self._json_lock:
+            if self._json is _UNPARSED:
+                try:
+                    self._json = json.loads(self.response[3])
+                except (TypeError, ValueError):
+                    self._json = None
+            return self._json
+
+    def is_expired(self, now: float) -> bool:
+        return (
+            self.answered_at is not None
+            and now - self.answered_at > _SHARED_RESPONSE_TTL
+        )
+
+
+_UNPARSED = object()
+# in flight and answered requests, oldest answer first
+_flights: OrderedDict[tuple, _Flight] = OrderedDict()
+_flights_lock = Lock()
+
+
+def _evict_flights():
+    """Drop the oldest answered requests beyond _MAX_SHARED_RESPONSES."""
+    excess = len(_flights) - _MAX_SHARED_RESPONSES
+    if excess <= 0:
         return
-    return res
+    # requests in flight are never dropped, their callers are waiting
+    for key in [k for k, v in _flights.items() if v.answered_at is not None][:excess]:
+        del _flights[key]
+
+
+def clear_shared_responses():
+    """
+    Forget the answered GET and HEAD requests, so the next ones are sent again.
+
+    Requests that are in flight are still shared.
+    """
+    with _flights_lock:
+        for key in [k for k, v in _flights.items() if v.answered_at is not None]:
+            del _flights[key]
+
+
+def _coalesced_request(
+    url: str, method: str, headers: dict[str, str], timeout: int
+) -> _Flight:
+    """
+    Send a GET or HEAD request, unless the same request is in flight or was
+    answered a short while ago, then share its response instead.
+
+    Failed requests are only shared with the callers that were already waiting,
+    the next caller tries again. At most the newest 256 answers are kept, for
+    5 minutes each.
+    """
+    key = (method, url, tuple(sorted((k.lower(), v) for k, v in headers.items())))
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None and flight.is_expired(time.monotonic()):
+            del _flights[key]
+            flight = None
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        return flight
+
+    try:
+        res = _cached_request(url, method, headers, timeout)
+        if res is not None:
+            with res:
+                body = res.read()
+            res_headers = list(res.headers.items())
+            flight.response = (res.geturl(), res.status, res_headers, body)
+    finally:
+        with _flights_lock:
+            if flight.response is None:
+                _flights.pop(key, None)
+            elif _flights.get(key) is flight:
+                flight.answered_at = time.monotonic()
+                _flights.move_to_end(key)
+                _evict_flights()
+        flight.done.set()
+    return flight
+
+
+def _cached_request(
+    url: str,
+    method: str,
+    headers: dict[str, str],
+    timeout: int,
+    data: bytes | None = None,
+) -> HTTPResponse | PooledResponse | BufferedResponse | None:
+    cache = None
+    if method == "GET":
+        with suppress(RuntimeError):
+            cache = get_http_cache()
+    if cache is None:
+        return _send_request(url, method, headers, timeout, data=data)
+
+    key = cache.key(url, headers)
+    cached = cache.get(key)
+    if cached is not None:
+        if cached.is_fresh():
+            return cached.to_response()
+        headers.update(cached.validators())
+    res = _send_request(url, method, headers, timeout, cached is not None)
+    if res is None:
+        return None
+    return cache.update(key, res, cached)
 
 
 def check_content_type(res: HTTPResponse, content_type: str) -> bool:
@@ -97,6 +377,83 @@ def check_content_type(res: HTTPResponse, content_type: str) -> bool:
     return True
 
 
+def match_content_type(content_type: str | None, content_types: list[str]) -> bool:
+    """
+    Check if a Content-Type header value is one of the given content types.
+
+    Args:
+        content_type (str | None): The Content-Type header value.
+        content_types (list[str]): The accepted content types.
+
+    Returns:
+        bool: True if the media type matches one of content_types.
+    """
+    media_type = (content_type or "").split(";", maxsplit=1)[0].strip().lower()
+    return any(media_type == x.lower() for x in content_types)
+
+
+_expected_content_types: dict[str, tuple[str, ...]] = {}
+_validated_content_types: dict[str, str] = {}
+_content_types_lock = Lock()
+
+
+def expect_content_types(url: str, content_types: list[str]):
+    """
+    Let the download of a URL check its content type, instead of a HEAD request.
+
+    Args:
+        url (str): The URL of the download.
+        content_types (list[str]): The accepted content types.
+    """
+    with _content_types_lock:
+        _expected_content_types[url] = tuple(content_types)
+
+
+def get_expected_content_types(url: str) -> tuple[str, ...] | None:
+    """
+    Get the content types a download of a URL has to be checked against.
+
+    Args:
+        url (str): The URL of the download.
+
+    Returns:
+        tuple[str, ...] | None: The accepted content types, or None if the URL
+            does not need a check or was already validated.
+    """
+    with _content_types_lock:
+        content_types = _expected_content_types.get(url)
+        validated = _validated_content_types.get(url)
+    if content_types and match_content_type(validated, content_types):
+        return None
+    return content_types
+
+
+def remember_content_type(url: str, content_type: str):
+    """
+    Remember the content type a URL served for the rest of the run.
+
+    Args:
+        url (str): The URL.
+        content_type (str): The Content-Type header value it served.
+    """
+    with _content_types_lock:
+        _validated_content_types[url] = content_type
+
+
+def get_remembered_content_type(url: str) -> str | None:
+    """
+    Get the content type a URL served earlier in the run.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str | None: The Content-Type header value, or None if it is not known.
+    """
+    with _content_types_lock:
+        return _validated_content_types.get(url)
+
+
 def parse_url(url: str) -> urllib.parse.ParseResult:
     """
     Parse a URL into a urllib.parse.ParseResult object.
@@ -0,0 +1,198 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABCMeta, abstractmethod
+from pathlib import Path
+
+from .common import ensure_path
+
+# inotify(7) event masks
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+# a created file is only reported once it is fully written (IN_CLOSE_WRITE),
+# IN_CREATE alone would pick up jars that are still being copied
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+# the watched folder itself is gone, everything has to be rescanned
+_RESCAN_MASK = _IN_Q_OVERFLOW | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class FolderWatcher(metaclass=ABCMeta):
+    """Report the names of files that changed in a folder."""
+
+    def __init__(self, folder: str | Path):
+        """
+        Start watching a folder.
+
+        Args:
+            folder (str | Path): The folder to watch.
+        """
+        self.folder = ensure_path(folder)
+
+    @abstractmethod
+    def read(self, timeout: float) -> set[str] | None:
+        """
+        Wait for changes in the folder.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+
+        Returns:
+            set[str] | None: The names of the added, changed or removed files,
+                empty if nothing changed before the timeout. None means the
+                changes could not be tracked and the whole folder has to be
+                rescanned.
+        """
+        ...
+
+    @abstractmethod
+    def close(self):
+        """Stop watching the folder."""
+        ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class InotifyWatcher(FolderWatcher):
+    """A FolderWatcher backed by Linux inotify."""
+
+    def __init__(self, folder: str | Path):
+        """
+        Start watching a folder.
+
+        Args:
+            folder (str | Path): The folder to watch.
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+        super().__init__(folder)
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(self.folder), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), str(self.folder))
+
+    def read(self, timeout: float) -> set[str] | None:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        names: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _RESCAN_MASK:
+                return None
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(FolderWatcher):
+    """A FolderWatcher that compares the size and mtime of the files."""
+
+    def __init__(self, folder: str | Path, interval: float = 2.0):
+        """
+        Start watching a folder.
+
+        Args:
+            folder (str | Path): The folder to watch.
+            interval (float, optional): Seconds between two listings of the
+                folder. Defaults to 2.0.
+        """
+        super().__init__(folder)
+        self._interval = interval
+        self._next_poll = time.monotonic() + interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        return snapshot
+
+    def read(self, timeout: float) -> set[str] | None:
+        # the listing is the expensive part, never do it more often than interval
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self._next_poll = time.monotonic() + self._interval
+        snapshot = self._take_snapshot()
+        names = {
+            name
+            for name in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(name) != self._snapshot.get(name)
+        }
+        self._snapshot = snapshot
+        return names
+
+    def close(self):
+        # nothing is held open between two listings
+        pass
+
+
+def get_folder_watcher(folder: str | Path) -> FolderWatcher:
+    """
+    Get the best available watcher for a folder.
+
+    Args:
+        folder (str | Path): The folder to watch.
+
+    Returns:
+        FolderWatcher: An InotifyWatcher on Linux, a PollingWatcher when inotify
+            is not available.
+    """
+    try:
+        return InotifyWatcher(folder)
+    except (OSError, AttributeError):
+        # AttributeError: the libc has no inotify functions
+        return PollingWatcher(folder)